@@ -0,0 +1,63 @@
+"""Conditional and ranged responses for job artifacts served from disk."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+# Download tokens make responses per-user; clients keep them but revalidate every time
+CACHE_CONTROL = "private, no-cache"
+
+
+def artifact_headers(stat_result: os.stat_result) -> dict[str, str]:
+    """Validators of an artifact, from the file's modification time and size.
+
+    The ETag is the one ``FileResponse`` derives from the same stat, so an
+    ``If-Range`` sent back by a resumed download matches it.
+    """
+    etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    return {
+        "ETag": f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"',
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+
+def not_modified(request: Request, headers: dict[str, str]) -> bool:
+    """Whether the request's If-None-Match / If-Modified-Since still match ``headers``."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or headers["ETag"] in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(headers["Last-Modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def artifact_response(request: Request, path: Path, *, media_type: str, filename: str) -> Response:
+    """Serve ``path`` from disk: 304 when the client's copy is current, else the file.
+
+    ``FileResponse`` sends the file in chunks without reading it into memory and
+    answers ``Range`` requests (honouring ``If-Range``) with 206, so interrupted
+    downloads resume where they stopped.
+    """
+    stat_result = path.stat()
+    headers = artifact_headers(stat_result)
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+        headers=headers,
+    )
@@ -13,6 +13,7 @@ from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from apps.api.dependencies.entities import get_custom_entity_service
 from apps.domain.schemas.entities import EntityCreate, EntityResponse, EntityUpdate
 from apps.domain.services.custom_entities import CustomEntityService
+from apps.domain.services.statement_sheets import read_sheet, replace_sheet
 
 
 router = APIRouter(prefix="/ai/entities", tags=["entities"])
@@ -37,7 +38,7 @@ async def _update_all_statement_entities(service: CustomEntityService) -> int:
             continue
 
         try:
-            df = pd.read_excel(excel_file, sheet_name="Transactions")
+            df = read_sheet(excel_file, "Transactions")
         except Exception:
             continue
 
@@ -56,13 +57,7 @@ async def _update_all_statement_entities(service: CustomEntityService) -> int:
         df["Entity"] = df["Description"].map(lambda value: matches.get(str(value).strip(), "") or "-")
 
         try:
-            with pd.ExcelWriter(
-                excel_file,
-                engine="openpyxl",
-                mode="a",
-                if_sheet_exists="replace",
-            ) as writer:
-                df.to_excel(writer, sheet_name="Transactions", index=False)
+            replace_sheet(excel_file, "Transactions", df)
         except Exception:
             continue
 
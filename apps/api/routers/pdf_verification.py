@@ -4,9 +4,9 @@ import asyncio
 import shutil
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 
+from apps.api.artifacts import artifact_response
 from apps.api.dependencies.pdf_verification import get_pdf_verification_service, get_verification_report_service
 from apps.domain.services.pdf_verification import PdfVerificationService
 from apps.domain.services.pdf_verification_report import PdfVerificationReportService
@@ -79,9 +79,10 @@ async def get_verification_job(
         raise HTTPException(status_code=404, detail="Job not found") from exc
 
 
-@router.get("/{job_id}/report")
+@router.api_route("/{job_id}/report", methods=["GET", "HEAD"])
 async def download_verification_report(
     job_id: str,
+    request: Request,
     service: PdfVerificationService = Depends(get_pdf_verification_service),
     report_service: PdfVerificationReportService = Depends(get_verification_report_service),
 ):
@@ -117,7 +118,8 @@ async def download_verification_report(
                 await repo.update_fields(job_id, report_path=str(report_path))
                 await session.commit()
 
-        return FileResponse(
+        return artifact_response(
+            request,
             report_path,
             media_type="application/pdf",
             filename=f"verification_report_{job_id}.pdf",
@@ -5,43 +5,99 @@ import shutil
 import tempfile
 import uuid
 from pathlib import Path
+from typing import Any
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
 from fastapi.responses import FileResponse
 
+from apps.api.artifacts import artifact_headers, artifact_response, not_modified
 from apps.api.dependencies.statements import get_statement_pipeline
+from apps.api.uploads import receive_upload
+from apps.core.config import settings
 from apps.domain.services.statements import StatementPipelineService
 from apps.legacy_bridge.adapter import run_legacy
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the standard encoder is used instead
+    orjson = None
+
 router = APIRouter(prefix="/ai/statements", tags=["ai"])
 
 
-@router.post("/normalize")
+def _json_default(value: Any) -> Any:
+    # Timestamps and numpy scalars left in sheet rows
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_response(payload: Any, headers: dict[str, str]) -> Response:
+    if orjson is not None:
+        body = orjson.dumps(payload, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(payload, default=_json_default, separators=(",", ":")).encode()
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# The form is parsed by hand so the file streams to disk; this documents it
+_NORMALIZE_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "bank_name": {"type": "string"},
+                        "password": {"type": "string"},
+                        "financial_year": {"type": "string"},
+                        "report_prompt": {"type": "string"},
+                        "report_template": {"type": "string"},
+                        "force_recompute": {"type": "boolean", "default": False},
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("/normalize", openapi_extra=_NORMALIZE_FORM)
 async def normalize_statement(
-    file: UploadFile = File(...),
-    bank_name: str | None = Form(default=None),
-    password: str | None = Form(default=None),
-    financial_year: str | None = Form(default=None),
-    report_prompt: str | None = Form(default=None),
-    report_template: str | None = Form(default=None),
+    request: Request,
     pipeline: StatementPipelineService = Depends(get_statement_pipeline),
 ):
-    if file.content_type not in {"application/pdf", "application/octet-stream"}:
-        raise HTTPException(status_code=415, detail="Only PDF uploads are supported")
-
-    data = await file.read()
-    if not data:
-        raise HTTPException(status_code=400, detail="Empty file upload")
-
-    job = await pipeline.create_job(
-        file_bytes=data,
-        file_name=file.filename or "statement.pdf",
-        bank_name=bank_name,
-        password=password,
-        financial_year=financial_year,
-        prompt=report_prompt,
-        template=report_template,
+    upload = await receive_upload(
+        request,
+        pipeline.upload_dir,
+        max_bytes=settings.statement_upload_max_mb * 1024 * 1024,
     )
+    try:
+        if upload.content_type not in {"application/pdf", "application/octet-stream"}:
+            raise HTTPException(status_code=415, detail="Only PDF uploads are supported")
+        if not upload.size:
+            raise HTTPException(status_code=400, detail="Empty file upload")
+
+        fields = upload.fields
+        job = await pipeline.create_job(
+            upload_path=upload.path,
+            content_hash=upload.sha256,
+            file_name=upload.file_name or "statement.pdf",
+            bank_name=fields.get("bank_name"),
+            password=fields.get("password"),
+            financial_year=fields.get("financial_year"),
+            prompt=fields.get("report_prompt"),
+            template=fields.get("report_template"),
+            force_recompute=fields.get("force_recompute", "").lower() in {"1", "true", "on", "yes"},
+        )
+    finally:
+        # Moved into the job directory unless the job was not created
+        upload.path.unlink(missing_ok=True)
     return job
 
 
@@ -61,36 +117,74 @@ async def get_statement_job(job_id: str, pipeline: StatementPipelineService = De
         raise HTTPException(status_code=404, detail="Job not found") from exc
 
 
-@router.get("/{job_id}/excel")
-async def download_excel(job_id: str, token: str, pipeline: StatementPipelineService = Depends(get_statement_pipeline)):
+@router.api_route("/{job_id}/excel", methods=["GET", "HEAD"])
+async def download_excel(
+    job_id: str,
+    token: str,
+    request: Request,
+    pipeline: StatementPipelineService = Depends(get_statement_pipeline),
+):
     try:
         path = await pipeline.read_excel(job_id, token)
     except PermissionError as exc:
         raise HTTPException(status_code=403, detail="Invalid download token") from exc
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return FileResponse(path, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", filename=path.name)
+    return artifact_response(
+        request,
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename=path.name,
+    )
 
 
-@router.get("/{job_id}/report")
-async def download_report(job_id: str, pipeline: StatementPipelineService = Depends(get_statement_pipeline)):
+@router.api_route("/{job_id}/report", methods=["GET", "HEAD"])
+async def download_report(
+    job_id: str,
+    request: Request,
+    pipeline: StatementPipelineService = Depends(get_statement_pipeline),
+):
     try:
         path = await pipeline.read_report(job_id)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return FileResponse(path, media_type="application/pdf", filename=path.name)
+    return artifact_response(request, path, media_type="application/pdf", filename=path.name)
 
 
 @router.get("/{job_id}/excel-data")
-async def get_excel_data(job_id: str, token: str, pipeline: StatementPipelineService = Depends(get_statement_pipeline)):
-    """Return the complete Excel file structure as JSON for frontend display."""
+async def get_excel_data(
+    job_id: str,
+    token: str,
+    request: Request,
+    sheet: str | None = None,
+    offset: int = Query(default=0, ge=0),
+    limit: int | None = Query(default=None, ge=1),
+    columns: str | None = Query(default=None, description="Comma-separated column names"),
+    pipeline: StatementPipelineService = Depends(get_statement_pipeline),
+):
+    """Return the Excel sheets as JSON for frontend display, a page of one sheet at a time if asked."""
     try:
-        excel_data = await pipeline.get_excel_data(job_id, token)
-        return excel_data
+        path = await pipeline.read_excel(job_id, token)
+        headers = artifact_headers(path.stat())
+        if not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+        excel_data = await pipeline.get_excel_data(
+            job_id,
+            token,
+            sheet=sheet,
+            offset=offset,
+            limit=limit,
+            columns=[column.strip() for column in columns.split(",") if column.strip()] if columns else None,
+        )
     except PermissionError as exc:
         raise HTTPException(status_code=403, detail="Invalid download token") from exc
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Sheet not found: {sheet}") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _json_response(excel_data, headers)
 
 
 @router.post("/legacy-normalize")
@@ -0,0 +1,182 @@
+"""Multipart uploads streamed straight to disk.
+
+The file part of the request body is written to its destination as it
+arrives, hashed and counted on the way, instead of being buffered by the
+form parser and read back into memory. Memory use per upload stays at one
+network chunk whatever the size of the file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Room for the form's other fields and the multipart framing
+FORM_OVERHEAD = 64 * 1024
+
+
+@dataclass
+class ReceivedUpload:
+    path: Path
+    file_name: str
+    content_type: str | None
+    size: int
+    sha256: str
+    fields: dict[str, str]
+
+
+class _UploadTooLarge(Exception):
+    pass
+
+
+class _StreamingForm:
+    """``MultipartParser`` callbacks that keep the file's data for writing and the fields in memory."""
+
+    def __init__(self, file_field: str, max_bytes: int) -> None:
+        self.file_field = file_field
+        self.max_bytes = max_bytes
+        self.fields: dict[str, str] = {}
+        self.file_name: str | None = None
+        self.content_type: str | None = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+        # File data parsed from the current chunk, written out after each chunk
+        self.pending: list[bytes] = []
+        self._field_bytes = 0
+        self._part_name = ""
+        self._part_is_file = False
+        self._part_headers: dict[bytes, bytes] = {}
+        self._part_data = bytearray()
+        self._header_name = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._part_name = ""
+        self._part_is_file = False
+        self._part_headers = {}
+        self._part_data = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._part_headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._part_headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise HTTPException(status_code=400, detail="Malformed multipart upload")
+        self._part_name = options[b"name"].decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            return
+        if self._part_name != self.file_field or self.file_name is not None:
+            raise HTTPException(status_code=400, detail=f"Only one file is accepted, as '{self.file_field}'")
+        self._part_is_file = True
+        self.file_name = options[b"filename"].decode("utf-8", errors="replace")
+        content_type = self._part_headers.get(b"content-type")
+        self.content_type = content_type.decode("latin-1") if content_type else None
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        chunk = data[start:end]
+        if self._part_is_file:
+            self.size += len(chunk)
+            if self.size > self.max_bytes:
+                raise _UploadTooLarge
+            self.digest.update(chunk)
+            self.pending.append(chunk)
+            return
+        self._field_bytes += len(chunk)
+        if self._field_bytes > FORM_OVERHEAD:
+            raise HTTPException(status_code=400, detail="Form fields are too large")
+        self._part_data.extend(chunk)
+
+    def on_part_end(self) -> None:
+        if not self._part_is_file:
+            self.fields[self._part_name] = self._part_data.decode("utf-8", errors="replace")
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File is larger than the {max_bytes // (1024 * 1024)} MB upload limit",
+    )
+
+
+async def receive_upload(
+    request: Request,
+    directory: Path,
+    *,
+    max_bytes: int,
+    file_field: str = "file",
+) -> ReceivedUpload:
+    """Write the ``file_field`` part of a multipart request into ``directory``.
+
+    Requests whose declared length is already over ``max_bytes`` are refused
+    before their body is read; otherwise the upload is cut off with 413 as soon
+    as the file passes the limit. Nothing is left in ``directory`` on failure.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes + FORM_OVERHEAD:
+        raise _too_large(max_bytes)
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    form = _StreamingForm(file_field, max_bytes)
+    parser = MultipartParser(params[b"boundary"], form.callbacks())
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4().hex}.part"
+    try:
+        with path.open("wb") as out:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if form.pending:
+                    data = b"".join(form.pending)
+                    form.pending.clear()
+                    await asyncio.to_thread(out.write, data)
+            parser.finalize()
+    except _UploadTooLarge:
+        path.unlink(missing_ok=True)
+        raise _too_large(max_bytes) from None
+    except MultipartParseError as exc:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="Malformed multipart upload") from exc
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    if form.file_name is None:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"No file uploaded as '{file_field}'")
+    return ReceivedUpload(
+        path=path,
+        file_name=form.file_name,
+        content_type=form.content_type,
+        size=form.size,
+        sha256=form.digest.hexdigest(),
+        fields=form.fields,
+    )
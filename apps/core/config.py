@@ -72,6 +72,18 @@ class Settings(BaseSettings):
     open_api_key: str | None = Field(default=None, alias="OPEN_API_KEY")
     openai_model: str = Field(default="gpt-4o", alias="OPENAI_MODEL")
 
+    # Statement job queue. Workers run inside the API process unless
+    # STATEMENT_WORKER_EMBEDDED is off, in which case run
+    # `python -m apps.infra.jobs.statement_worker` separately.
+    statement_worker_embedded: bool = Field(default=True, alias="STATEMENT_WORKER_EMBEDDED")
+    statement_worker_concurrency: int = Field(default=2, alias="STATEMENT_WORKER_CONCURRENCY")
+    statement_worker_poll_seconds: float = Field(default=1.0, alias="STATEMENT_WORKER_POLL_SECONDS")
+    statement_job_heartbeat_seconds: float = Field(default=30.0, alias="STATEMENT_JOB_HEARTBEAT_SECONDS")
+    statement_job_stale_seconds: float = Field(default=300.0, alias="STATEMENT_JOB_STALE_SECONDS")
+    statement_job_max_attempts: int = Field(default=3, alias="STATEMENT_JOB_MAX_ATTEMPTS")
+    # Larger statement uploads are refused with 413
+    statement_upload_max_mb: int = Field(default=50, alias="STATEMENT_UPLOAD_MAX_MB")
+
     def model_post_init(self, __context: object) -> None:  # pragma: no cover - simple wiring
         if not self.supabase_service_role and self.supabase_service_role_legacy:
             object.__setattr__(
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import uuid
+from datetime import datetime
 
-from sqlalchemy import String, Text
+from sqlalchemy import DateTime, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -15,6 +16,12 @@ class StatementJob(Base, UUIDPrimaryKeyMixin, TimestampMixin):
     """Statement processing job with persistent storage."""
 
     __tablename__ = "statement_jobs"
+    __table_args__ = (
+        # Workers take the oldest queued job first
+        Index("ix_statement_jobs_status_created_at", "status", "created_at"),
+        # Earlier jobs on the same upload are looked up to reuse their results
+        Index("ix_statement_jobs_content_hash", "content_hash"),
+    )
 
     file_name: Mapped[str] = mapped_column(String(255), nullable=False)
     bank_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -36,6 +43,15 @@ class StatementJob(Base, UUIDPrimaryKeyMixin, TimestampMixin):
     result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # SHA-256 of the uploaded PDF
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+    # Queue bookkeeping: the worker running the job, when it last reported in
+    # and how many times the job has been claimed
+    claimed_by: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
     # For future multi-tenant support
     # user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True, index=True)
 
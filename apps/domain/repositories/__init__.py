@@ -3,9 +3,10 @@
 from apps.domain.repositories.entities import EntityRepository
 from apps.domain.repositories.financial_analysis import FinancialAnalysisJobRepository
 from apps.domain.repositories.pdf_verification import PdfVerificationJobRepository
-from apps.domain.repositories.statements import StatementJobRepository
+from apps.domain.repositories.statements import ClaimLostError, StatementJobRepository
 
 __all__ = [
+    "ClaimLostError",
     "EntityRepository",
     "FinancialAnalysisJobRepository",
     "PdfVerificationJobRepository",
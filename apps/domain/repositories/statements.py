@@ -3,15 +3,21 @@
 from __future__ import annotations
 
 import uuid
+from datetime import timedelta
 from typing import Any
 
 import sqlalchemy as sa
 from sqlalchemy import Select, select
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.domain.models import StatementJob
 
 
+class ClaimLostError(LookupError):
+    """The job is no longer claimed by the worker that tried to write to it."""
+
+
 class StatementJobRepository:
     """Database operations for ``StatementJob`` records."""
 
@@ -26,12 +32,14 @@ class StatementJobRepository:
         payload: dict[str, Any],
         status: str = "queued",
         download_token: uuid.UUID | None = None,
+        content_hash: str | None = None,
     ) -> StatementJob:
         job = StatementJob(
             file_name=file_name,
             bank_name=bank_name,
             status=status,
             payload=payload,
+            content_hash=content_hash,
         )
         if download_token is not None:
             job.download_token = download_token
@@ -51,11 +59,29 @@ class StatementJobRepository:
         result = await self._session.execute(stmt)
         return list(result.scalars().all())
 
+    async def find_completed_by_hash(self, content_hash: str, *, limit: int = 20) -> list[StatementJob]:
+        """Completed jobs on an upload with this SHA-256, newest first."""
+        stmt = (
+            select(StatementJob)
+            .where(StatementJob.content_hash == content_hash, StatementJob.status == "completed")
+            .order_by(StatementJob.created_at.desc())
+            .limit(limit)
+        )
+        result = await self._session.execute(stmt)
+        return list(result.scalars().all())
+
     async def update_fields(
         self,
         job_id: uuid.UUID,
+        *,
+        held_by: str | None = None,
         **fields: Any,
     ) -> StatementJob:
+        """Update columns of the job and return it.
+
+        With ``held_by`` the row is only written while that worker still holds
+        the job's claim; ``ClaimLostError`` is raised otherwise.
+        """
         if not fields:
             result = await self._session.execute(
                 select(StatementJob).where(StatementJob.id == job_id)
@@ -68,16 +94,140 @@ class StatementJobRepository:
         fields.setdefault("updated_at", sa.func.now())
         stmt = (
             sa.update(StatementJob)
-            .where(StatementJob.id == job_id)
+            .where(StatementJob.id == job_id, *self._held_by(held_by))
             .values(**fields)
             .returning(StatementJob)
         )
         result = await self._session.execute(stmt)
         job = result.scalar_one_or_none()
         if job is None:
-            raise LookupError(f"Statement job {job_id} not found")
+            self._raise_missing(job_id, held_by)
         return job
 
+    async def patch_result(
+        self,
+        job_id: uuid.UUID,
+        changes: dict[str, Any],
+        *,
+        held_by: str | None = None,
+        **fields: Any,
+    ) -> None:
+        """Set top-level keys of the job's ``result`` in one statement, with JSONB ``||``.
+
+        Only ``changes`` is sent to the database and nothing is read back, so
+        progress updates stay small however large the stored result is.
+        ``held_by`` guards the write as in ``update_fields``.
+        """
+        fields.setdefault("updated_at", sa.func.now())
+        merged = sa.func.coalesce(StatementJob.result, sa.text("'{}'::jsonb")).op("||", return_type=JSONB)(
+            sa.bindparam("result_changes", changes, type_=JSONB)
+        )
+        stmt = (
+            sa.update(StatementJob)
+            .where(StatementJob.id == job_id, *self._held_by(held_by))
+            .values(result=merged, **fields)
+            .returning(StatementJob.id)
+        )
+        result = await self._session.execute(stmt)
+        if result.scalar_one_or_none() is None:
+            self._raise_missing(job_id, held_by)
+
+    @staticmethod
+    def _held_by(worker_id: str | None) -> tuple[Any, ...]:
+        return () if worker_id is None else (StatementJob.claimed_by == worker_id,)
+
+    @staticmethod
+    def _raise_missing(job_id: uuid.UUID, held_by: str | None) -> None:
+        if held_by is not None:
+            # The row may exist under another worker's claim; the writer has to stop either way
+            raise ClaimLostError(f"Statement job {job_id} is not held by worker {held_by}")
+        raise LookupError(f"Statement job {job_id} not found")
+
+    async def claim_next(self, *, worker_id: str) -> StatementJob | None:
+        """Mark the oldest queued job as running under ``worker_id`` and return it.
+
+        Rows locked by a concurrent claim are skipped, so each job goes to exactly
+        one worker. Returns None when nothing is queued.
+        """
+        next_job = (
+            select(StatementJob.id)
+            .where(StatementJob.status == "queued")
+            .order_by(StatementJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            sa.update(StatementJob)
+            .where(StatementJob.id == next_job)
+            .values(
+                status="running",
+                claimed_by=worker_id,
+                heartbeat_at=sa.func.now(),
+                attempts=StatementJob.attempts + 1,
+                updated_at=sa.func.now(),
+            )
+            .returning(StatementJob)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def heartbeat(self, job_id: uuid.UUID, *, worker_id: str) -> bool:
+        """Record that ``worker_id`` is still running the job; False if it no longer holds it."""
+        stmt = (
+            sa.update(StatementJob)
+            .where(
+                StatementJob.id == job_id,
+                StatementJob.status == "running",
+                StatementJob.claimed_by == worker_id,
+            )
+            .values(heartbeat_at=sa.func.now())
+            .returning(StatementJob.id)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def release(self, *, worker_id: str) -> int:
+        """Put the jobs ``worker_id`` is still running back in the queue, e.g. on shutdown."""
+        stmt = (
+            sa.update(StatementJob)
+            .where(StatementJob.status == "running", StatementJob.claimed_by == worker_id)
+            .values(status="queued", claimed_by=None, heartbeat_at=None, updated_at=sa.func.now())
+            .returning(StatementJob.id)
+        )
+        result = await self._session.execute(stmt)
+        return len(result.all())
+
+    async def recover_stale(self, *, stale_after: timedelta, max_attempts: int) -> tuple[int, int]:
+        """Requeue running jobs whose worker has not reported in for ``stale_after``.
+
+        Jobs already claimed ``max_attempts`` times are failed instead. Jobs
+        started before heartbeats existed are judged by their last update.
+        Returns the number of jobs requeued and failed.
+        """
+        last_seen = sa.func.coalesce(StatementJob.heartbeat_at, StatementJob.updated_at)
+        stale = sa.and_(StatementJob.status == "running", last_seen < sa.func.now() - stale_after)
+
+        failed = await self._session.execute(
+            sa.update(StatementJob)
+            .where(stale, StatementJob.attempts >= max_attempts)
+            .values(
+                status="failed",
+                claimed_by=None,
+                error=f"Job abandoned by its worker {max_attempts} times",
+                updated_at=sa.func.now(),
+            )
+            .returning(StatementJob.id)
+        )
+        failed_count = len(failed.all())
+        requeued = await self._session.execute(
+            sa.update(StatementJob)
+            .where(stale)
+            .values(status="queued", claimed_by=None, heartbeat_at=None, updated_at=sa.func.now())
+            .returning(StatementJob.id)
+        )
+        return len(requeued.all()), failed_count
+
     async def delete(self, job_id: uuid.UUID) -> None:
         await self._session.execute(
             sa.delete(StatementJob).where(StatementJob.id == job_id)
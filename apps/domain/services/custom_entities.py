@@ -215,7 +215,8 @@ class CustomEntityService:
     ) -> list[dict[str, Any]]:
         """Preview where a prospective entity would match existing statement exports."""
 
-        import pandas as pd  # Local import to avoid hard dependency during tests
+        # Local import to avoid a hard pandas dependency during tests
+        from apps.domain.services.statement_sheets import read_sheet
 
         if not statements_dir.exists():
             return []
@@ -231,7 +232,7 @@ class CustomEntityService:
                 continue
 
             try:
-                df = pd.read_excel(excel_file, sheet_name="Transactions")
+                df = read_sheet(excel_file, "Transactions")
             except Exception as exc:
                 LOGGER.warning("Preview failed for %s: %s", excel_file, exc)
                 continue
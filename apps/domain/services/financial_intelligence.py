@@ -16,6 +16,8 @@ from apps.domain.repositories import FinancialAnalysisJobRepository
 
 try:
     import pandas as pd
+
+    from apps.domain.services.statement_sheets import read_sheet
 except ImportError:
     pd = None  # type: ignore
 
@@ -119,8 +121,8 @@ class FinancialIntelligenceService:
                     else:
                         raise FileNotFoundError(f"No processed statement found. Please upload to 'Analyzed Statements' first, then analyze here.")
 
-                # Read transactions from Excel
-                df = pd.read_excel(excel_path, sheet_name="Transactions")
+                # Read transactions from the statement's sheets
+                df = read_sheet(excel_path, "Transactions")
 
                 # Extract and analyze transactions
                 transactions = self._extract_transactions(df)
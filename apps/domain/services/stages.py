@@ -0,0 +1,84 @@
+"""Runs the stages of a job concurrently, as far as their dependencies allow."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+COMPLETED = "completed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A unit of work of a job.
+
+    ``run`` is called with the results of the stages named in ``depends_on``,
+    keyed by stage name, once all of them have completed.
+    """
+
+    name: str
+    run: Callable[[dict[str, Any]], Awaitable[Any]]
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass
+class StageOutcome:
+    status: str
+    result: Any = None
+    error: BaseException | None = None
+    # For skipped stages, the dependencies that did not complete
+    blocked_by: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == COMPLETED
+
+
+def _check_graph(stages: Sequence[Stage]) -> None:
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {names}")
+    remaining = {stage.name: set(stage.depends_on) for stage in stages}
+    for name, dependencies in remaining.items():
+        unknown = dependencies - remaining.keys()
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on unknown stages: {sorted(unknown)}")
+    # Peel off stages whose dependencies are all resolved; whatever is left is a cycle
+    while remaining:
+        ready = [name for name, dependencies in remaining.items() if not dependencies & remaining.keys()]
+        if not ready:
+            raise ValueError(f"Stage dependencies form a cycle: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+
+
+async def run_stages(stages: Sequence[Stage]) -> dict[str, StageOutcome]:
+    """Runs ``stages``, each as soon as the stages it depends on have completed.
+
+    Independent stages run concurrently. A stage that raises is recorded as
+    failed and does not stop the others; only the stages depending on it, directly
+    or not, are skipped. Returns the outcome of every stage by name.
+    """
+    _check_graph(stages)
+    tasks: dict[str, asyncio.Task[StageOutcome]] = {}
+
+    async def execute(stage: Stage) -> StageOutcome:
+        upstream = {name: await tasks[name] for name in stage.depends_on}
+        blocked_by = [name for name, outcome in upstream.items() if not outcome.ok]
+        if blocked_by:
+            return StageOutcome(SKIPPED, blocked_by=blocked_by)
+        try:
+            result = await stage.run({name: outcome.result for name, outcome in upstream.items()})
+        except Exception as exc:
+            return StageOutcome(FAILED, error=exc)
+        return StageOutcome(COMPLETED, result=result)
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(execute(stage), name=f"stage:{stage.name}")
+    # Cancelling the caller cancels every stage still running
+    await asyncio.gather(*tasks.values())
+    return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,201 @@
+"""Columnar sidecars of statement workbooks.
+
+Every sheet of a job's ``statement.xlsx`` is also stored as Parquet in a
+``statement.xlsx.sheets`` directory next to it, so readers load columns instead
+of parsing the workbook XML on every request. The sidecar holds exactly what
+``pd.read_excel`` returns for each sheet. It is only used while the workbook is
+the one it was written from; otherwise, or when pyarrow is not installed,
+readers fall back to the workbook.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  # needed by DataFrame.to_parquet / read_parquet
+except ImportError:
+    pyarrow = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = ".sheets"
+MANIFEST_NAME = "manifest.json"
+
+
+def sidecar_dir(excel_path: str | Path) -> Path:
+    excel_path = Path(excel_path)
+    return excel_path.with_name(excel_path.name + SIDECAR_SUFFIX)
+
+
+def _workbook_version(excel_path: Path) -> list[int]:
+    stat = excel_path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _replace_file(path: Path, write: Any) -> None:
+    # Readers never see a half-written file
+    temp_path = path.with_name(path.name + ".tmp")
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+def _load_manifest(excel_path: Path) -> dict[str, Any] | None:
+    """The sidecar manifest, if there is one and it was written for the workbook as it is now."""
+    if pyarrow is None:
+        return None
+    try:
+        manifest = json.loads((sidecar_dir(excel_path) / MANIFEST_NAME).read_text())
+        if manifest.get("workbook") != _workbook_version(excel_path):
+            return None
+    except (OSError, ValueError):
+        return None
+    return manifest
+
+
+def _write_manifest(excel_path: Path, sheet_names: list[str], files: dict[str, str]) -> None:
+    manifest = {"workbook": _workbook_version(excel_path), "sheet_names": sheet_names, "files": files}
+    _replace_file(
+        sidecar_dir(excel_path) / MANIFEST_NAME,
+        lambda path: path.write_text(json.dumps(manifest)),
+    )
+
+
+def _write_parquet(directory: Path, file_name: str, df: pd.DataFrame) -> bool:
+    try:
+        _replace_file(directory / file_name, lambda path: df.to_parquet(path, index=False))
+    except (ValueError, TypeError, pyarrow.ArrowException) as exc:
+        # e.g. numeric header cells or columns mixing text and numbers; read from the workbook
+        LOGGER.debug("Sheet not stored as Parquet (%s): %s", file_name, exc)
+        return False
+    return True
+
+
+def write_sheet_sidecar(excel_path: str | Path) -> Path | None:
+    """Stores every sheet of the workbook at ``excel_path`` as Parquet next to it.
+
+    The workbook is parsed once here; afterwards `read_sheet` and `read_sheets`
+    load the sidecar. Returns the sidecar directory, or None if pyarrow is missing.
+    """
+    if pyarrow is None:
+        return None
+    excel_path = Path(excel_path)
+    directory = sidecar_dir(excel_path)
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+
+    sheets = pd.read_excel(excel_path, sheet_name=None)
+    files = {}
+    for index, (sheet_name, df) in enumerate(sheets.items()):
+        file_name = f"{index:02d}.parquet"
+        if _write_parquet(directory, file_name, df):
+            files[sheet_name] = file_name
+    _write_manifest(excel_path, list(sheets), files)
+    return directory
+
+
+def _read_parquet(path: Path) -> pd.DataFrame:
+    df = pd.read_parquet(path)
+    # Empty text cells come back as None; read_excel gives NaN
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+
+def read_sheet(excel_path: str | Path, sheet_name: str) -> pd.DataFrame:
+    """Returns the sheet ``sheet_name`` of the workbook, from its sidecar when it has a current one."""
+    excel_path = Path(excel_path)
+    manifest = _load_manifest(excel_path)
+    if manifest and sheet_name in manifest["files"]:
+        try:
+            return _read_parquet(sidecar_dir(excel_path) / manifest["files"][sheet_name])
+        except (OSError, ValueError, pyarrow.ArrowException) as exc:
+            LOGGER.warning("Sidecar of %s unreadable, using the workbook: %s", excel_path, exc)
+    return pd.read_excel(excel_path, sheet_name=sheet_name)
+
+
+def read_sheets(excel_path: str | Path) -> dict[str, pd.DataFrame]:
+    """Returns every sheet of the workbook by name, in workbook order."""
+    excel_path = Path(excel_path)
+    manifest = _load_manifest(excel_path)
+    if manifest is None:
+        return pd.read_excel(excel_path, sheet_name=None)
+    # Sheets without a Parquet copy are parsed together, in one pass over the workbook
+    missing = [sheet_name for sheet_name in manifest["sheet_names"] if sheet_name not in manifest["files"]]
+    parsed = pd.read_excel(excel_path, sheet_name=missing) if missing else {}
+    return {
+        sheet_name: parsed[sheet_name] if sheet_name in parsed else read_sheet(excel_path, sheet_name)
+        for sheet_name in manifest["sheet_names"]
+    }
+
+
+def sheet_names(excel_path: str | Path) -> list[str]:
+    """Returns the sheet names of the workbook, in workbook order."""
+    excel_path = Path(excel_path)
+    manifest = _load_manifest(excel_path)
+    if manifest is not None:
+        return list(manifest["sheet_names"])
+    with pd.ExcelFile(excel_path) as excel_file:
+        return list(excel_file.sheet_names)
+
+
+def sheet_page(
+    df: pd.DataFrame,
+    offset: int = 0,
+    limit: int | None = None,
+    columns: list[str] | None = None,
+) -> dict[str, Any]:
+    """Returns rows ``offset`` to ``offset + limit`` of a sheet as JSON-ready records.
+
+    ``columns`` keeps only the named columns, in that order; an unknown name
+    raises ValueError. Counts are of the whole sheet, so clients can page it.
+    """
+    if columns:
+        labels = {str(column): column for column in df.columns}
+        unknown = [column for column in columns if column not in labels]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        df = df[[labels[column] for column in columns]]
+    page = df.iloc[offset:] if limit is None else df.iloc[offset:offset + limit]
+    return {
+        "columns": df.columns.tolist(),
+        "data": page.fillna("").to_dict(orient="records"),
+        "row_count": len(df),
+        "column_count": len(df.columns),
+        "offset": offset,
+        "limit": limit,
+    }
+
+
+def replace_sheet(excel_path: str | Path, sheet_name: str, df: pd.DataFrame) -> None:
+    """Rewrites one sheet of the workbook and keeps its sidecar in step with it."""
+    excel_path = Path(excel_path)
+    manifest = _load_manifest(excel_path)
+
+    with pd.ExcelWriter(
+        excel_path,
+        engine="openpyxl",
+        mode="a",
+        if_sheet_exists="replace",
+    ) as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    if manifest is None:
+        return
+    directory = sidecar_dir(excel_path)
+    if sheet_name not in manifest["sheet_names"]:
+        # A new sheet is appended after the others
+        manifest["sheet_names"].append(sheet_name)
+    file_name = manifest["files"].pop(sheet_name, None) or f"{manifest['sheet_names'].index(sheet_name):02d}.parquet"
+    # Store what reading the sheet back gives, as write_sheet_sidecar does
+    if _write_parquet(directory, file_name, pd.read_excel(excel_path, sheet_name=sheet_name)):
+        manifest["files"][sheet_name] = file_name
+    _write_manifest(excel_path, manifest["sheet_names"], manifest["files"])
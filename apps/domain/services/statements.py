@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import logging
+import os
 import shutil
 import warnings
 from dataclasses import dataclass
@@ -15,12 +17,23 @@ import uuid
 import pandas as pd
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from apps.domain.repositories import EntityRepository, StatementJobRepository
+from apps.domain.models import StatementJob
+from apps.domain.repositories import ClaimLostError, EntityRepository, StatementJobRepository
 from apps.domain.schemas.mistral import MistralOcrResponse
 from apps.domain.services.custom_entities import CustomEntityService
 from apps.domain.services.entity_extraction import EntityExtractionService
 from apps.domain.services.mistral import MistralOcrOptions, MistralOcrService
 from apps.domain.services.reports import AiReportService
+from apps.domain.services.statement_sheets import (
+    read_sheet,
+    read_sheets,
+    replace_sheet,
+    sheet_names,
+    sheet_page,
+    sidecar_dir,
+    write_sheet_sidecar,
+)
+from apps.domain.services.stages import FAILED, Stage, run_stages
 from apps.legacy_bridge.adapter import run_legacy
 
 try:  # pandas optional import for warnings
@@ -31,6 +44,18 @@ except Exception:  # pragma: no cover
 
 LOGGER = logging.getLogger(__name__)
 
+# Job options that change what a job produces; an upload seen before reuses
+# an earlier job's results only when all of them are the same
+REUSE_OPTIONS = ("bank_name", "password", "financial_year", "prompt", "template")
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    # Sidecar and report files are only ever replaced, never written in place
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
 
 @dataclass
 class StatementJobContext:
@@ -43,6 +68,8 @@ class StatementJobContext:
     financial_year: str | None
     prompt: str | None
     template: str | None
+    # The worker holding the job; its writes are dropped once another worker takes over
+    claimed_by: str | None = None
 
     def parse_financial_year(self) -> tuple[str, str]:
         """Parse financial year (e.g., '2022-2023') into start and end dates.
@@ -97,17 +124,31 @@ class StatementPipelineService:
         job_dir.mkdir(parents=True, exist_ok=True)
         return job_dir
 
+    @property
+    def upload_dir(self) -> Path:
+        """Where uploads are written while they arrive, on the same disk as the jobs."""
+        return self._workspace / "uploads"
+
     async def create_job(
         self,
         *,
-        file_bytes: bytes,
+        upload_path: Path,
+        content_hash: str,
         file_name: str,
         bank_name: str | None,
         password: str | None,
         financial_year: str | None,
         prompt: str | None,
         template: str | None,
+        force_recompute: bool = False,
     ) -> dict[str, Any]:
+        """Queue a job for the upload at ``upload_path``, or complete it at once from an earlier job.
+
+        The upload is moved into the job's directory. An earlier completed job
+        on the same file (``content_hash`` is its SHA-256) with the same options
+        has its artifacts copied to the new job instead of running OCR,
+        extraction and the AI report again, unless ``force_recompute`` is set.
+        """
         download_token = uuid.uuid4()
         payload = {
             "file_name": file_name,
@@ -120,34 +161,110 @@ class StatementPipelineService:
 
         async with self._session_factory() as session:
             repo = StatementJobRepository(session)
+            source = None
+            if not force_recompute:
+                source = await self._find_reusable_job(repo, content_hash, payload)
             job = await repo.create_job(
                 file_name=file_name,
                 bank_name=bank_name,
                 payload=payload,
                 download_token=download_token,
+                content_hash=content_hash,
             )
+            # The upload is on disk before the job becomes visible to workers
+            pdf_path = self._job_dir(job.id) / file_name
+            os.replace(upload_path, pdf_path)
+
+            if source is not None:
+                try:
+                    job.result = await asyncio.to_thread(
+                        self._reuse_artifacts,
+                        source,
+                        job.id,
+                        file_name,
+                        download_token,
+                    )
+                    job.status = "completed"
+                    LOGGER.info("Job %s reuses the results of job %s", job.id, source.id)
+                except OSError as exc:
+                    LOGGER.warning("Job %s could not reuse job %s, processing again: %s", job.id, source.id, exc)
             await session.commit()
             await session.refresh(job)
             job_snapshot = job.as_dict()
 
-        job_dir = self._job_dir(job.id)
-        pdf_path = job_dir / file_name
-        pdf_path.write_bytes(file_bytes)
+        # Queued; a statement worker (apps.infra.jobs.statement_worker) claims and runs it
+        return job_snapshot
+
+    async def _find_reusable_job(
+        self,
+        repo: StatementJobRepository,
+        content_hash: str,
+        payload: dict[str, Any],
+    ) -> StatementJob | None:
+        for candidate in await repo.find_completed_by_hash(content_hash):
+            options = candidate.payload or {}
+            if any(options.get(name) != payload.get(name) for name in REUSE_OPTIONS):
+                continue
+            excel_path = ((candidate.result or {}).get("excel") or {}).get("path")
+            if excel_path and Path(excel_path).exists():
+                return candidate
+        return None
+
+    def _reuse_artifacts(
+        self,
+        source: StatementJob,
+        job_id: uuid.UUID,
+        file_name: str,
+        download_token: uuid.UUID,
+    ) -> dict[str, Any]:
+        """Copy the artifacts of ``source`` into the job's directory; returns the job's result."""
+        job_dir = self._job_dir(job_id)
+        result = copy.deepcopy(source.result)
 
+        # Copied rather than linked: entity edits rewrite the workbook in place.
+        # copy2 keeps the modification time, so the copied sidecar stays current.
+        source_excel = Path(result["excel"]["path"])
+        target_excel = job_dir / "statement.xlsx"
+        shutil.copy2(source_excel, target_excel)
+        if sidecar_dir(source_excel).is_dir():
+            shutil.copytree(sidecar_dir(source_excel), sidecar_dir(target_excel), copy_function=_link_or_copy)
+        result["excel"] = {"path": str(target_excel), "download_token": str(download_token)}
+
+        report = result.get("report")
+        if report:
+            source_pdf = Path(report["pdf_path"])
+            if source_pdf.exists():
+                target_report = job_dir / "report"
+                shutil.copytree(source_pdf.parent, target_report, copy_function=_link_or_copy, dirs_exist_ok=True)
+                report["pdf_path"] = str(target_report / source_pdf.name)
+            else:
+                result["report"] = None
+
+        # The same statement may have been uploaded under another name
+        result["file_name"] = file_name
+        now = datetime.now(timezone.utc).isoformat()
+        result["started_at"] = now
+        result["completed_at"] = now
+        result["total_duration_ms"] = 0
+        result["reused_from"] = str(source.id)
+        return result
+
+    async def run_claimed_job(self, job: StatementJob) -> None:
+        """Run a job that a worker has claimed from the queue."""
+        payload = job.payload or {}
         context = StatementJobContext(
             job_id=job.id,
-            download_token=download_token,
-            file_path=pdf_path,
-            file_name=file_name,
-            bank_name=bank_name,
-            password=password,
-            financial_year=financial_year,
-            prompt=prompt,
-            template=template,
+            download_token=job.download_token,
+            file_path=self._job_dir(job.id) / job.file_name,
+            file_name=job.file_name,
+            bank_name=job.bank_name,
+            password=payload.get("password"),
+            financial_year=payload.get("financial_year"),
+            prompt=payload.get("prompt"),
+            template=payload.get("template"),
+            claimed_by=job.claimed_by,
         )
-
-        asyncio.create_task(self._run_job(context))
-        return job_snapshot
+        await self._run_job(context)
 
     async def _run_job(self, context: StatementJobContext) -> None:
         job_id_str = str(context.job_id)
@@ -156,117 +273,168 @@ class StatementPipelineService:
         started_at = datetime.now(timezone.utc)
         job_dir = self._job_dir(context.job_id)
 
+        result: dict[str, Any] = {
+            "file_name": context.file_name,
+            "excel": {"path": None, "download_token": str(context.download_token)},
+            "report": None,
+            "ocr": None,
+            "preview": None,
+            "stages": stages,
+            "started_at": started_at.isoformat(),
+            "completed_at": None,
+            "report_template": context.template,
+        }
+
+        LOGGER.debug("Job %s stage=queued payload=%s", job_id_str, result)
         async with self._session_factory() as session:
             repo = StatementJobRepository(session)
-            entity_repo = EntityRepository(session)
-            entity_service = CustomEntityService(session)
-
-            await repo.update_fields(context.job_id, status="running")
-            await session.commit()
-
-            result: dict[str, Any] = {
-                "file_name": context.file_name,
-                "excel": {"path": None, "download_token": str(context.download_token)},
-                "report": None,
-                "ocr": None,
-                "preview": None,
-                "stages": stages,
-                "started_at": started_at.isoformat(),
-                "completed_at": None,
-                "report_template": context.template,
-            }
-            LOGGER.debug("Job %s stage=queued payload=%s", job_id_str, result)
-            await repo.update_fields(context.job_id, result=result)
-            await session.commit()
-
             try:
-                ocr_result: MistralOcrResponse | None = None
-                if self._mistral and hasattr(self._mistral, "analyze"):
-                    try:
-                        stage_start = datetime.now(timezone.utc)
-                        ocr_result = await self._run_ocr(context)
-                        result["ocr"] = self._trim_ocr_payload(ocr_result)
-                        stages.append(self._stage("OCR & parsing", stage_start))
-                        LOGGER.info("Job %s OCR complete", job_id_str)
-                        await repo.update_fields(context.job_id, result=result)
-                        await session.commit()
-                    except Exception as ocr_error:
-                        LOGGER.warning("Job %s OCR skipped: %s", job_id_str, ocr_error)
-
-                stage_start = datetime.now(timezone.utc)
-                excel_path, legacy_summary, preview = await asyncio.to_thread(
-                    self._run_legacy,
-                    context,
-                    job_dir,
+                await repo.update_fields(
+                    context.job_id, held_by=context.claimed_by, status="running", result=result
                 )
-                result["excel"] = {
-                    "path": excel_path,
-                    "download_token": str(context.download_token),
-                }
-                result["preview"] = preview
-                result["sheets_available"] = bool(legacy_summary.get("sheets_data"))
-                stages.append(self._stage("Ledger normalisation", stage_start))
-                LOGGER.info("Job %s ledger normalised (excel=%s)", job_id_str, excel_path)
-                await repo.update_fields(context.job_id, result=result)
-                await session.commit()
+            except ClaimLostError as exc:
+                LOGGER.warning("Job %s not started: %s", job_id_str, exc)
+                return
+            await session.commit()
 
-                stage_start = datetime.now(timezone.utc)
-                entity_count = await self._perform_entity_matching(
-                    session=session,
-                    entity_service=entity_service,
-                    entity_repo=entity_repo,
-                    job_id=context.job_id,
-                    excel_path=excel_path,
-                )
-                if entity_count > 0:
-                    result["entity_count"] = entity_count
-                    stages.append(self._stage("Entity extraction", stage_start))
-                    LOGGER.info(
-                        "Job %s entities extracted (found in %d descriptions)",
-                        job_id_str,
-                        entity_count,
+        # Stages run concurrently and a session is not safe to share between
+        # tasks, so each write gets its own; the lock keeps them in order.
+        persist_lock = asyncio.Lock()
+
+        async def record_progress(**changes: Any) -> None:
+            # Only the small keys the UI polls for; OCR text, the preview and
+            # the report go into the final write
+            async with persist_lock:
+                async with self._session_factory() as session:
+                    await StatementJobRepository(session).patch_result(
+                        context.job_id, changes, held_by=context.claimed_by
                     )
-                    await repo.update_fields(context.job_id, result=result)
                     await session.commit()
 
-                if self._reports.available() and ocr_result:
-                    stage_start = datetime.now(timezone.utc)
-                    report_payload = await asyncio.to_thread(
-                        self._build_report,
-                        legacy_summary,
-                        ocr_result,
-                        context.prompt,
-                        context.template,
-                        context.job_id,
+        async def persist(**fields: Any) -> None:
+            async with persist_lock:
+                async with self._session_factory() as session:
+                    await StatementJobRepository(session).update_fields(
+                        context.job_id, held_by=context.claimed_by, **fields
                     )
-                    if report_payload:
-                        result["report"] = report_payload
-                        stages.append(self._stage("AI custom report", stage_start))
-                        LOGGER.info("Job %s AI report generated", job_id_str)
-                        await repo.update_fields(context.job_id, result=result)
-                        await session.commit()
-
-                completed_at = datetime.now(timezone.utc)
-                result["completed_at"] = completed_at.isoformat()
-                result["total_duration_ms"] = int(
-                    (completed_at - started_at).total_seconds() * 1000
-                )
+                    await session.commit()
 
-                LOGGER.info("Job %s completed", job_id_str)
-                await repo.update_fields(
-                    context.job_id,
-                    status="completed",
-                    result=result,
+        async def run_ocr(_: dict[str, Any]) -> MistralOcrResponse | None:
+            if not (self._mistral and hasattr(self._mistral, "analyze")):
+                return None
+            stage_start = datetime.now(timezone.utc)
+            ocr_result = await self._run_ocr(context)
+            result["ocr"] = self._trim_ocr_payload(ocr_result)
+            stages.append(self._stage("OCR & parsing", stage_start))
+            LOGGER.info("Job %s OCR complete", job_id_str)
+            await record_progress(stages=stages)
+            return ocr_result
+
+        async def run_ledger(_: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+            stage_start = datetime.now(timezone.utc)
+            excel_path, legacy_summary, preview = await asyncio.to_thread(
+                self._run_legacy,
+                context,
+                job_dir,
+            )
+            result["excel"] = {
+                "path": excel_path,
+                "download_token": str(context.download_token),
+            }
+            result["preview"] = preview
+            result["sheets_available"] = bool(legacy_summary.get("sheets_data"))
+            stages.append(self._stage("Ledger normalisation", stage_start))
+            LOGGER.info("Job %s ledger normalised (excel=%s)", job_id_str, excel_path)
+            await record_progress(
+                excel=result["excel"],
+                sheets_available=result["sheets_available"],
+                stages=stages,
+            )
+            return excel_path, legacy_summary
+
+        async def run_entities(upstream: dict[str, Any]) -> None:
+            excel_path, _ = upstream["ledger"]
+            stage_start = datetime.now(timezone.utc)
+            async with self._session_factory() as session:
+                entity_count = await self._perform_entity_matching(
+                    session=session,
+                    entity_service=CustomEntityService(session),
+                    entity_repo=EntityRepository(session),
+                    job_id=context.job_id,
+                    excel_path=excel_path,
                 )
                 await session.commit()
-            except Exception as exc:  # pragma: no cover - best effort demo error handling
-                LOGGER.exception("Job %s failed: %s", job_id_str, exc)
-                await repo.update_fields(
-                    context.job_id,
-                    status="failed",
-                    error=str(exc),
+            if entity_count > 0:
+                result["entity_count"] = entity_count
+                stages.append(self._stage("Entity extraction", stage_start))
+                LOGGER.info(
+                    "Job %s entities extracted (found in %d descriptions)",
+                    job_id_str,
+                    entity_count,
                 )
-                await session.commit()
+                await record_progress(entity_count=entity_count, stages=stages)
+
+        async def run_report(upstream: dict[str, Any]) -> None:
+            ocr_result = upstream["ocr"]
+            _, legacy_summary = upstream["ledger"]
+            if not (self._reports.available() and ocr_result):
+                return
+            stage_start = datetime.now(timezone.utc)
+            report_payload = await asyncio.to_thread(
+                self._build_report,
+                legacy_summary,
+                ocr_result,
+                context.prompt,
+                context.template,
+                context.job_id,
+            )
+            if report_payload:
+                result["report"] = report_payload
+                stages.append(self._stage("AI custom report", stage_start))
+                LOGGER.info("Job %s AI report generated", job_id_str)
+                await record_progress(stages=stages)
+
+        try:
+            # OCR and ledger extraction both only read the upload, so they overlap
+            outcomes = await run_stages([
+                Stage("ocr", run_ocr),
+                Stage("ledger", run_ledger),
+                Stage("entities", run_entities, depends_on=("ledger",)),
+                Stage("report", run_report, depends_on=("ocr", "ledger")),
+            ])
+
+            stage_errors = {
+                name: str(outcome.error)
+                for name, outcome in outcomes.items()
+                if outcome.status == FAILED
+            }
+            for name, message in stage_errors.items():
+                LOGGER.warning("Job %s stage %s failed: %s", job_id_str, name, message)
+            if stage_errors:
+                result["stage_errors"] = stage_errors
+
+            # Without the ledger there is nothing to download
+            ledger = outcomes["ledger"]
+            if not ledger.ok:
+                raise ledger.error or RuntimeError("Ledger normalisation did not run")
+
+            completed_at = datetime.now(timezone.utc)
+            result["completed_at"] = completed_at.isoformat()
+            result["total_duration_ms"] = int(
+                (completed_at - started_at).total_seconds() * 1000
+            )
+
+            LOGGER.info("Job %s completed", job_id_str)
+            await persist(status="completed", result=result)
+        except ClaimLostError as exc:
+            # Another worker is running the job now; its outcome is the one kept
+            LOGGER.warning("Job %s dropped: %s", job_id_str, exc)
+        except Exception as exc:  # pragma: no cover - best effort demo error handling
+            LOGGER.exception("Job %s failed: %s", job_id_str, exc)
+            try:
+                await persist(status="failed", error=str(exc), result=result)
+            except ClaimLostError as lost:
+                LOGGER.warning("Job %s dropped: %s", job_id_str, lost)
 
     def _stage(self, name: str, started_at: datetime) -> dict[str, Any]:
         finished = datetime.now(timezone.utc)
@@ -321,8 +489,23 @@ class StatementPipelineService:
                 raise FileNotFoundError(path)
             return path
 
-    async def get_excel_data(self, job_id: str, token: str) -> dict[str, Any]:
-        """Read Excel file and return all sheets with their data as JSON."""
+    async def get_excel_data(
+        self,
+        job_id: str,
+        token: str,
+        *,
+        sheet: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        columns: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Read the Excel export and return its sheets as JSON-ready rows.
+
+        With ``sheet`` only that sheet is returned, otherwise every sheet.
+        ``offset``/``limit`` page the rows and ``columns`` selects columns of
+        each sheet returned. Raises KeyError for an unknown sheet and ValueError
+        for an unknown column.
+        """
         job_uuid = uuid.UUID(job_id)
         async with self._session_factory() as session:
             repo = StatementJobRepository(session)
@@ -339,25 +522,24 @@ class StatementPipelineService:
             if not path.exists():
                 raise FileNotFoundError(path)
 
-        # Read all sheets from Excel file
-        excel_file = pd.ExcelFile(path)
-        sheets_data = {}
-
-        for sheet_name in excel_file.sheet_names:
-            df = pd.read_excel(excel_file, sheet_name=sheet_name)
-            # Convert DataFrame to dict with proper handling of NaN values
-            sheets_data[sheet_name] = {
-                "columns": df.columns.tolist(),
-                "data": df.fillna("").to_dict(orient="records"),
-                "row_count": len(df),
-                "column_count": len(df.columns),
-            }
+        def read_pages() -> tuple[list[str], dict[str, Any]]:
+            # From the Parquet sidecar when the job has one
+            names = sheet_names(path)
+            if sheet is None:
+                sheets = read_sheets(path)
+            elif sheet in names:
+                sheets = {sheet: read_sheet(path, sheet)}
+            else:
+                raise KeyError(sheet)
+            pages = {name: sheet_page(df, offset, limit, columns) for name, df in sheets.items()}
+            return names, pages
 
+        names, sheets_data = await asyncio.to_thread(read_pages)
         return {
             "job_id": job_id,
             "file_name": job.result.get("file_name", "statement.xlsx"),
             "sheets": sheets_data,
-            "sheet_names": excel_file.sheet_names,
+            "sheet_names": names,
         }
 
     async def _run_ocr(self, context: StatementJobContext) -> MistralOcrResponse:
@@ -398,6 +580,11 @@ class StatementPipelineService:
         except FileNotFoundError:
             target_excel = Path(excel_path)
 
+        try:
+            write_sheet_sidecar(target_excel)
+        except Exception as exc:  # pragma: no cover - readers fall back to the workbook
+            LOGGER.warning("Sheet sidecar not written for %s: %s", target_excel, exc)
+
         summary["excel_path"] = str(target_excel)
         preview = self._build_preview(summary)
         summary["preview"] = preview
@@ -417,7 +604,7 @@ class StatementPipelineService:
         transactions_preview: list[dict[str, Any]] = []
         totals = {"credits": 0.0, "debits": 0.0}
         try:
-            df = pd.read_excel(excel_path, sheet_name="Transactions")
+            df = read_sheet(excel_path, "Transactions")
             totals["credits"] = float(df.get("Credit", pd.Series(dtype=float)).fillna(0).sum())
             totals["debits"] = float(df.get("Debit", pd.Series(dtype=float)).fillna(0).sum())
             transactions_preview = df.head(10).fillna("-").to_dict(orient="records")
@@ -465,7 +652,7 @@ class StatementPipelineService:
         excel_path: str,
     ) -> int:
         try:
-            df = pd.read_excel(excel_path, sheet_name="Transactions")
+            df = read_sheet(excel_path, "Transactions")
         except Exception as exc:
             LOGGER.warning("Entity extraction skipped for %s: %s", excel_path, exc)
             return 0
@@ -515,13 +702,7 @@ class StatementPipelineService:
         df["Entity"] = df["Entity"].replace("", "-")
         df["Entity Source"] = df["Description"].map(resolve_source)
 
-        with pd.ExcelWriter(
-            excel_path,
-            engine="openpyxl",
-            mode="a",
-            if_sheet_exists="replace",
-        ) as writer:
-            df.to_excel(writer, sheet_name="Transactions", index=False)
+        replace_sheet(excel_path, "Transactions", df)
 
         match_records = []
         for _, row in df.iterrows():
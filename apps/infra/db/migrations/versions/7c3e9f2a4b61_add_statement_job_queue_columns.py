@@ -0,0 +1,54 @@
+"""add_statement_job_queue_columns
+
+Revision ID: 7c3e9f2a4b61
+Revises: 1a5237500fd4
+Create Date: 2026-10-16 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3e9f2a4b61"
+down_revision: Union[str, Sequence[str], None] = "1a5237500fd4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Let workers claim statement jobs from the table and recover abandoned claims."""
+
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("statement_jobs")}
+
+    if "claimed_by" not in columns:
+        op.add_column("statement_jobs", sa.Column("claimed_by", sa.String(length=255), nullable=True))
+    if "heartbeat_at" not in columns:
+        op.add_column("statement_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+    if "attempts" not in columns:
+        op.add_column(
+            "statement_jobs",
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        )
+
+    # Workers take the oldest queued job first
+    op.create_index(
+        "ix_statement_jobs_status_created_at",
+        "statement_jobs",
+        ["status", "created_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the queue bookkeeping columns."""
+
+    op.drop_index("ix_statement_jobs_status_created_at", table_name="statement_jobs")
+    op.drop_column("statement_jobs", "attempts")
+    op.drop_column("statement_jobs", "heartbeat_at")
+    op.drop_column("statement_jobs", "claimed_by")
@@ -0,0 +1,44 @@
+"""add_statement_job_content_hash
+
+Revision ID: 9d4b1e7c2f83
+Revises: 7c3e9f2a4b61
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4b1e7c2f83"
+down_revision: Union[str, Sequence[str], None] = "7c3e9f2a4b61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Record the hash of each uploaded statement so repeat uploads reuse earlier results."""
+
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("statement_jobs")}
+
+    if "content_hash" not in columns:
+        op.add_column("statement_jobs", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+    op.create_index(
+        "ix_statement_jobs_content_hash",
+        "statement_jobs",
+        ["content_hash"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the upload hash."""
+
+    op.drop_index("ix_statement_jobs_content_hash", table_name="statement_jobs")
+    op.drop_column("statement_jobs", "content_hash")
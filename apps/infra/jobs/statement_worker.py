@@ -0,0 +1,199 @@
+"""Worker pool for statement jobs queued in the ``statement_jobs`` table.
+
+Jobs are claimed one at a time (``SELECT ... FOR UPDATE SKIP LOCKED``), so any
+number of workers, in the API process or on their own, can share the queue.
+Each worker runs at most ``concurrency`` jobs at once and reports in on every
+job it holds; jobs whose worker stops reporting are requeued. A worker that
+finds it has lost a job's claim abandons the job, and a stopping worker lets
+its running jobs finish: the legacy extraction runs in a thread that
+cancellation cannot stop, so requeueing earlier would run the job twice.
+
+Run standalone with ``python -m apps.infra.jobs.statement_worker``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from apps.domain.models import StatementJob
+from apps.domain.repositories import StatementJobRepository
+
+LOGGER = logging.getLogger(__name__)
+
+
+class StatementJobWorker:
+    """Claims queued statement jobs and runs up to ``concurrency`` of them at a time."""
+
+    def __init__(
+        self,
+        *,
+        pipeline: Any,
+        session_factory: async_sessionmaker[AsyncSession],
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = 30.0,
+        stale_after: float = 300.0,
+        max_attempts: int = 3,
+        worker_id: str | None = None,
+    ) -> None:
+        self._pipeline = pipeline
+        self._session_factory = session_factory
+        self._concurrency = max(1, concurrency)
+        self._poll_interval = poll_interval
+        self._heartbeat_interval = heartbeat_interval
+        self._stale_after = timedelta(seconds=stale_after)
+        self._max_attempts = max_attempts
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: set[asyncio.Task[None]] = set()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Run jobs until ``stop`` is set, then wait for the running ones to finish."""
+        LOGGER.info("Statement worker %s started (concurrency=%d)", self.worker_id, self._concurrency)
+        recovered_at = 0.0
+        loop = asyncio.get_running_loop()
+        try:
+            while not stop.is_set():
+                try:
+                    # Crashes are rare; look for stale claims about once a heartbeat
+                    if loop.time() - recovered_at >= self._heartbeat_interval:
+                        await self.recover_stale()
+                        recovered_at = loop.time()
+
+                    while len(self._running) < self._concurrency:
+                        job = await self._claim()
+                        if job is None:
+                            break
+                        task = asyncio.create_task(self._process(job))
+                        self._running.add(task)
+                        task.add_done_callback(self._running.discard)
+                except Exception as exc:  # pragma: no cover - e.g. the database is briefly unreachable
+                    LOGGER.warning("Statement worker %s could not poll the queue: %s", self.worker_id, exc)
+
+                # Wake up when a slot frees or it is time to poll again
+                stopped = asyncio.create_task(stop.wait())
+                await asyncio.wait(
+                    [stopped, *self._running],
+                    timeout=self._poll_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                stopped.cancel()
+        finally:
+            await self._shutdown()
+
+    async def recover_stale(self) -> None:
+        async with self._session_factory() as session:
+            repo = StatementJobRepository(session)
+            requeued, failed = await repo.recover_stale(
+                stale_after=self._stale_after,
+                max_attempts=self._max_attempts,
+            )
+            await session.commit()
+        if requeued or failed:
+            LOGGER.warning("Recovered stale statement jobs: %d requeued, %d failed", requeued, failed)
+
+    async def _claim(self) -> StatementJob | None:
+        async with self._session_factory() as session:
+            repo = StatementJobRepository(session)
+            job = await repo.claim_next(worker_id=self.worker_id)
+            await session.commit()
+        return job
+
+    async def _process(self, job: StatementJob) -> None:
+        LOGGER.info("Worker %s claimed job %s (attempt %d)", self.worker_id, job.id, job.attempts)
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        run = asyncio.create_task(self._pipeline.run_claimed_job(job))
+        abandoned = False
+        try:
+            await asyncio.wait([run, heartbeat], return_when=asyncio.FIRST_COMPLETED)
+            if not run.done():
+                # The heartbeat only returns once another worker holds the job. Writes
+                # the pipeline makes before the cancellation lands are refused by the
+                # claim check in the repository.
+                LOGGER.warning("Worker %s abandons job %s", self.worker_id, job.id)
+                abandoned = True
+                run.cancel()
+            await run
+        except asyncio.CancelledError:
+            if not abandoned:
+                raise
+        except Exception:  # pragma: no cover - the pipeline records its own failures
+            LOGGER.exception("Statement job %s crashed", job.id)
+        finally:
+            heartbeat.cancel()
+            run.cancel()
+
+    async def _heartbeat(self, job_id: uuid.UUID) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                async with self._session_factory() as session:
+                    held = await StatementJobRepository(session).heartbeat(job_id, worker_id=self.worker_id)
+                    await session.commit()
+            except Exception as exc:  # pragma: no cover - retried on the next beat
+                LOGGER.warning("Heartbeat for job %s failed: %s", job_id, exc)
+                continue
+            if not held:
+                LOGGER.warning("Worker %s no longer holds job %s", self.worker_id, job_id)
+                return
+
+    async def _shutdown(self) -> None:
+        # Cancelling a job would not stop its extraction thread, so the jobs are
+        # left to finish, still heartbeating, before any claim is given up
+        running = list(self._running)
+        if running:
+            LOGGER.info("Worker %s waiting for %d running jobs", self.worker_id, len(running))
+        await asyncio.gather(*running, return_exceptions=True)
+        # Only jobs whose run ended without recording an outcome are left
+        async with self._session_factory() as session:
+            released = await StatementJobRepository(session).release(worker_id=self.worker_id)
+            await session.commit()
+        if released:
+            LOGGER.info("Worker %s returned %d unfinished jobs to the queue", self.worker_id, released)
+
+
+def create_worker(*, concurrency: int | None = None) -> StatementJobWorker:
+    """A worker wired to the application's pipeline, database and settings."""
+    from apps.api.dependencies.statements import get_statement_pipeline
+    from apps.core.config import settings
+    from apps.infra.db.session import async_session_factory
+
+    return StatementJobWorker(
+        pipeline=get_statement_pipeline(),
+        session_factory=async_session_factory,
+        concurrency=concurrency or settings.statement_worker_concurrency,
+        poll_interval=settings.statement_worker_poll_seconds,
+        heartbeat_interval=settings.statement_job_heartbeat_seconds,
+        stale_after=settings.statement_job_stale_seconds,
+        max_attempts=settings.statement_job_max_attempts,
+    )
+
+
+async def _serve(concurrency: int | None) -> None:
+    worker = create_worker(concurrency=concurrency)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await worker.run(stop)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run queued statement jobs.")
+    parser.add_argument("--concurrency", type=int, default=None, help="jobs to run at once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_serve(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
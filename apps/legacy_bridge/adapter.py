@@ -44,24 +44,19 @@ def _import_legacy_symbols():
     if str(legacy_dir) not in sys.path:
         sys.path.insert(0, str(legacy_dir))
 
-    argv_backup = list(sys.argv)
-    sys.argv = argv_backup[:1]
     try:
-        try:
-            from backend.tax_professional.banks.CA_Statement_Analyzer import (  # type: ignore
-                start_extraction_add_pdf,
-                save_to_excel,
-            )
-        except ModuleNotFoundError as exc:  # pragma: no cover - import guard
-            if exc.name != "lib2to3":
-                raise
-            _patch_missing_stdlib(exc.name)
-            from backend.tax_professional.banks.CA_Statement_Analyzer import (  # type: ignore pylint: disable=import-error
-                start_extraction_add_pdf,
-                save_to_excel,
-            )
-    finally:
-        sys.argv = argv_backup
+        from backend.tax_professional.banks.CA_Statement_Analyzer import (  # type: ignore
+            start_extraction_add_pdf,
+            save_to_excel,
+        )
+    except ModuleNotFoundError as exc:  # pragma: no cover - import guard
+        if exc.name != "lib2to3":
+            raise
+        _patch_missing_stdlib(exc.name)
+        from backend.tax_professional.banks.CA_Statement_Analyzer import (  # type: ignore pylint: disable=import-error
+            start_extraction_add_pdf,
+            save_to_excel,
+        )
 
     return start_extraction_add_pdf, save_to_excel
 
@@ -171,7 +166,13 @@ def run_legacy(
             )
 
         case_name = resolved_paths[0].stem or "legacy_report"
-        excel_path = save_to_excel(transaction_df, name_n_num_df, case_name)  # type: ignore[misc]
+        # The sheets behind the JSON payload are reused rather than rebuilt for the workbook
+        excel_path = save_to_excel(  # type: ignore[misc]
+            transaction_df,
+            name_n_num_df,
+            case_name,
+            analytics=result.get("analytics"),
+        )
 
         excel_path = os.path.abspath(excel_path)
         if not os.path.exists(excel_path):
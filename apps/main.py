@@ -1,5 +1,6 @@
 """FastAPI application entrypoint."""
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -9,13 +10,22 @@ from apps.api.routers import api_router
 from apps.core.config import settings
 from apps.domain.models.base import Base
 from apps.infra.db.session import async_engine
+from apps.infra.jobs.statement_worker import create_worker
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+    worker_task = None
+    stop_worker = asyncio.Event()
+    if settings.statement_worker_embedded:
+        worker_task = asyncio.create_task(create_worker().run(stop_worker))
     yield
+    if worker_task is not None:
+        stop_worker.set()
+        await worker_task
 
 
 def create_app() -> FastAPI:
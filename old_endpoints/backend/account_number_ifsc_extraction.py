@@ -1,17 +1,17 @@
-import pdfplumber
 import re
+from .document_context import get_document_context
 
 # Function to extract text from PDF
 def extract_text_from_pdf(pdf_path):
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if len(pdf.pages) > 0:
-                first_page = pdf.pages[0]
-                text = first_page.extract_text()
-                return text.strip() if text else None
-            else:
-                print(f"No pages found in {pdf_path}")
-                return None
+        # Shares the parsed first page with the NER step and the extraction of the same upload
+        context = get_document_context(pdf_path)
+        if context.page_count > 0:
+            text = context.first_page_text
+            return text.strip() if text else None
+        else:
+            print(f"No pages found in {pdf_path}")
+            return None
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
         return None
@@ -0,0 +1,97 @@
+import pandas as pd
+
+from .common_functions import (eod, opening_and_closing_bal, summary_sheet, transaction_sheet, total_investment,
+                               creditor_list, debtor_list, cash_withdraw, cash_depo, div_int, emi, refund_reversal,
+                               suspense_credit, suspense_debit, payment, receipt, process_transactions,
+                               calculate_fixed_day_average, process_avg_last_6_months)
+
+# The six tables of the Summary sheet, in the order summary_sheet returns them
+SUMMARY_SECTIONS = ["Particulars", "Income Receipts", "Important Expenses", "Other Expenses",
+                    "Contra Credit", "Contra Debit"]
+
+# Every sheet, in the order the builders have always run. creditor_list and debtor_list
+# coerce Debit/Credit on the frames they are given, so consumers build in this order.
+SHEET_ORDER = SUMMARY_SECTIONS + ["Transactions", "Investment", "Creditors", "Debtors", "UPI-CR", "UPI-DR",
+                                  "Cash Withdrawal", "Cash Deposit", "Redemption, Dividend & Interest",
+                                  "Probable EMI", "Refund-Reversal", "Suspense Credit", "Suspense Debit",
+                                  "Payment Voucher", "Receipt Voucher", "Payment & Receipt Voucher", "EOD",
+                                  "Opportunity to Earn"]
+
+
+def _summary(balances, df):
+    opening_bal, closing_bal = balances
+    return summary_sheet(df, opening_bal, closing_bal, df)
+
+
+def _display_dates(df, date_format, _summary_built):
+    # Built after the summary, which reads the ledger before its dates are rewritten
+    dated = df.copy()
+    dated["Value Date"] = pd.to_datetime(dated["Value Date"], format=date_format).dt.strftime("%d-%m-%Y")
+    return dated
+
+
+def _upi(column):
+    return lambda df: df[(df["Description"].str.contains("UPI", case=False)) & (df[column] > 0)]
+
+
+def _section(index):
+    return lambda summary: summary[0][index]
+
+
+# node -> (builder, nodes whose values it is called with). "transactions" and "date_format"
+# are the inputs; "dated" is the ledger with Value Date written as dd-mm-yyyy.
+_GRAPH = {
+    "EOD": (eod, ["transactions"]),
+    "balances": (opening_and_closing_bal, ["EOD", "transactions"]),
+    "summary": (_summary, ["balances", "transactions"]),
+    "missing_months_list": (lambda summary: summary[1], ["summary"]),
+    "dated": (_display_dates, ["transactions", "date_format", "summary"]),
+    "Transactions": (transaction_sheet, ["dated"]),
+    "Investment": (total_investment, ["dated"]),
+    "Creditors": (creditor_list, ["dated"]),
+    "Debtors": (debtor_list, ["Transactions"]),
+    "UPI-CR": (_upi("Credit"), ["dated"]),
+    "UPI-DR": (_upi("Debit"), ["dated"]),
+    "Cash Withdrawal": (cash_withdraw, ["dated"]),
+    "Cash Deposit": (cash_depo, ["dated"]),
+    "Redemption, Dividend & Interest": (div_int, ["dated"]),
+    "Probable EMI": (emi, ["dated"]),
+    "Refund-Reversal": (refund_reversal, ["dated"]),
+    "Suspense Credit": (suspense_credit, ["dated"]),
+    "Suspense Debit": (suspense_debit, ["dated"]),
+    "Payment Voucher": (payment, ["dated"]),
+    "Receipt Voucher": (receipt, ["dated"]),
+    "Payment & Receipt Voucher": (process_transactions, ["dated"]),
+    "bank_avg_balance": (calculate_fixed_day_average, ["EOD"]),
+    "Opportunity to Earn": (process_avg_last_6_months, ["bank_avg_balance", "EOD"]),
+}
+_GRAPH.update({name: (_section(i), ["summary"]) for i, name in enumerate(SUMMARY_SECTIONS)})
+
+
+class StatementAnalytics:
+    """
+    The analysis sheets of one categorised ledger, each built at most once.
+
+    Sheets are built on first access from the builders in common_functions, together with
+    whatever they depend on, and kept for the life of the object. One instance per job is
+    shared by the JSON response and the Excel workbook so neither recomputes the other's work.
+    `date_format` is the format the ledger's Value Date strings are in, when they are strings.
+    """
+
+    def __init__(self, transactions_df, date_format=None):
+        self._values = {"transactions": transactions_df, "date_format": date_format}
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            builder, inputs = _GRAPH[name]
+            self._values[name] = builder(*(self[node] for node in inputs))
+        return self._values[name]
+
+    @property
+    def missing_months_list(self):
+        return self["missing_months_list"]
+
+    def sheets(self, names):
+        """Builds the named sheets in `SHEET_ORDER` and returns them by name."""
+        ordered = [name for name in SHEET_ORDER if name in names]
+        return {name: self[name] for name in ordered}
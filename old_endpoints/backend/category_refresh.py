@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .common_functions import (opening_and_closing_bal, category_table, make_summary_great_again,
+                               filter_non_defaulters, calculate_fixed_day_average, process_avg_last_6_months)
+
+# Statements kept between edits; analysts work through a handful of files at a time
+MAX_EDIT_SESSIONS = int(os.getenv("LEGACY_MAX_EDIT_SESSIONS", "16"))
+
+# Ledger columns the category-independent sheets are built from; a change to any of them
+# starts a new session
+LEDGER_COLUMNS = ["Value Date", "Description", "Debit", "Credit", "Balance", "Bank"]
+
+# Summary section -> its "Particulars" value in the category workbooks, the amount it totals
+# and its title, as make_summary_great_again builds it
+SUMMARY_SECTIONS = {
+    "Income Receipts": ("Income", "Credit", "Income / Receipts"),
+    "Important Expenses": ("Important Expenses / Payments", "Debit", "Important Expenses / Payments"),
+    "Other Expenses": ("Other Expenses / Payments", "Debit", "Other Expenses / Payments"),
+    "Contra Credit": ("Contra Credit", "Credit", "Contra Credit"),
+    "Contra Debit": ("Contra Debit", "Debit", "Contra Debit"),
+}
+
+
+def _month_key(month_year):
+    return pd.to_datetime(month_year, format="%b-%Y")
+
+
+def _changed(old, new):
+    return ~((old == new) | (pd.isna(old) & pd.isna(new)))
+
+
+class CategoryEditSession:
+    """
+    The refreshed sheets of one statement, kept between category edits.
+
+    The first refresh builds everything the way `summary_sheet` does and keeps the Debit
+    and Credit totals of every (category, month). An edit only changes categories, so later
+    refreshes compare the categories they are sent with the previous ones, re-total the
+    categories rows moved into or out of, and rebuild only the summary sections those
+    categories belong to. Particulars and Opportunity to Earn do not depend on categories
+    and are reused as they are.
+    """
+
+    def __init__(self, df, eod_sheet_df, new_categories=None):
+        self.lock = threading.Lock()
+
+        opening_bal, closing_bal = opening_and_closing_bal(eod_sheet_df, df)
+        opening_closing_balance = {month: [opening_bal[month], closing_bal[month]] for month in opening_bal}
+        self.category_df = category_table(new_categories)
+        sheets = make_summary_great_again(df, opening_closing_balance, self.category_df)
+        self.sheets = {"Particulars": sheets[0]}
+        self.sheets.update(zip(SUMMARY_SECTIONS, sheets[1:6]))
+
+        bank_avg_balance_df = calculate_fixed_day_average(eod_sheet_df)
+        self.sheets["Opportunity to Earn"] = process_avg_last_6_months(bank_avg_balance_df, eod_sheet_df)
+
+        # The summary sorts the ledger by date before totalling it; so do the category totals
+        value_dates = pd.to_datetime(df["Value Date"], format="%d-%m-%Y")
+        order = np.argsort(value_dates.to_numpy(), kind="stable")
+        self.ledger = pd.DataFrame({
+            "Month-Year": value_dates.dt.strftime("%b-%Y").to_numpy()[order],
+            "Debit": df["Debit"].to_numpy()[order],
+            "Credit": df["Credit"].to_numpy()[order],
+        })
+        self.order = order
+        self.categories = df["Category"].to_numpy(dtype=object)[order]
+
+        # Every section has a column for each month of the statement and for the month of its
+        # first transaction, whether or not any of its categories has amounts there
+        months = pd.date_range(start=min(map(_month_key, opening_closing_balance)),
+                               end=max(map(_month_key, opening_closing_balance)), freq="MS")
+        self.months = set(months.strftime("%b-%Y")) | {value_dates.min().strftime("%b-%Y")}
+        # The section tables start from integer zero rows, so they only stay integer when the
+        # amounts are
+        self.dtypes = {column: np.result_type(np.int64, self.ledger[column].dtype) for column in ("Debit", "Credit")}
+
+        self.totals = self._totals(np.ones(len(self.ledger), dtype=bool))
+
+    def _totals(self, rows):
+        # (Category, Month-Year) -> Debit and Credit totals of the selected rows
+        ledger = self.ledger[rows].assign(Category=self.categories[rows])
+        return ledger.groupby(["Category", "Month-Year"])[["Debit", "Credit"]].sum()
+
+    def _section(self, name):
+        particulars, column, title = SUMMARY_SECTIONS[name]
+        section_categories = self.category_df.loc[self.category_df["Particulars"] == particulars, "Category"]
+        totals = self.totals[column].unstack("Month-Year").reindex(pd.Index(section_categories.dropna().unique()).sort_values())
+        months = self.months | set(totals.columns[totals.notna().any()])
+        summary = totals.reindex(columns=sorted(months, key=_month_key)).fillna(0).astype(self.dtypes[column])
+        summary.index.name = "Category"
+
+        summary["Total"] = summary.sum(axis=1)
+        summary = summary.reset_index()
+        summary = summary[summary["Category"] != "X"]
+        summary.rename(columns={"Category": title}, inplace=True)
+        return filter_non_defaulters(summary, self.category_df)
+
+    def refresh(self, categories, new_categories=None):
+        """
+        Returns the sheets for the ledger with `categories`, in ledger order, rebuilding only
+        what the categories that changed since the last refresh feed into.
+        """
+        with self.lock:
+            category_df = category_table(new_categories)
+            categories = pd.Series(categories).to_numpy(dtype=object)[self.order]
+            changed = _changed(self.categories, categories)
+            moved = set(self.categories[changed]) | set(categories[changed])
+            self.categories = categories
+
+            if moved:
+                affected = pd.Series(categories).isin(moved).to_numpy()
+                kept = ~self.totals.index.get_level_values("Category").isin(moved)
+                self.totals = pd.concat([self.totals[kept], self._totals(affected)]).sort_index()
+
+            rules = ["Category", "Particulars", "Preferences"]
+            if not category_df.reindex(columns=rules).equals(self.category_df.reindex(columns=rules)):
+                # Categories may have been added or moved between sections
+                self.category_df = category_df
+                stale = list(SUMMARY_SECTIONS)
+            else:
+                stale = [name for name, (particulars, _, _) in SUMMARY_SECTIONS.items()
+                         if moved & set(category_df.loc[category_df["Particulars"] == particulars, "Category"])]
+
+            for name in stale:
+                self.sheets[name] = self._section(name)
+            return dict(self.sheets)
+
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def _session_key(df, eod_sheet_df):
+    # What a session's category-independent sheets were built from
+    digest = hashlib.blake2b()
+    for frame in (df[[column for column in LEDGER_COLUMNS if column in df]], eod_sheet_df):
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def refresh_categories(df, eod_sheet_df, new_categories=None):
+    """
+    Returns the summary sections, Particulars and Opportunity to Earn of `df` after a category
+    edit, reusing the previous refresh of the same statement where the edit leaves it as it was.
+    """
+    try:
+        key = _session_key(df, eod_sheet_df)
+    except TypeError:
+        # Cells that cannot be hashed; such a ledger is always rebuilt in full
+        return CategoryEditSession(df, eod_sheet_df, new_categories).sheets
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is not None:
+            _sessions.move_to_end(key)
+    if session is not None:
+        return session.refresh(df["Category"], new_categories)
+
+    session = CategoryEditSession(df, eod_sheet_df, new_categories)
+    with _sessions_lock:
+        _sessions[key] = session
+        while len(_sessions) > MAX_EDIT_SESSIONS:
+            _sessions.popitem(last=False)
+    return dict(session.sheets)
@@ -0,0 +1,281 @@
+import hashlib
+import os
+import re
+import string
+import threading
+from collections import deque
+
+import pandas as pd
+
+# Characters that make a keyword a regular expression rather than a plain substring
+REGEX_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+# A keyword that refers back to its own groups cannot be moved into a combined pattern
+BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+# Which rules a row can take, by whether it has a positive debit and a positive credit;
+# a row's position in this list is 2 * has_debit + has_credit
+DIRECTIONS = [(False, False), (False, True), (True, False), (True, True)]
+
+
+def _applies(direction, has_debit, has_credit):
+    if direction == "Debit":
+        return has_debit
+    if direction == "Credit":
+        return has_credit
+    return True
+
+
+_folded = {}
+
+
+def _fold(char):
+    # The ASCII letter re.IGNORECASE matches a character to (e.g. the Kelvin sign to "k"),
+    # or NUL, which no plain keyword contains
+    if char not in _folded:
+        _folded[char] = next((letter for letter in string.ascii_lowercase
+                              if re.fullmatch(letter, char, flags=re.IGNORECASE)), "\0")
+    return _folded[char]
+
+
+def _fold_text(text):
+    if text.isascii():
+        return text.lower()
+    return "".join(char.lower() if char.isascii() else _fold(char) for char in text)
+
+
+def _combinable(pattern):
+    # Only a pattern that compiles on its own is balanced enough to be wrapped in another
+    try:
+        re.compile(pattern)
+    except re.error:
+        return False
+    return not BACKREFERENCE.search(pattern)
+
+
+def _is_plain(pattern, ignore_case):
+    # Plain keywords are matched against the description folded to ASCII lower case
+    return ignore_case and pattern.isascii() and not REGEX_CHARS.intersection(pattern)
+
+
+class _KeywordAutomaton:
+    """
+    Aho-Corasick automaton over plain keywords. Each state remembers, for every direction,
+    the highest rule index among the keywords that end there, so one walk over a text gives
+    the best plain rule that matches it.
+    """
+
+    def __init__(self, keywords):
+        # keywords: lower-cased keyword -> best rule index per direction (-1 for none)
+        self.goto = [{}]
+        self.best = [[-1] * len(DIRECTIONS)]
+        for keyword, best in keywords.items():
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.best.append([-1] * len(DIRECTIONS))
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.best[state] = [max(a, b) for a, b in zip(self.best[state], best)]
+
+        # Breadth-first, so a state's fail target is final before its children read it
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.best[child] = [max(a, b) for a, b in zip(self.best[child], self.best[self.fail[child]])]
+                queue.append(child)
+
+    def best_match(self, text, direction):
+        goto, fail, best = self.goto, self.fail, self.best
+        state, found = 0, best[0][direction]
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best[state][direction] > found:
+                found = best[state][direction]
+        return found
+
+
+class CategoryRuleSet:
+    """
+    Ordered `(pattern, direction, category, ignore_case)` rules applied to descriptions in
+    one pass.
+
+    The result is the same as running `Description.str.contains(pattern)` for every rule in
+    turn and assigning its category: the last rule that matches wins. A "Debit" or "Credit"
+    rule only applies to rows with a positive amount on that side. Plain keywords are found
+    together by an automaton. Regular-expression keywords are combined into one pattern per
+    direction, with the later rules tried first.
+    """
+
+    def __init__(self, rules):
+        self.rules = [(str(pattern), direction, category, ignore_case)
+                      for pattern, direction, category, ignore_case in rules]
+
+        keywords = {}
+        # Per direction, the regular-expression rules and their combined-pattern alternatives,
+        # from the last rule to the first
+        self.regex_rules = [[] for _ in DIRECTIONS]
+        alternatives = [[] for _ in DIRECTIONS]
+        for index, (pattern, direction, _, ignore_case) in enumerate(self.rules):
+            applies = [_applies(direction, *flags) for flags in DIRECTIONS]
+            if _is_plain(pattern, ignore_case):
+                best = keywords.setdefault(pattern.lower(), [-1] * len(DIRECTIONS))
+                for d, ok in enumerate(applies):
+                    if ok:
+                        best[d] = index
+            else:
+                flags = "(?i:" if ignore_case else "(?-i:"
+                alternative = rf"(?=[\s\S]*?{flags}{pattern}))(?P<r{index}>)"
+                for d, ok in enumerate(applies):
+                    if ok:
+                        self.regex_rules[d].insert(0, index)
+                        alternatives[d].insert(0, alternative)
+
+        self.automaton = _KeywordAutomaton(keywords)
+        combinable = all(_combinable(self.rules[index][0]) for index in set().union(*self.regex_rules))
+        self.patterns = [self._combine(alts) if combinable else None for alts in alternatives]
+
+    def _combine(self, alternatives):
+        if not alternatives:
+            # Never matches
+            return re.compile("(?!)")
+        try:
+            return re.compile("|".join(f"(?:{alternative})" for alternative in alternatives))
+        except re.error:
+            # e.g. a keyword with global inline flags; the rules are then searched one by one
+            return None
+
+    def _best_regex(self, text, direction):
+        pattern = self.patterns[direction]
+        if pattern is not None:
+            match = pattern.match(text)
+            return int(match.lastgroup[1:]) if match else -1
+        for index in self.regex_rules[direction]:
+            rule_pattern, _, _, ignore_case = self.rules[index]
+            if re.search(rule_pattern, text, flags=re.IGNORECASE if ignore_case else 0):
+                return index
+        return -1
+
+    def _best_rule(self, text, direction):
+        best = self.automaton.best_match(_fold_text(text), direction)
+        return max(best, self._best_regex(text, direction))
+
+    def categorise(self, descriptions, debit, credit, current):
+        """
+        Returns the category of every row: that of the last rule it matches, or its value in
+        `current` when it matches none. Descriptions that are not strings match nothing.
+        """
+        directions = pd.Series(debit).gt(0).to_numpy() * 2 + pd.Series(credit).gt(0).to_numpy()
+        categories = pd.Series(current).to_numpy(dtype=object).copy()
+        # Statements repeat descriptions (standing orders, charges), so each is matched once
+        best_rules = {}
+        for row, key in enumerate(zip(descriptions, directions.tolist())):
+            if not isinstance(key[0], str):
+                continue
+            if key not in best_rules:
+                best_rules[key] = self._best_rule(*key)
+            if best_rules[key] >= 0:
+                categories[row] = self.rules[best_rules[key]][2]
+        return categories
+
+
+def _file_digest(path):
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CategoryRuleRepository:
+    """
+    The category workbooks (Final_Category.xlsx and the customer sheet), parsed once per
+    process.
+
+    A workbook is only re-read when its modification time or size changes and its content
+    hash then differs too, so a job pays a `stat` per workbook instead of an openpyxl parse.
+    The keyword rule set compiled from a combination of workbooks is kept alongside and is
+    rebuilt only when one of them is. Tables handed out are shared and must not be modified.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # realpath -> (mtime_ns, size), content hash, parsed frame
+        self._workbooks = {}
+        # content hashes of the workbooks -> their concatenated table and compiled keyword rules
+        self._combined = {}
+
+    def _workbook(self, path):
+        real_path = os.path.realpath(path)
+        stat = os.stat(real_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._workbooks.get(real_path)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        digest = _file_digest(real_path)
+        if cached is not None and cached[1] == digest:
+            # Touched or copied over with the same bytes; the parsed frame still holds
+            frame = cached[2]
+        else:
+            frame = pd.read_excel(real_path)
+        self._workbooks[real_path] = (version, digest, frame)
+        return digest, frame
+
+    def _combine(self, paths):
+        workbooks = [self._workbook(path) for path in paths]
+        key = tuple(digest for digest, _ in workbooks)
+        if key not in self._combined:
+            # Drop combinations that include a workbook which has since changed
+            current = {digest for _, digest, _ in self._workbooks.values()}
+            self._combined = {k: v for k, v in self._combined.items() if current.issuperset(k)}
+            table = workbooks[0][1] if len(workbooks) == 1 else pd.concat(
+                [frame for _, frame in workbooks], ignore_index=True)
+            self._combined[key] = {"table": table}
+        return self._combined[key]
+
+    def table(self, *paths):
+        """Returns the rows of the workbooks at `paths`, concatenated in that order."""
+        with self.lock:
+            return self._combine(paths)["table"]
+
+    def keyword_rules(self, *paths):
+        """Returns the `CategoryRuleSet` of the keyword rows of the workbooks at `paths`."""
+        with self.lock:
+            combined = self._combine(paths)
+            if "rules" not in combined:
+                # Later rows override earlier ones
+                combined["rules"] = CategoryRuleSet(
+                    (rule["Description"], rule["Debit / Credit"], rule["Category"], True)
+                    for rule in combined["table"].to_dict("records"))
+            return combined["rules"]
+
+    def reload(self, path=None):
+        """
+        Forgets the parsed copy of the workbook at `path`, or of every workbook, so the next
+        lookup reads it from disk again. For writers that cannot rely on the file's mtime.
+        """
+        with self.lock:
+            if path is None:
+                self._workbooks.clear()
+            else:
+                self._workbooks.pop(os.path.realpath(path), None)
+            self._combined.clear()
+
+
+# Shared by every job in the process
+CATEGORY_RULES = CategoryRuleRepository()
+
+
+def reload_category_rules(path=None):
+    CATEGORY_RULES.reload(path)
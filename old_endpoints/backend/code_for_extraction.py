@@ -1,32 +1,28 @@
 import pandas as pd
 import numpy as np
 import io
-from PyPDF2 import PdfReader, PdfWriter
-from PyPDF2 import PdfReader, PdfWriter, Transformation
-from PyPDF2.generic import NameObject, NumberObject, RectangleObject
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.colors import black
 from datetime import datetime, timedelta
-import torch
 from PIL import Image
 import pdfplumber
-from torchvision import transforms
-from huggingface_hub import hf_hub_download
 # import matplotlib
 # matplotlib.use("Agg")
 # from matplotlib.patches import Patch
-from PIL import ImageDraw
-from transformers import TableTransformerForObjectDetection
-from tqdm.auto import tqdm
 # import matplotlib.pyplot as plt
 # import matplotlib.patches as patches
 import os
 import fitz  # PyMuPDF
 from io import BytesIO
 from .old_bank_extractions import CustomStatement
+from .table_assembly import extract_table_dataframe, extract_page_dataframe, EXTRACTION_WORKERS
+from .probe_scheduler import first_passing_probe, SharedStep
+from .document_context import get_document_context, release_document_context
+from .layout_cache import layout_fingerprint, load_layout, store_layout, evict_layout
+from .date_inference import parse_date_column
 import re
 import uuid
+import copy
+import contextlib
+from itertools import accumulate
 # from findaddy.exceptions import ExtractionError
 import logging
 from .utils import get_base_dir
@@ -200,6 +196,10 @@ def flatten_page_rotation(page):
       we can set /Rotate=0 without changing the visual appearance.
     - Update page.mediabox so the rotated content is fully visible.
     """
+    # Imported here so PyPDF2 only loads for statements that are actually re-rotated
+    from PyPDF2 import Transformation
+    from PyPDF2.generic import NameObject, NumberObject, RectangleObject
+
     # Safely fetch the /Rotate entry (as a PdfObject).
     rotate_obj = page.get(NameObject("/Rotate"), NumberObject(0))
     rotation = int(rotate_obj)  # Convert to plain int
@@ -242,6 +242,7 @@ def flatten_page_rotation(page):
     page[NameObject("/Rotate")] = NumberObject(0)
 
 def flatten_pdf_rotation(input_pdf_path, output_pdf_path):
+    from PyPDF2 import PdfReader, PdfWriter
 
     reader = PdfReader(input_pdf_path)
     writer = PdfWriter()
@@ -255,14 +256,16 @@ def flatten_pdf_rotation(input_pdf_path, output_pdf_path):
 
     return output_pdf_path
 
-def unlock_and_add_margins_to_pdf(pdf_path, pdf_password, timestamp, CA_ID):
-    margin = 0.3
-    os.makedirs(TEMP_SAVED_PDF_DIR, exist_ok=True)
+def prepare_statement_document(pdf_path, pdf_password, margin=0.3):
+    """
+    Unlocks the statement, trims the first page down to the transaction table and widens
+    every page by `margin` inches, all on one in-memory PyMuPDF document which is returned
+    open. Nothing is written to disk.
+    """
+    # Open the PDF using fitz (PyMuPDF)
+    pdf_document = fitz.open(pdf_path)
 
     try:
-        # Open the PDF using fitz (PyMuPDF)
-        pdf_document = fitz.open(pdf_path)
-
         # If the PDF is encrypted, try to unlock it
         if pdf_document.is_encrypted:
             if not pdf_document.authenticate(pdf_password):
@@ -273,158 +276,161 @@ def unlock_and_add_margins_to_pdf(pdf_path, pdf_password, timestamp, CA_ID):
         text = first_page.get_text("text").strip()
         if not text or text == "CamScanner":
             raise ValueError("The PDF is of image-only (non-text) format. Please upload a text PDF.")
+    except Exception:
+        pdf_document.close()
+        raise
 
-        # Define the output path for the unlocked PDF
-        unlocked_pdf_filename = f"{timestamp}-{CA_ID}_{uuid.uuid4().hex}.pdf"
-        unlocked_pdf_path = os.path.join(TEMP_SAVED_PDF_DIR, unlocked_pdf_filename)
-
-        # MARGIN CODE STARTS NOW: Convert margin from inches to points (1 inch = 72 points)
-        margin_pts = margin * 72
-
-        # Process the first page for trimming if needed
-        cropped_doc = load_new_first_page_function(pdf_document)
-
-        if cropped_doc:
-            # Create a new document combining the cropped first page and the remaining pages
-            combined_doc = fitz.open()
-            combined_doc.insert_pdf(cropped_doc)
-            combined_doc.insert_pdf(pdf_document, from_page=1)
-
-            # Save the combined document back to the original reference
-            combined_path = "combined_temp.pdf"
-            combined_doc.save(combined_path)
-            pdf_document = fitz.open(combined_path)
-
-        # Iterate through each page, applying the margin adjustment
-        for page_num in range(len(pdf_document)):
-            page = pdf_document.load_page(page_num)
-            rect = page.rect  # Get the original page size
-
-            # Expand the page size by adding margin around all sides
-            new_rect = fitz.Rect(
-                rect.x0 - margin_pts,  # Left
-                rect.y0,  # Top (unchanged for now)
-                rect.x1 + margin_pts,  # Right
-                rect.y1  # Bottom (unchanged for now)
-            )
+    # MARGIN CODE STARTS NOW: Convert margin from inches to points (1 inch = 72 points)
+    margin_pts = margin * 72
 
-            # Set the new page size (media box) to the expanded dimensions
-            page.set_mediabox(new_rect)
+    # Process the first page for trimming if needed
+    cropped_doc = load_new_first_page_function(pdf_document)
 
-        # Save the modified PDF (unlocked and with margins)
-        pdf_document.save(unlocked_pdf_path)
+    if cropped_doc:
+        # Combine the cropped first page and the remaining pages into a new in-memory document
+        combined_doc = fitz.open()
+        combined_doc.insert_pdf(cropped_doc)
+        combined_doc.insert_pdf(pdf_document, from_page=1)
+        cropped_doc.close()
         pdf_document.close()
+        pdf_document = combined_doc
 
-        return unlocked_pdf_path
+    # Iterate through each page, applying the margin adjustment
+    for page_num in range(len(pdf_document)):
+        page = pdf_document.load_page(page_num)
+        rect = page.rect  # Get the original page size
+
+        # Expand the page size by adding margin around all sides
+        new_rect = fitz.Rect(
+            rect.x0 - margin_pts,  # Left
+            rect.y0,  # Top (unchanged for now)
+            rect.x1 + margin_pts,  # Right
+            rect.y1  # Bottom (unchanged for now)
+        )
+
+        # Set the new page size (media box) to the expanded dimensions
+        page.set_mediabox(new_rect)
+
+    return pdf_document
+
+def unlock_and_add_margins_to_pdf(pdf_path, pdf_password, timestamp, CA_ID):
+    os.makedirs(TEMP_SAVED_PDF_DIR, exist_ok=True)
 
+    try:
+        pdf_document = prepare_statement_document(pdf_path, pdf_password)
     except Exception as e:
         raise ValueError(f"Error: {e}")
 
+    # The prepared document is written once, under a per-job name, for the path-based extractors
+    unlocked_pdf_filename = f"{timestamp}-{CA_ID}_{uuid.uuid4().hex}.pdf"
+    unlocked_pdf_path = os.path.join(TEMP_SAVED_PDF_DIR, unlocked_pdf_filename)
+    try:
+        pdf_document.save(unlocked_pdf_path)
+    except Exception as e:
+        raise ValueError(f"Error: {e}")
     finally:
-        # Ensure all temporary documents are closed and cleaned up
-        if 'cropped_doc' in locals() and cropped_doc is not None:
-            cropped_doc.close()
-        if 'combined_doc' in locals() and combined_doc is not None:
-            combined_doc.close()
-        if os.path.exists("combined_temp.pdf"):
-            os.remove("combined_temp.pdf")
+        pdf_document.close()
+
+    return unlocked_pdf_path
 
 def get_table_column_coordinates(pdf_path):
     page_num = 0
     with pdfplumber.open(pdf_path) as pdf:
-        page = pdf.pages[page_num]
+        return table_column_coordinates(pdf.pages[page_num])
 
-        table_settings = {
-            "vertical_strategy": "lines",
-            "horizontal_strategy": "lines",
-            # "edge_min_length": 20,
-        }
+def table_column_coordinates(page):
+    table_settings = {
+        "vertical_strategy": "lines",
+        "horizontal_strategy": "lines",
+        # "edge_min_length": 20,
+    }
 
-        # Get table structure exactly like debug_tablefinder()
-        table_finder = page.debug_tablefinder(table_settings)
-        # print(table_finder.tables)
+    # Get table structure exactly like debug_tablefinder()
+    table_finder = page.debug_tablefinder(table_settings)
+    # print(table_finder.tables)
 
-        if not table_finder.tables:
-            return []
+    if not table_finder.tables:
+        return []
 
-        # Extract ALL vertical edges (before filtering)
-        column_all_coords = sorted(set(edge["x0"] for edge in table_finder.edges if edge["orientation"] == "v"))
+    # Extract ALL vertical edges (before filtering)
+    column_all_coords = sorted(set(edge["x0"] for edge in table_finder.edges if edge["orientation"] == "v"))
 
-        # Find the largest table based on area (width × height)
-        largest_table = max(
-            table_finder.tables,
-            key=lambda t: (t.bbox[2] - t.bbox[0]) * (t.bbox[3] - t.bbox[1])
-        )
+    # Find the largest table based on area (width × height)
+    largest_table = max(
+        table_finder.tables,
+        key=lambda t: (t.bbox[2] - t.bbox[0]) * (t.bbox[3] - t.bbox[1])
+    )
 
-        # Extract vertical edges within the largest table's bounding box with a tolerance
-        table_xmin, table_ymin, table_xmax, table_ymax = largest_table.bbox
-        tolerance = 5  # Allow a small tolerance for alignment issues
+    # Extract vertical edges within the largest table's bounding box with a tolerance
+    table_xmin, table_ymin, table_xmax, table_ymax = largest_table.bbox
+    tolerance = 5  # Allow a small tolerance for alignment issues
 
-        column_x_coords = sorted(set(
-            edge["x0"] for edge in table_finder.edges
-            if edge["orientation"] == "v" and
-            (table_xmin - tolerance) <= edge["x0"] <= (table_xmax + tolerance) and
-            "top" in edge and "bottom" in edge and
-            (table_ymin - tolerance) <= edge["top"] <= (table_ymax + tolerance) and
-            (table_ymin - tolerance) <= edge["bottom"] <= (table_ymax + tolerance) and
-            (edge["bottom"] - edge["top"]) > 0.5 * (table_ymax - table_ymin)  # Ensure significant edge length
-        ))
+    column_x_coords = sorted(set(
+        edge["x0"] for edge in table_finder.edges
+        if edge["orientation"] == "v" and
+        (table_xmin - tolerance) <= edge["x0"] <= (table_xmax + tolerance) and
+        "top" in edge and "bottom" in edge and
+        (table_ymin - tolerance) <= edge["top"] <= (table_ymax + tolerance) and
+        (table_ymin - tolerance) <= edge["bottom"] <= (table_ymax + tolerance) and
+        (edge["bottom"] - edge["top"]) > 0.5 * (table_ymax - table_ymin)  # Ensure significant edge length
+    ))
 
-        if not column_x_coords and len(table_finder.tables) == 1:
-            return column_all_coords
+    if not column_x_coords and len(table_finder.tables) == 1:
+        return column_all_coords
 
-        if len(column_x_coords) < 4:
-            return column_all_coords
+    if len(column_x_coords) < 4:
+        return column_all_coords
 
-        return column_x_coords
+    return column_x_coords
 
 def get_table_column_coordinates_by_text(pdf_path):
     page_num = 0
     with pdfplumber.open(pdf_path) as pdf:
-        page = pdf.pages[page_num]
+        return table_column_coordinates_by_text(pdf.pages[page_num])
 
-        table_settings = {
-            "vertical_strategy": "text",
-            "horizontal_strategy": "lines",
-            "edge_min_length": 10,
-        }
+def table_column_coordinates_by_text(page):
+    table_settings = {
+        "vertical_strategy": "text",
+        "horizontal_strategy": "lines",
+        "edge_min_length": 10,
+    }
 
-        # Get table structure exactly like debug_tablefinder()
-        table_finder = page.debug_tablefinder(table_settings)
+    # Get table structure exactly like debug_tablefinder()
+    table_finder = page.debug_tablefinder(table_settings)
 
-        if not table_finder.tables:
-            return []
+    if not table_finder.tables:
+        return []
 
-        # Extract ALL vertical edges (before filtering)
-        column_all_coords = sorted(set(edge["x0"] for edge in table_finder.edges if edge["orientation"] == "v"))
+    # Extract ALL vertical edges (before filtering)
+    column_all_coords = sorted(set(edge["x0"] for edge in table_finder.edges if edge["orientation"] == "v"))
 
-        # Find the largest table based on area (width × height)
-        largest_table = max(
-            table_finder.tables,
-            key=lambda t: (t.bbox[2] - t.bbox[0]) * (t.bbox[3] - t.bbox[1])
-        )
+    # Find the largest table based on area (width × height)
+    largest_table = max(
+        table_finder.tables,
+        key=lambda t: (t.bbox[2] - t.bbox[0]) * (t.bbox[3] - t.bbox[1])
+    )
 
-        # Extract vertical edges within the largest table's bounding box with a tolerance
-        table_xmin, table_ymin, table_xmax, table_ymax = largest_table.bbox
-        tolerance = 1  # Allow a small tolerance for alignment issues
+    # Extract vertical edges within the largest table's bounding box with a tolerance
+    table_xmin, table_ymin, table_xmax, table_ymax = largest_table.bbox
+    tolerance = 1  # Allow a small tolerance for alignment issues
 
-        column_x_coords = sorted(set(
-            edge["x0"] for edge in table_finder.edges
-            if edge["orientation"] == "v" and
-            (table_xmin - tolerance) <= edge["x0"] <= (table_xmax + tolerance) and
-            "top" in edge and "bottom" in edge and
-            (table_ymin - tolerance) <= edge["top"] <= (table_ymax + tolerance) and
-            (table_ymin - tolerance) <= edge["bottom"] <= (table_ymax + tolerance) and
-            (edge["bottom"] - edge["top"]) > 0.5 * (table_ymax - table_ymin)  # Ensure significant edge length
-        ))
+    column_x_coords = sorted(set(
+        edge["x0"] for edge in table_finder.edges
+        if edge["orientation"] == "v" and
+        (table_xmin - tolerance) <= edge["x0"] <= (table_xmax + tolerance) and
+        "top" in edge and "bottom" in edge and
+        (table_ymin - tolerance) <= edge["top"] <= (table_ymax + tolerance) and
+        (table_ymin - tolerance) <= edge["bottom"] <= (table_ymax + tolerance) and
+        (edge["bottom"] - edge["top"]) > 0.5 * (table_ymax - table_ymin)  # Ensure significant edge length
+    ))
 
-        if not column_x_coords and len(table_finder.tables) == 1:
-            return column_all_coords
+    if not column_x_coords and len(table_finder.tables) == 1:
+        return column_all_coords
 
-        if len(column_x_coords) < 4:
-            return column_all_coords
+    if len(column_x_coords) < 4:
+        return column_all_coords
 
-        return column_x_coords
+    return column_x_coords
 
 ##____________AFTER EXTRACTION (cleaning)_________________
 def parse_date(date_string):
@@ -586,58 +592,6 @@ def check_date(df):
     return new_df
 
 def cleaning(new_df):
-
-    def try_parsing_date(text):
-        formats_to_try = [
-            "%d/%m /%Y",
-            "%d-%m-%Y",
-            "%d %b %Y",
-            "%Y-%m-%d",
-            # "%y-%m-%d",
-            "%d %B %Y",
-            "%d/%m/%Y",
-            "%d-%b-%Y",
-            "%d-%b-%y",
-            "%B %d %Y",
-            "%b %d %Y",
-            "%d-%B-%Y",
-            "%m/%d/%Y",
-            "%d %b %y",
-            "%d/%m/%y",
-            "%d-%m-%y",
-            "%d-%b- %Y",
-            "%d/%b/%Y",
-            "%d %b, %Y",
-            "%d %b, %Y %H:%M:%S",
-            "%d-%m-%Y %H:%M:%S",
-            "%d %b %Y %H:%M:%S",
-            "%Y-%m-%d %H:%M:%S",
-            "%d %B %Y %H:%M:%S",
-            "%d/%m/%Y %H:%M:%S",
-            "%d-%b-%Y %H:%M:%S",
-            "%d-%b-%y %H:%M:%S",
-            "%B %d, %Y %H:%M:%S",
-            "%d-%B-%Y %H:%M:%S",
-            "%m/%d/%Y %H:%M:%S",
-            "%d %b %y %H:%M:%S",
-            "%d/%m/%y %H:%M:%S",
-            "%d-%m-%y %H:%M:%S",
-            "%d-%b- %Y %H:%M:%S",
-            "%d/%b/%Y %H:%M:%S",
-            "%y-%m-%d %H:%M:%S",
-            "%y-%m-%d",
-        ]
-
-        for fmt in formats_to_try:
-            try:
-                return pd.to_datetime(text, format=fmt)
-            except ValueError:
-                continue
-        # try:
-        #     return parser.parse(text)
-        # except Exception as e:
-        #     return pd.NaT
-
     df = new_df.reset_index(drop=True)
     # if 2 value dates eg : 02-Apr-23 (02-Apr-2023)
     df["Value Date"] = df["Value Date"].apply(
@@ -647,7 +601,7 @@ def cleaning(new_df):
     df["Credit"] = df["Credit"].astype(str)
     df["Balance"] = df["Balance"].astype(str)
 
-    df["Value Date"] = df["Value Date"].apply(try_parsing_date)
+    df["Value Date"] = parse_date_column(df["Value Date"])
     df["Value Date"] = df["Value Date"].dt.strftime("%d-%m-%Y")
     df["Balance"] = df["Balance"].str.replace(r"Cr.|Dr.", "", regex=True)
 
@@ -673,14 +627,12 @@ def cleaning(new_df):
     df['Description'] = df['Description'].astype(str)
 
     # this is the code to merge lines that have been cut by separators
-    # Iterate through the DataFrame and combine descriptions
-    last_valid_row = None
-    for i in range(len(df)):
-        if pd.notna(df.loc[i, 'Value Date']):
-            last_valid_row = i
-        elif last_valid_row is not None:
-            current_description = df.loc[i, 'Description'] if pd.notna(df.loc[i, 'Description']) else ''
-            df.at[last_valid_row, 'Description'] += ' ' + current_description
+    # Each dated row starts a group that its undated continuation lines belong to; rows
+    # before the first date belong to no row and are left alone
+    has_date = df['Value Date'].notna()
+    group = has_date.cumsum()
+    merged = df.loc[group > 0, 'Description'].groupby(group[group > 0]).agg(' '.join)
+    df.loc[has_date, 'Description'] = merged.loc[group[has_date]].to_numpy()
 
     # Drop the rows where 'Value Date' is NaN (these rows are now redundant)
     # df_cleaned = df.dropna(subset=['Value Date']).reset_index(drop=True)
@@ -802,82 +754,35 @@ def crdr_to_credit_debit_columns(df, description_column, date_column, bal_column
     return final_df
 
 def extract_text_from_pdf(unlocked_file_path):
-    with pdfplumber.open(unlocked_file_path) as pdf:
-        first_page = pdf.pages[0]
-        text = first_page.extract_text()
-        return text.strip() if text else None
+    text = get_document_context(unlocked_file_path).first_page_text
+    return text.strip() if text else None
 
 ##____________AFTER EXTRACTION (cleaning)_________________
 
 ##____________COLUMN SEPARATORS_______________________
+def page_to_image(page):
+    pix = page.get_pixmap()
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
 def pdf_to_images(pdf_path):
     pdf_document = fitz.open(pdf_path)
     images = []
 
     for page_num in range(len(pdf_document)):
         page = pdf_document.load_page(page_num)
-        pix = page.get_pixmap()
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        images.append(img)
+        images.append(page_to_image(page))
 
     return images
 
 def outputs_to_objects(outputs, img_size, id2label):
-    m = outputs.logits.softmax(-1).max(-1)
-    pred_labels = list(m.indices.detach().cpu().numpy())[0]
-    pred_scores = list(m.values.detach().cpu().numpy())[0]
-    pred_bboxes = outputs['pred_boxes'].detach().cpu()[0]
-
-    # Convert bounding boxes from cxcywh to xyxy
-    x_c, y_c, w, h = pred_bboxes.unbind(-1)
-    pred_bboxes = torch.stack([
-        x_c - 0.5 * w,
-        y_c - 0.5 * h,
-        x_c + 0.5 * w,
-        y_c + 0.5 * h
-    ], dim=-1)
-
-    # Rescale bounding boxes to the image size
-    scale_factors = torch.tensor([img_size[0], img_size[1], img_size[0], img_size[1]], dtype=torch.float32)
-    pred_bboxes = pred_bboxes * scale_factors
-
-    objects = []
-    for label, score, bbox in zip(pred_labels, pred_scores, pred_bboxes):
-        class_label = id2label[int(label)]
-        if class_label != 'no object':
-            objects.append({
-                'label': class_label,
-                'score': float(score),
-                'bbox': bbox.tolist()
-            })
-
-    return objects
+    from .table_structure import objects_from_outputs
+    return objects_from_outputs(outputs, 0, img_size, id2label)
 
 def detect_table_columns(image):
-    structure_model = TableTransformerForObjectDetection.from_pretrained(os.path.join(BASE_DIR,"models", "local_model"))
-    # structure_model = TableTransformerForObjectDetection.from_pretrained("./local_model")
-
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    structure_model.to(device)
-
-    structure_transform = transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
-    ])
-
-    img_size = image.size
-    pixel_values = structure_transform(image).unsqueeze(0).to(device)
-
-    with torch.no_grad():
-        outputs = structure_model(pixel_values)
-
-    structure_id2label = structure_model.config.id2label
-    structure_id2label[len(structure_id2label)] = "no object"
-
-    objects = outputs_to_objects(outputs, img_size, structure_id2label)
-    columns = [obj for obj in objects if obj['label'] == "table column"]
-
-    return columns
+    # Imported here so torch and transformers only load once the TableTransformer probe runs;
+    # the model itself is loaded once per process and shared by every call
+    from .table_structure import get_table_structure_model
+    return get_table_structure_model().detect_columns([image])[0]
 
 def annotate_pdf(pdf_document, columns):
     rightmost_column = None
@@ -926,11 +831,10 @@ def annotate_pdf(pdf_document, columns):
     return lines
 
 def process_pdf_and_annotate(pdf_path, output_pdf):
-    images = pdf_to_images(pdf_path)
     pdf_document = fitz.open(pdf_path)
 
-    # Detect table columns only on the first page
-    first_page_columns = detect_table_columns(images[0])
+    # Detect table columns only on the first page, so only that page is rendered
+    first_page_columns = detect_table_columns(page_to_image(pdf_document.load_page(0)))
 
     # Display the first page with detected table columns
     # plot_results(images[0], first_page_columns)
@@ -961,33 +865,18 @@ def clean_table(table):
     return cleaned_table
 
 # Functions for handling test cases and transformations
-def extract_dataframe_from_pdf(page_path, table_settings):
-    pdf = pdfplumber.open(page_path)
-    df_total = pd.DataFrame()
-    # text = extract_text_from_pdf(unlocked_pdf_path)
-
-    for i in range(len(pdf.pages)):
-        p0 = pdf.pages[i]
-        table = p0.extract_table(table_settings)
-        # new_table = clean_table(pd.DataFrame(table))
-        df_total = df_total._append(table, ignore_index=True)
-        df_total.replace({r"\n": " "}, regex=True, inplace=True)
-        print(f"on page:{i}/{len(pdf.pages)}")
-    w = df_total.copy()
+def extract_dataframe_from_pdf(page_path, table_settings, workers=1):
+    if isinstance(page_path, pdfplumber.page.Page):
+        # Test-case probes share one parsed first page instead of re-opening the file
+        w = extract_page_dataframe(page_path, table_settings)
+    else:
+        w = extract_table_dataframe(page_path, table_settings, workers=workers)
     # rage_path = pdf_path.split(".")[0]
     # w.to_excel(f"raw_dataframe_{rage_path}.xlsx")
     return w
 
 def extract_dataframe_from_full_pdf(pdf_path):
-    pdf = pdfplumber.open(pdf_path)
-    df_total = pd.DataFrame()
-    # text = extract_text_from_pdf(unlocked_pdf_path)
-
-    for i in range(len(pdf.pages)):
-        p0 = pdf.pages[i]
-        table = p0.extract_table()
-        df_total = df_total._append(table, ignore_index=True)
-        df_total.replace({r"\n": " "}, regex=True, inplace=True)
+    df_total = extract_table_dataframe(pdf_path)
     w = df_total.drop_duplicates()
 
     return w
@@ -1020,6 +909,56 @@ def cut_the_datframe_from_headers(df):
     return df
 
 
+def _balance_mismatches(validated_df, tolerance):
+    """
+    Recomputes the running balance of a statement whose Credit/Debit/Balance columns are numeric.
+
+    Returns the expected balance after each row (a list, rounded to 2 places after every row
+    like the statement itself) and a boolean array marking rows whose balance differs from it
+    by more than `tolerance` without being a sign error.
+    """
+    credit = validated_df['Credit'].to_numpy()
+    debit = validated_df['Debit'].to_numpy()
+    balance = validated_df['Balance'].to_numpy()
+    if len(balance) == 0:
+        return [], np.zeros(0, dtype=bool)
+
+    def add_row(total, i):
+        if credit[i] > 0:
+            total += credit[i]
+        elif debit[i] > 0:
+            total -= debit[i]
+        return round(total, 2)
+
+    # Rounding after every row makes this a running total rather than a plain cumsum, which
+    # drifts from it by a paisa on amounts with more than 2 decimals
+    expected = list(accumulate(range(1, len(balance)), add_row, initial=balance[0]))
+
+    expected_balance = np.array(expected)
+    actual_balance = np.round(balance, 2)
+    difference = np.abs(expected_balance - actual_balance)
+    match = difference <= tolerance
+    # Absolute values are close but the signs differ: flagged, never raised
+    sign_error = (np.abs(np.abs(expected_balance) - np.abs(actual_balance)) <= tolerance) & (
+            expected_balance * actual_balance <= 0)
+    mismatch = ~match & ~sign_error
+    # The first row is the opening balance everything else is measured from
+    mismatch[0] = False
+    return expected, mismatch
+
+
+def _mismatch_details(validated_df, expected, i):
+    # Get date from the appropriate column
+    if 'Value Date' in validated_df.columns:
+        date = validated_df.loc[i, 'Value Date']
+    elif 'Date' in validated_df.columns:
+        date = validated_df.loc[i, 'Date']
+    else:
+        date = f"Row {i}"
+    actual_balance = round(validated_df['Balance'].to_numpy()[i], 2)
+    return date, expected[i], actual_balance, abs(expected[i] - actual_balance)
+
+
 def validate_bank_statement(df, tolerance=2, raise_error=True):
     """
     Validates a bank statement by checking that each row's balance matches the previous balance +/- credit/debit.
@@ -1050,72 +989,16 @@ def validate_bank_statement(df, tolerance=2, raise_error=True):
             # Replace NaN with 0
             validated_df[col].fillna(0, inplace=True)
 
-    # Create new columns
-    validated_df['Expected_Balance'] = 0.0
-    validated_df['Match'] = False
-    validated_df['Sign_Error'] = False
-    validated_df['Difference'] = 0.0
-
-    # First row's expected balance is the same as its actual balance
-    if len(validated_df) > 0:
-        validated_df.loc[0, 'Expected_Balance'] = validated_df.loc[0, 'Balance']
-        validated_df.loc[0, 'Match'] = True
-
-    # Track the true expected balance (not affected by display errors)
-    true_expected_balance = validated_df.loc[0, 'Balance'] if len(validated_df) > 0 else 0.0
+    expected, mismatch = _balance_mismatches(validated_df, tolerance)
 
-    # For each subsequent row, calculate expected balance
-    for i in range(1, len(validated_df)):
-        credit = validated_df.loc[i, 'Credit']
-        debit = validated_df.loc[i, 'Debit']
-        actual_balance = validated_df.loc[i, 'Balance']
-
-        # Get date from the appropriate column
-        try:
-            date = validated_df.loc[i, 'Value Date']
-        except KeyError:
-            try:
-                date = validated_df.loc[i, 'Date']
-            except KeyError:
-                date = f"Row {i}"
-
-        # Calculate the true expected balance based on previous true expected balance
-        if credit > 0:
-            true_expected_balance += credit
-        elif debit > 0:
-            true_expected_balance -= debit
-
-        # Round to avoid floating-point comparison issues
-        true_expected_balance = round(true_expected_balance, 2)
-        actual_balance = round(actual_balance, 2)
-
-        # Store the expected balance
-        validated_df.loc[i, 'Expected_Balance'] = true_expected_balance
-
-        # Calculate difference
-        difference = abs(true_expected_balance - actual_balance)
-        validated_df.loc[i, 'Difference'] = difference
-
-        # Check for match within tolerance
-        if difference <= tolerance:
-            validated_df.loc[i, 'Match'] = True
-        # Check for sign error (absolute values are close but signs differ)
-        elif abs(abs(true_expected_balance) - abs(
-                actual_balance)) <= tolerance and true_expected_balance * actual_balance <= 0:
-            validated_df.loc[i, 'Match'] = False
-            validated_df.loc[i, 'Sign_Error'] = True
-            # No error raised for sign errors, just flagged in the dataframe
-
-        # Otherwise, there's some other type of mismatch
-        else:
-            validated_df.loc[i, 'Match'] = False
-
-            if raise_error:
-                error_msg = (f"Balance mismatch at row {i} (Date: {date}): "
-                             f"Expected balance {true_expected_balance}, "
-                             f"Actual balance {actual_balance}. "
-                             f"Difference: {difference}")
-                raise Exception(error_msg)
+    if raise_error and mismatch.any():
+        i = int(np.argmax(mismatch))
+        date, true_expected_balance, actual_balance, difference = _mismatch_details(validated_df, expected, i)
+        error_msg = (f"Balance mismatch at row {i} (Date: {date}): "
+                     f"Expected balance {true_expected_balance}, "
+                     f"Actual balance {actual_balance}. "
+                     f"Difference: {difference}")
+        raise Exception(error_msg)
 
     return df
 
@@ -1151,75 +1034,18 @@ def validate_bank_statement_returns_error_message(df, tolerance=2, raise_error=T
             # Replace NaN with 0
             validated_df[col].fillna(0, inplace=True)
 
-    # Create new columns
-    validated_df['Expected_Balance'] = 0.0
-    validated_df['Match'] = False
-    validated_df['Sign_Error'] = False
-    validated_df['Difference'] = 0.0
-
-    # First row's expected balance is the same as its actual balance
-    if len(validated_df) > 0:
-        validated_df.loc[0, 'Expected_Balance'] = validated_df.loc[0, 'Balance']
-        validated_df.loc[0, 'Match'] = True
-
-    # Track the true expected balance (not affected by display errors)
-    true_expected_balance = validated_df.loc[0, 'Balance'] if len(validated_df) > 0 else 0.0
-
-    # For each subsequent row, calculate expected balance
-    for i in range(1, len(validated_df)):
-        credit = validated_df.loc[i, 'Credit']
-        debit = validated_df.loc[i, 'Debit']
-        actual_balance = validated_df.loc[i, 'Balance']
-        description = validated_df.loc[i, 'Description']
+    expected, mismatch = _balance_mismatches(validated_df, tolerance)
 
-        # Get date from the appropriate column
-        try:
-            date = validated_df.loc[i, 'Value Date']
-        except KeyError:
-            try:
-                date = validated_df.loc[i, 'Date']
-            except KeyError:
-                date = f"Row {i}"
-
-        # Calculate the true expected balance based on previous true expected balance
-        if credit > 0:
-            true_expected_balance += credit
-        elif debit > 0:
-            true_expected_balance -= debit
-
-        # Round to avoid floating-point comparison issues
-        true_expected_balance = round(true_expected_balance, 2)
-        actual_balance = round(actual_balance, 2)
-
-        # Store the expected balance
-        validated_df.loc[i, 'Expected_Balance'] = true_expected_balance
-
-        # Calculate difference
-        difference = abs(true_expected_balance - actual_balance)
-        validated_df.loc[i, 'Difference'] = difference
-
-        # Check for match within tolerance
-        if difference <= tolerance:
-            validated_df.loc[i, 'Match'] = True
-        # Check for sign error (absolute values are close but signs differ)
-        elif abs(abs(true_expected_balance) - abs(
-                actual_balance)) <= tolerance and true_expected_balance * actual_balance <= 0:
-            validated_df.loc[i, 'Match'] = False
-            validated_df.loc[i, 'Sign_Error'] = True
-            # No error raised for sign errors, just flagged in the dataframe
-
-        # Otherwise, there's some other type of mismatch
-        else:
-            validated_df.loc[i, 'Match'] = False
-
-            if raise_error:
-                error_msg = (f"Balance mismatch at row {i} (Date: {date}): "
-                             f"for Description '{description}'; "
-                             f"Expected balance {true_expected_balance}, "
-                             f"Actual balance {actual_balance}. "
-                             f"Difference: {difference}")
-                error_message = error_msg
-                # raise Exception(error_msg)
+    if raise_error and mismatch.any():
+        # The message describes the last mismatching row
+        i = int(np.flatnonzero(mismatch)[-1])
+        date, true_expected_balance, actual_balance, difference = _mismatch_details(validated_df, expected, i)
+        description = validated_df.loc[i, 'Description']
+        error_message = (f"Balance mismatch at row {i} (Date: {date}): "
+                         f"for Description '{description}'; "
+                         f"Expected balance {true_expected_balance}, "
+                         f"Actual balance {actual_balance}. "
+                         f"Difference: {difference}")
 
     return error_message
 
@@ -1436,74 +1262,93 @@ def run_test_case_E(bank, pdf_path, timestamp, CA_ID):
     # df = customer.custom_extraction(bank, pdf_path, 0, timestamp)
     return df, lists
 
+def remove_working_copies(*paths):
+    for path in paths:
+        if path:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"Failed to remove '{path}': {e}")
+
+
 def process_pdf_with_test_cases(pdf_path):
     print("Starting Test Case Processing...")
 
     # Load the first page of the PDF into memory once
     page = load_first_page_into_memory(pdf_path)
-    reader = PdfReader(page)
-    writer = PdfWriter()
-    age = reader.pages[0]
-    rotate_obj = age.get(NameObject("/Rotate"), NumberObject(0))
-    rotation = int(rotate_obj)  # Convert to plain int
-    coordinates_A = get_table_column_coordinates(page)
-
-    if rotation != 0:
-        print("-----------------------PDF IS ROTATED--------------------------")
-        # Test Case A
-        model_df_A, lists = run_test_case_A(page, 0)
-        if model_df_A is not None:
-            print("Test Case A passed")
-            return ["A", 0, lists, 0]  # Test Case A passed
+    # The TableTransformer pass is only run once C or D is actually evaluated. It reads the
+    # cropped page and writes an annotated copy; both go once no probe needs them any more.
+    separators = SharedStep(add_column_separators_in_memory, page,
+                            cleanup=lambda result: remove_working_copies(page, result and result[0]))
+    try:
+        return _probe_first_page(page, separators)
+    finally:
+        separators.close()
 
-        model_df_B, lists = run_test_case_B(page, 0)
-        if model_df_B is not None:
-            print("Test Case B passed")
-            return ["B", 0, lists, 0]  # Test Case B passed
 
-    else:
-        # Test Case A
-        model_df_A, lists = run_test_case_A(page, coordinates_A)
-        if model_df_A is not None:
-            print("Test Case A passed")
-            return ["A", 0, lists, coordinates_A]  # Test Case A passed
-
-        model_df_B, lists = run_test_case_B(page, coordinates_A)
-        if model_df_B is not None:
-            print("Test Case B passed")
-            return ["B", 0, lists, coordinates_A]  # Test Case B passed
-
-    # Test Case C1
-    # page_with_columns, coordinates_C, explicit_lines = self.add_column_separators_in_memory(page)
-    explicit_lines_x = get_table_column_coordinates_by_text(page)
-    model_df_C, lists = run_test_case_C(page, explicit_lines_x)
-    if model_df_C is not None:
-        print("Test Case C2 passed")
-        return ["C", 0, lists, explicit_lines_x]  # Test Case C passed
-
-    # Test Case C
-    page_with_columns, coordinates_C, explicit_lines = add_column_separators_in_memory(page)
-    model_df_C, lists = run_test_case_C(page_with_columns, explicit_lines)
-    if model_df_C is not None:
-        print("Test Case C passed")
-        return ["C", coordinates_C, lists, explicit_lines]  # Test Case C passed
-
-    # Test Case D
-    # page_with_rows = self.add_row_separators_in_memory(page)
-    # page_with_columns_n_rows, explicit_lines = self.add_column_separators_with_coordinates(page, coordinates_C)
-    model_df_D, lists = run_test_case_D(page_with_columns, explicit_lines)
-    if model_df_D is not None:
-        print("Test Case D passed")
-        return ["D", coordinates_C, lists, explicit_lines]  # Test Case D passed
-
-    # Test Case D2
-    model_df_D, lists = run_test_case_D(page, explicit_lines_x)
-    if model_df_D is not None:
-        print("Test Case D2 passed")
-        return ["D", 0, lists, explicit_lines_x]  # Test Case D passed
+def _probe_first_page(page, separators):
+    # Parse the first page once and share it between the coordinate finders and every probe
+    # that reads the unannotated page; warming `objects` up front leaves the page read-only
+    # while probes extract from it concurrently. Losing probes still running once the winner
+    # is picked fail against the closed document, and their results are discarded anyway.
+    with pdfplumber.open(page) as pdf:
+        first_page = pdf.pages[0]
+        first_page.objects
+        rotation = first_page.rotation
+        coordinates_A = table_column_coordinates(first_page)
+        explicit_lines_x = table_column_coordinates_by_text(first_page)
+
+        if rotation != 0:
+            print("-----------------------PDF IS ROTATED--------------------------")
+            lines_A = 0
+        else:
+            lines_A = coordinates_A
+
+        def probe_A():
+            model_df_A, lists = run_test_case_A(first_page, lines_A)
+            if model_df_A is not None:
+                print("Test Case A passed")
+                return ["A", 0, lists, lines_A]
+
+        def probe_B():
+            model_df_B, lists = run_test_case_B(first_page, lines_A)
+            if model_df_B is not None:
+                print("Test Case B passed")
+                return ["B", 0, lists, lines_A]
+
+        def probe_C2():
+            model_df_C, lists = run_test_case_C(first_page, explicit_lines_x)
+            if model_df_C is not None:
+                print("Test Case C2 passed")
+                return ["C", 0, lists, explicit_lines_x]
+
+        def probe_C():
+            page_with_columns, coordinates_C, explicit_lines = separators.result()
+            model_df_C, lists = run_test_case_C(page_with_columns, explicit_lines)
+            if model_df_C is not None:
+                print("Test Case C passed")
+                return ["C", coordinates_C, lists, explicit_lines]
+
+        def probe_D():
+            page_with_columns, coordinates_C, explicit_lines = separators.result()
+            model_df_D, lists = run_test_case_D(page_with_columns, explicit_lines)
+            if model_df_D is not None:
+                print("Test Case D passed")
+                return ["D", coordinates_C, lists, explicit_lines]
+
+        def probe_D2():
+            model_df_D, lists = run_test_case_D(first_page, explicit_lines_x)
+            if model_df_D is not None:
+                print("Test Case D2 passed")
+                return ["D", 0, lists, explicit_lines_x]
+
+        # Probes run concurrently but the winner is still picked in A, B, C2, C, D, D2 order
+        result = first_passing_probe([probe_A, probe_B, probe_C2, probe_C, probe_D, probe_D2])
+        if result is not None:
+            return result
 
-    else:
         # Test Case E
+        _, coordinates_C, explicit_lines = separators.result()
         lists = 0
         print("Test Case E begins : MOVING TOWARDS CUSTOM EXTRACTION")
         return ["E", coordinates_C, lists, explicit_lines]
@@ -1522,7 +1367,7 @@ def run_test_output_on_whole_pdf(list_a, pdf_in_saved_pdf, bank_name, timestamp,
                 "vertical_strategy": "lines",
                 "horizontal_strategy": "lines",
                 "edge_min_length": 20,
-            })
+            }, workers=EXTRACTION_WORKERS)
             model_df = new_mode_for_pdf(df, lists_of_columns)
             return model_df, None
         else:
@@ -1531,7 +1376,7 @@ def run_test_output_on_whole_pdf(list_a, pdf_in_saved_pdf, bank_name, timestamp,
                 "explicit_vertical_lines": explicit_lines,
                 "horizontal_strategy": "lines",
                 "intersection_x_tolerance": 20,
-            })
+            }, workers=EXTRACTION_WORKERS)
             model_df = new_mode_for_pdf(df, lists_of_columns)
             return model_df, None
 
@@ -1546,7 +1391,7 @@ def run_test_output_on_whole_pdf(list_a, pdf_in_saved_pdf, bank_name, timestamp,
                 "horizontal_strategy": "text",
                 "edge_min_length": 20,
                 "intersection_x_tolerance": 120
-            })
+            }, workers=EXTRACTION_WORKERS)
             model_df = new_mode_for_pdf(df, lists_of_columns)
             return model_df, None
         else:
@@ -1555,7 +1400,7 @@ def run_test_output_on_whole_pdf(list_a, pdf_in_saved_pdf, bank_name, timestamp,
                 "explicit_vertical_lines": explicit_lines,
                 "horizontal_strategy": "text",
                 "intersection_x_tolerance": 120
-            })
+            }, workers=EXTRACTION_WORKERS)
             model_df = new_mode_for_pdf(df, lists_of_columns)
             return model_df, None
 
@@ -1569,7 +1414,7 @@ def run_test_output_on_whole_pdf(list_a, pdf_in_saved_pdf, bank_name, timestamp,
             "explicit_vertical_lines": explicit_lines,
             "horizontal_strategy": "lines",
             "intersection_x_tolerance": 120
-        })
+        }, workers=EXTRACTION_WORKERS)
         model_df = new_mode_for_pdf(df, lists_of_columns)
         return model_df, None
 
@@ -1583,7 +1428,7 @@ def run_test_output_on_whole_pdf(list_a, pdf_in_saved_pdf, bank_name, timestamp,
             "explicit_vertical_lines": explicit_lines,
             "horizontal_strategy": "text",
             "intersection_x_tolerance": 120,
-        })
+        }, workers=EXTRACTION_WORKERS)
         model_df = new_mode_for_pdf(df, lists_of_columns)
         return model_df, None
 
@@ -1597,8 +1442,8 @@ def run_test_output_on_whole_pdf(list_a, pdf_in_saved_pdf, bank_name, timestamp,
 
 def is_pdf_encoded(pdf_path):
     try:
-        reader = PdfReader(pdf_path)
-        total_pages = len(reader.pages)
+        context = get_document_context(pdf_path)
+        total_pages = context.page_count
         
         # Choose pages 0 to 3 if total_pages > 4, else all available pages
         if total_pages > 4:
@@ -1609,9 +1454,10 @@ def is_pdf_encoded(pdf_path):
         readable_count = 0
 
         for page_number in page_indices:
-            page = reader.pages[page_number]
-            text = page.extract_text()
+            text = context.page_text(page_number)
             if text:
+                # pdfminer writes glyphs it cannot map to text as "(cid:N)"; count those as unreadable
+                text = re.sub(r"\(cid:\d+\)", "\x00", text)
                 printable_chars = sum(char.isprintable() for char in text)
                 if printable_chars / len(text) >= 0.5:
                     readable_count += 1
@@ -1625,11 +1471,50 @@ def is_pdf_encoded(pdf_path):
         return f"An unexpected error occurred: {e}"
 
 
+def cached_layout_passes_first_page(list_test, pdf_in_saved_pdf, bank_name, timestamp, CA_ID):
+    # A cached layout has to clear the same bar probing sets: the first page must balance
+    page = load_first_page_into_memory(pdf_in_saved_pdf)
+    try:
+        model_df, _ = run_test_output_on_whole_pdf(copy.deepcopy(list_test), page, bank_name, timestamp, CA_ID)
+        validate_bank_statement(model_df)
+        return True
+    except Exception as e:
+        print(f"Cached layout failed validation: {e}")
+        return False
+    finally:
+        remove_working_copies(page)
+
+
 # Main function to run test cases with optimizations
 def extract_with_test_cases(bank_name, pdf_path, pdf_password, CA_ID):
     timestamp = "1234_temp"
     pdf_in_saved_pdf = unlock_and_add_margins_to_pdf(pdf_path, pdf_password, timestamp, CA_ID)
-    list_test = process_pdf_with_test_cases(pdf_in_saved_pdf)
+    # The prepared copy is parsed once and shared by the fingerprint, first-page text and extraction
+    get_document_context(pdf_in_saved_pdf)
+    try:
+        return _extract_prepared_pdf(bank_name, pdf_in_saved_pdf, timestamp, CA_ID)
+    finally:
+        release_document_context(pdf_in_saved_pdf)
+        # Nothing reads the prepared copy once extraction returns. The name is unique to this
+        # call, so only this job's copy is removed
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(pdf_in_saved_pdf)
+
+
+def _extract_prepared_pdf(bank_name, pdf_in_saved_pdf, timestamp, CA_ID):
+    # Statements in a layout we have already probed skip straight to whole-PDF extraction
+    fingerprint = layout_fingerprint(pdf_in_saved_pdf)
+    list_test = load_layout(fingerprint)
+    if list_test is not None:
+        print(f"Layout cache hit: reusing Test Case {list_test[0]}")
+        if not cached_layout_passes_first_page(list_test, pdf_in_saved_pdf, bank_name, timestamp, CA_ID):
+            evict_layout(fingerprint)
+            list_test = None
+
+    if list_test is None:
+        list_test = process_pdf_with_test_cases(pdf_in_saved_pdf)
+        store_layout(fingerprint, list_test)
+
     text = extract_text_from_pdf(pdf_in_saved_pdf)
     idf, explicit_lines = run_test_output_on_whole_pdf(list_test, pdf_in_saved_pdf, bank_name, timestamp, CA_ID)
     return idf, text, explicit_lines
@@ -1,7 +1,6 @@
 import os
 from dateutil import parser
 from openpyxl.styles import Font
-from pypdf import PdfReader
 import re
 import shutil
 import io
@@ -10,20 +9,14 @@ from openpyxl.styles import Alignment
 import time
 import pandas as pd
 import numpy as np
-import PyPDF2
-from PyPDF2 import PdfReader, PdfWriter
-import pdfplumber
 from datetime import datetime, timedelta
 import regex as re
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl import load_workbook
-import datefinder
 from calendar import monthrange
 import calendar
 from openpyxl.styles import Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 from openpyxl import Workbook, load_workbook
 from openpyxl.utils import get_column_letter
 import openpyxl
@@ -47,27 +40,28 @@ BASE_DIR = get_base_dir()
 logger.info("Base Dir : ", BASE_DIR)
 #from old_bank_extractions import CustomStatement
 import json
+from .document_context import find_document_context
+from .category_rules import CategoryRuleSet, CATEGORY_RULES
 from .code_for_extraction import extract_text_from_pdf, extract_with_test_cases, model_for_pdf, extract_dataframe_from_pdf, validate_bank_statement_returns_error_message, is_pdf_encoded
-import  argparse
 
-p = argparse.ArgumentParser()
-p.add_argument(
-    "--customer-sheet-path",
-    default=os.path.join(BASE_DIR, "Customer_category.xlsx"),
+# Entry points set this through `configure` (main.py maps --customer-sheet-path onto it)
+CUSTOMER_SHEET_PATH = os.environ.get(
+    "CUSTOMER_SHEET_PATH",
+    os.path.join(BASE_DIR, "Customer_category.xlsx"),
 )
-args = p.parse_args()
 
-# CUSTOMER_SHEET_PATH = os.environ.get(
-#     "CUSTOMER_SHEET_PATH",
-#     os.path.join(BASE_DIR, "Customer_category.xlsx"),
-# )
-CUSTOMER_SHEET_PATH = args.customer_sheet_path
-
-print("aiyaz CUSTOMER_SHEET_PATH from env = ",os.environ.get(
-    "CUSTOMER_SHEET_PATH") )
 
+def configure(customer_sheet_path=None):
+    """
+    Applies process-wide settings for the analytics functions. Called by entry points
+    instead of parsing the command line at import time, so importing this module from
+    another process (the API bridge, tests) has no side effects.
+    """
+    global CUSTOMER_SHEET_PATH
+    if customer_sheet_path:
+        CUSTOMER_SHEET_PATH = customer_sheet_path
+    print("CUSTOMER_SHEET_PATH configured as ", CUSTOMER_SHEET_PATH)
 
-print("aiyaz CUSTOMER_SHEET_PATH from ARG = ",CUSTOMER_SHEET_PATH) 
 ##EXTRACTION PROCESS
 def extract_text_from_file(file_path):
 
@@ -547,6 +541,39 @@ def monthly( df):
     monthly_avg.iloc[-1, 0] = "Average"
     return monthly_avg
 
+def _days_in_months(month_columns):
+    # NaN for columns that are not "%b-%Y" month labels
+    months = pd.to_datetime(pd.Series(month_columns, dtype=object), format="%b-%Y", errors="coerce")
+    return months.dt.days_in_month.to_numpy(dtype=float)
+
+
+def _bank_eod_pivot(bank_daily, global_max_date):
+    """
+    Lays one bank's closing balances (a Series indexed by day) out as the EOD sheet does:
+    a "Day" column 1-31 and one column per month from the bank's first month to its last.
+
+    Days without a transaction carry the previous balance forward across month ends, days
+    before the first transaction are 0, and day slots a month does not have are 0. In the
+    bank's last month, days after the last transaction date of any bank are 0 as well.
+    """
+    dates = bank_daily.index
+    months = pd.period_range(dates.min().to_period("M"), dates.max().to_period("M"), freq="M")
+    # Month-major, so a flat forward fill runs day 1-31 of each month in calendar order
+    grid = np.full((len(months), 31), np.nan)
+    month_pos = (dates.year.to_numpy() - months[0].year) * 12 + (dates.month.to_numpy() - months[0].month)
+    grid[month_pos, dates.day.to_numpy() - 1] = bank_daily.to_numpy(dtype=float)
+    grid = pd.Series(grid.ravel()).ffill().fillna(0.0).to_numpy().reshape(grid.shape)
+
+    days = np.arange(1, 32)
+    grid[days[None, :] > months.days_in_month.to_numpy()[:, None]] = 0.0
+    if global_max_date is not None and months[-1] == global_max_date.to_period("M"):
+        grid[-1, days > global_max_date.day] = 0.0
+
+    pivot_df = pd.DataFrame(grid.T, columns=pd.Index(months.strftime("%b-%Y"), name="MonthStr"))
+    pivot_df.insert(0, "Day", days)
+    return pivot_df
+
+
 def eod(df_original):
     df = df_original.copy()
     df["Value Date"] = pd.to_datetime(
@@ -557,97 +584,16 @@ def eod(df_original):
     df.dropna(subset=["Balance"], inplace=True)  # Option: Drop rows with invalid balances
     if df.empty: return pd.DataFrame()  # Handle empty df after balance cleaning
     df.sort_values(by=["Bank", "Value Date"], inplace=True)  # Sort by Bank too for consistency
-    df["YearMonth"] = df["Value Date"].dt.strftime("%Y%m")  # Keep as string initially for easier date range generation
-    df["MonthStr"] = df["Value Date"].dt.strftime("%b-%Y")
-    df["Date"] = df["Value Date"].dt.day
-    global_max_date = df["Value Date"].max() if not df.empty else None
-    df = df[["Value Date", "Balance", "YearMonth", "MonthStr", "Date", "Bank"]]
-    bank_names = df["Bank"].unique().tolist()
-    multiple_eods = []
-    all_banks_processed_months = set()  # Keep track of all month columns across banks
-    for bank in bank_names:
-        idf = df[df["Bank"] == bank].copy()  # Use copy for safety
-        if idf.empty: continue  # Skip banks with no valid data
-        min_ym_str = idf['YearMonth'].min()
-        max_ym_str = idf['YearMonth'].max()
-        start_date = pd.to_datetime(min_ym_str, format='%Y%m')
-        end_date = pd.to_datetime(max_ym_str, format='%Y%m')
-        all_month_starts = pd.date_range(start=start_date, end=end_date, freq='MS')
-        result_eod_bank = pd.DataFrame()  # Accumulate results for this bank
-        previous_month_end_balance = None  # Reset for each bank
-        processed_months_strs_bank = []  # Keep track of month strings in order for THIS bank
-        for month_start in all_month_starts:
-            current_ym_str = month_start.strftime('%Y%m')
-            current_month_str = month_start.strftime('%b-%Y')
-            processed_months_strs_bank.append(current_month_str)  # Add to ordered list for pivoting
-            all_banks_processed_months.add(current_month_str)  # Add to global set for final merging
-            month_data_exists = current_ym_str in idf['YearMonth'].values
-            eod_month_df = pd.DataFrame()  # Initialize DataFrame for the current month
-            if month_data_exists:
-                month_subset = idf.loc[idf["YearMonth"] == current_ym_str]
-                eod_month_df = month_subset.drop_duplicates(subset="Date", keep="last").copy()  # Use copy
-                eod_month_df = eod_month_df.set_index("Date")
-                all_days_index = pd.RangeIndex(start=1, stop=32, name="Date")
-                eod_month_df = eod_month_df.reindex(all_days_index)
-                eod_month_df["Bank"] = bank
-                eod_month_df["MonthStr"] = current_month_str
-                eod_month_df["YearMonth"] = current_ym_str
-                eod_month_df.reset_index(inplace=True)  # Get 'Date' back as column
-                if previous_month_end_balance is not None and pd.isna(eod_month_df.loc[0, "Balance"]):
-                    first_valid_idx = eod_month_df['Balance'].first_valid_index()
-                    if first_valid_idx is not None:
-                        eod_month_df.loc[0:first_valid_idx - 1, 'Balance'] = previous_month_end_balance
-                    else:  # Whole month was NaN initially (only possible if input month_subset was empty, but check exists)
-                        eod_month_df['Balance'] = previous_month_end_balance
-                eod_month_df["Balance"] = eod_month_df["Balance"].ffill()
-                fill_value = 0.0 if previous_month_end_balance is None else previous_month_end_balance
-                eod_month_df["Balance"] = eod_month_df["Balance"].fillna(fill_value)
-                if not eod_month_df.empty:
-                    previous_month_end_balance = eod_month_df["Balance"].iloc[-1]
-
-            else:
-                fill_balance = 0.0 if previous_month_end_balance is None else previous_month_end_balance
-                eod_month_df = pd.DataFrame({
-                    "Date": range(1, 32),
-                    "Balance": fill_balance,
-                    "YearMonth": current_ym_str,
-                    "MonthStr": current_month_str,
-                    "Bank": bank,
-                    "Value Date": pd.NaT  # Or None
-                })
-            result_eod_bank = pd.concat([result_eod_bank, eod_month_df], ignore_index=True)
-        if result_eod_bank.empty: continue  # Skip if bank had no processable data at all
-        pivot_df = result_eod_bank.pivot(
-            index="Date", columns="MonthStr", values="Balance"
-        )  # Index is 'Date' (1-31)
-        pivot_df = pivot_df.reindex(columns=processed_months_strs_bank)
-        pivot_df.reset_index(inplace=True)
-        pivot_df.rename(columns={"Date": "Day"}, inplace=True)
-        day_col_name = "Day"  # Use the actual column name
-        pivot_numeric_cols = pivot_df.columns.difference([day_col_name])  # Exclude 'Day'/'Date'
-        mask = pd.DataFrame(False, index=pivot_df.index, columns=pivot_numeric_cols)
-        for col in pivot_numeric_cols:
-            try:
-                month_dt = pd.to_datetime(col, format="%b-%Y")
-                days_in_month = month_dt.days_in_month
-                # Use the correct day column name here
-                mask[col] = pivot_df[day_col_name] > days_in_month
-            except ValueError:
-                print(f"Could not parse column '{col}' to determine days in month during zeroing.",
-                                UserWarning)
-        pivot_df.loc[:, pivot_numeric_cols] = pivot_df.loc[:, pivot_numeric_cols].mask(mask, 0.0)
-        if global_max_date and not pivot_df.empty:
-            last_month_in_pivot = pivot_df.columns[-1]
-            try:
-                last_month_dt = pd.to_datetime(last_month_in_pivot, format="%b-%Y")
-                global_max_month_dt = pd.Timestamp(global_max_date.year, global_max_date.month, 1)
-                if last_month_dt == global_max_month_dt:
-                    end_day_of_global_max = global_max_date.day
-                    pivot_df.loc[pivot_df[day_col_name] > end_day_of_global_max, last_month_in_pivot] = 0.0
-            except ValueError:
-                print(f"Could not parse last column '{last_month_in_pivot}' during final day zeroing.",
-                                UserWarning)
-        multiple_eods.append(pivot_df)
+    global_max_date = df["Value Date"].max()
+    # The balance a bank closed each day on is the last one listed for that day
+    daily = df.groupby(["Bank", df["Value Date"].dt.normalize()])["Balance"].last()
+    multiple_eods = [
+        _bank_eod_pivot(bank_daily.droplevel(0), global_max_date)
+        for _, bank_daily in daily.groupby(level=0)
+    ]
+    all_banks_processed_months = set()  # Month columns across banks
+    for pivot_df in multiple_eods:
+        all_banks_processed_months.update(pivot_df.columns[1:])
     if not multiple_eods:
         return pd.DataFrame()  # No data processed for any bank
     if len(multiple_eods) == 1:
@@ -685,24 +631,14 @@ def opening_and_closing_bal(edf, transactions_df):
         if edf_data_only.iloc[-1, 0] == "Total":
             edf_data_only = edf_data_only.iloc[:-1]
             edf_data_only.reset_index(drop=True, inplace=True)
-        for month_str in month_columns:
-            try:
-                month_dt = pd.to_datetime(month_str, format="%b-%Y")
-                days_in_month = month_dt.days_in_month
-                last_day_index = days_in_month - 1
-                if 0 <= last_day_index < len(edf_data_only):
-                    balance = edf_data_only.iloc[last_day_index][month_str]
-                    closing_bal[month_str] = float(balance)
-                else:
-                    closing_bal[month_str] = np.nan
-            except ValueError:
-                closing_bal[month_str] = np.nan
-            except KeyError:
-                # warnings.warn(f"Column '{month_str}' not found during closing balance calculation.", UserWarning)
-                closing_bal[month_str] = np.nan
-            except Exception as e:
-                # warnings.warn(f"An unexpected error occurred calculating closing balance for {month_str}: {e}",UserWarning)
-                closing_bal[month_str] = np.nan
+        # Closing balance is the last calendar day of each month; unparseable months get NaN
+        balances = edf_data_only[month_columns].apply(pd.to_numeric, errors="coerce")
+        last_day_index = _days_in_months(month_columns) - 1
+        in_range = (last_day_index >= 0) & (last_day_index < len(edf_data_only))
+        closing = np.full(len(month_columns), np.nan)
+        closing[in_range] = balances.to_numpy(dtype=float)[
+            last_day_index[in_range].astype(int), np.flatnonzero(in_range)]
+        closing_bal.update(zip(month_columns, closing.tolist()))
 
         ordered_months = month_columns
         for i, month in enumerate(ordered_months):
@@ -812,6 +748,32 @@ def avgs_df( df):
 
     return df
 
+FIXED_DAY_SETS = [
+    {"days": [5, 15, 25], "label": "Avg_Days_5_15_25"},
+    {"days": [5, 10, 15, 25], "label": "Avg_Days_5_10_15_25"},
+    {"days": [1, 5, 10, 15, 20, 25], "label": "Avg_Days_1_5_10_15_20_25"},
+    {"days": [8, 10, 15, 20, 25], "label": "Avg_Days_8_10_15_20_25"},
+    {"days": [1, 5, 10, 15, 20], "label": "Avg_Days_1_5_10_15_20"},
+    {"days": [5, 10, 15, 20, 25], "label": "Avg_Days_5_10_15_20_25"},
+    {"days": [1, 7, 14, 21, 28], "label": "Avg_Days_1_7_14_21_28"},
+    {"days": [1, 5, 10, 15, 25], "label": "Avg_Days_1_5_10_15_25"},
+    {"days": [5, 15, 25, 30], "label": "Avg_Days_5_15_25_30"},
+    {"days": [2, 4, 10, 17, 21], "label": "Avg_Days_2_4_10_17_25"},
+    {"days": [5, 15, 25, 30], "label": "Avg_Days_5_15_25_30"},
+    {"days": [1, 5, 15, 20, 25], "label": "Avg_Days_1_5_15_20_25"},
+    {"days": [4, 5, 7, 10, 15, 25], "label": "Avg_Days_4_5_7_10_15_25"},
+    {"days": [5, 10, 15, 20, 25, 30], "label": "Avg_Days_5_10_15_20_25_30"},
+    {"days": [5, 10, 15, 20, 26], "label": "Avg_Days_5_10_15_20_26"},
+    {"days": [1, 5, 10, 18, 25], "label": "Avg_Days_1_5_10_18_25"},
+    {"days": [2, 10, 20, 30], "label": "Avg_Days_2_10_20_30"},
+]
+# Row positions of each day set in a day 1-31 matrix, padded with the row after day 31
+FIXED_DAY_SET_INDEX = np.array([
+    [day - 1 for day in day_set["days"]] + [31] * (6 - len(day_set["days"]))
+    for day_set in FIXED_DAY_SETS
+])
+
+
 def calculate_fixed_day_average(data):
         day_col_name = 'Day'
         if day_col_name not in data.columns:
@@ -826,55 +788,23 @@ def calculate_fixed_day_average(data):
         for col in month_columns:
             calc_df[col] = pd.to_numeric(calc_df[col], errors='coerce').fillna(
                 0)  # Coerce errors to NaN, then fill with 0
-        daily_averages = {day_col_name: "Daily_Avg"}
-        for month_str in month_columns:
-            try:
-                month_dt = pd.to_datetime(month_str, format="%b-%Y")
-                days_in_month = month_dt.days_in_month
-                valid_day_data = calc_df.loc[calc_df[day_col_name] <= days_in_month, month_str]
-                month_sum = valid_day_data.sum()
-                if days_in_month > 0:
-                    daily_averages[month_str] = month_sum / float(days_in_month)
-                else:
-                    daily_averages[month_str] = np.nan
-            except Exception as e:
-                daily_averages[month_str] = np.nan
-        Average_df = pd.DataFrame([daily_averages])
-        sets_of_days = [
-            {"days": [5, 15, 25], "label": "Avg_Days_5_15_25"},
-            {"days": [5, 10, 15, 25], "label": "Avg_Days_5_10_15_25"},
-            {"days": [1, 5, 10, 15, 20, 25], "label": "Avg_Days_1_5_10_15_20_25"},
-            {"days": [8, 10, 15, 20, 25], "label": "Avg_Days_8_10_15_20_25"},
-            {"days": [1, 5, 10, 15, 20], "label": "Avg_Days_1_5_10_15_20"},
-            {"days": [5, 10, 15, 20, 25], "label": "Avg_Days_5_10_15_20_25"},
-            {"days": [1, 7, 14, 21, 28], "label": "Avg_Days_1_7_14_21_28"},
-            {"days": [1, 5, 10, 15, 25], "label": "Avg_Days_1_5_10_15_25"},
-            {"days": [5, 15, 25, 30], "label": "Avg_Days_5_15_25_30"},
-            {"days": [2, 4, 10, 17, 21], "label": "Avg_Days_2_4_10_17_25"},
-            {"days": [5, 15, 25, 30], "label": "Avg_Days_5_15_25_30"},
-            {"days": [1, 5, 15, 20, 25], "label": "Avg_Days_1_5_15_20_25"},
-            {"days": [4, 5, 7, 10, 15, 25], "label": "Avg_Days_4_5_7_10_15_25"},
-            {"days": [5, 10, 15, 20, 25, 30], "label": "Avg_Days_5_10_15_20_25_30"},
-            {"days": [5, 10, 15, 20, 26], "label": "Avg_Days_5_10_15_20_26"},
-            {"days": [1, 5, 10, 18, 25], "label": "Avg_Days_1_5_10_18_25"},
-            {"days": [2, 10, 20, 30], "label": "Avg_Days_2_10_20_30"},
-        ]
-        avg_balance_df_list = []
-        for day_set in sets_of_days:
-            selected_days_subset = calc_df[calc_df[day_col_name].isin(day_set["days"])]
-            set_averages = {day_col_name: day_set["label"]}
-            for month_str in month_columns:
-                try:
-                    month_dt = pd.to_datetime(month_str, format="%b-%Y")
-                    days_in_month = month_dt.days_in_month
-                    valid_selected_days = selected_days_subset[selected_days_subset[day_col_name] <= days_in_month]
-                    month_avg = valid_selected_days[month_str].mean()
-                    set_averages[month_str] = month_avg
-                except Exception as e:
-                    set_averages[month_str] = np.nan
-            average_balance_df = pd.DataFrame([set_averages])
-            avg_balance_df_list.append(average_balance_df)
-        all_avg_balances = pd.concat([Average_df] + avg_balance_df_list, ignore_index=True)
+        # Month columns as a day x month matrix; slots past a month's last day never count
+        days_in_month = _days_in_months(month_columns)
+        balances = calc_df.drop_duplicates(day_col_name).set_index(day_col_name)[month_columns]
+        balances = balances.reindex(range(1, 32)).to_numpy(dtype=float)
+        valid = np.arange(1, 32)[:, None] <= days_in_month[None, :]
+        balances[~valid] = np.nan
+
+        labels = ["Daily_Avg"] + [day_set["label"] for day_set in FIXED_DAY_SETS]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Summed month by month over contiguous days, in the order a column sum adds them
+            daily_averages = np.nansum(np.ascontiguousarray(balances.T), axis=1) / days_in_month
+            # One selection of every day set, padded to the longest with day slot 32 (always NaN)
+            padded = np.vstack([balances, np.full((1, len(month_columns)), np.nan)])
+            selected = padded[FIXED_DAY_SET_INDEX]
+            set_averages = np.nansum(selected, axis=1) / (~np.isnan(selected)).sum(axis=1)
+        all_avg_balances = pd.DataFrame(np.vstack([daily_averages, set_averages]), columns=month_columns)
+        all_avg_balances.insert(0, day_col_name, labels)
         numeric_cols = all_avg_balances.columns.difference([day_col_name])
         all_avg_balances[numeric_cols] = all_avg_balances[numeric_cols].round(2)
         averages_with_monthly = calculate_monthly_averages(all_avg_balances)
@@ -1255,6 +1185,37 @@ def pmt_bl():
     return payment
 
 
+# Description prefixes categorised before any bank-specific parsing, in the order they apply;
+# a later rule overrides an earlier one. Descriptions are lower-cased by then, so the
+# case-sensitive "tChg" never matches; it is kept as it always was.
+PREFIX_CATEGORY_RULES = CategoryRuleSet([
+    (r"^pos.*", "Debit", "POS-Dr", False),
+    (r"^pos.*", "Credit", "POS-Cr", False),
+    (r"^(vps|ips|ecom|pur|pcd|edc|ecompur)", "Debit", "POS-Dr", False),
+    (r"^(vps|ips|ecom|pur|pcd|edc|ecompur)", "Credit", "POS-Cr", False),
+    (r"^(bctt|nchg|tChg|tip/scg|rate\.diff|owchquereturncharges|inwardchqreturncharge|chrg|incidentalcharges|iwchq|smschrg|chrg:sms|\*chrg:sms|nachreturncharges|fundtransfercharges|cashwithdrawalchgs|impschg|monthlysmscha|amcatmcharges|monthlyservicechrgs|smsalert|penalcharges|sgst|cgst|bulkcharges)",
+     "Debit", "Bank Charges", False),
+    (r"(wchrgs)", "Debit", "Bank Charges", True),
+    (r"^(int)", "Credit", "Bank Interest Received", False),
+    (r"^(r-ret-utr)", "Debit", "Bounce", False),
+    (r"^(ccwd|vat|mat|nfs|atm|atm-cash-axis|atm-cash|atw|csw|atd|ati|vmt|inf|cwdr|self|cash-atm|atl/|cashpm|withdrawal|chequewdl)",
+     "Debit", "Cash Withdrawal", True),
+    (r"^(pac)", "Debit", "General insurance", True),
+    (r"^(idtx)", "Debit", "Indirect tax", True),
+    (r"^(int.coll)", "Debit", "interest paid", True),
+    (r"^(eba|autosweep|growwpay|axismutualfund)", "Debit", "Investment", True),
+    (r"(growwpay)", "Debit", "Investment", True),
+    (r"^(lccbrncms)", "Debit", "Local cheque collection", True),
+    (r"^(emi|lnpy)", "Debit", "Probable EMI", True),
+    (r"^(gib)", "Debit", "Tax Payment", True),
+    (r"(gsttaxpayment|gst@)", "Debit", "GST Paid", True),
+    (r"^(ft-rev|revchrg|rev:imps|imps:rec|imps_ret)", "Credit", "Refund/Reversal", True),
+    (r"^(imps:rec|ref-tr)", "Credit", "Refund/Reversal", True),
+    (r"^(revsweep|sewwptrf)", "Credit", "Redemption,Dividend & Interest", True),
+    (r"^(rchg)", "Credit", "Recharge", True),
+])
+
+
 def category_add_ca(df):
     x = df["Balance"]
     df["Debit"] = pd.to_numeric(df["Debit"], errors="coerce")
@@ -1267,96 +1228,12 @@ def category_add_ca(df):
     print("CUSTOMER_SHEET_PATH from common_function category_add_ca - ",CUSTOMER_SHEET_PATH)
     excel2 = CUSTOMER_SHEET_PATH
     # excel2 = os.path.join(BASE_DIR, "Customer_category.xlsx")
-    df1 = pd.read_excel(excel_file_path)
-    df2_additional = pd.read_excel(excel2)
-    df2 = pd.concat([df1, df2_additional], ignore_index=True)
     print("excel_file_path -",excel_file_path)
-    # df2 = pd.read_excel(excel_file_path)
 
     # Initialize the 'Category' column with "Suspense" for all rows
     df["Category"] = "Suspense"
 
-    pos_pattern = r"^pos.*"
-    df.loc[(df["Description"].str.contains(pos_pattern, regex=True)) & (df["Debit"] > 0), "Category",] = "POS-Dr"
-    df.loc[(df["Description"].str.contains(pos_pattern, regex=True)) & (df["Credit"] > 0), "Category",] = "POS-Cr"
-
-    pos_pattern_2 = r"^(vps|ips|ecom|pur|pcd|edc|ecompur)"
-    df.loc[(df["Description"].str.contains(pos_pattern_2, regex=True)) & (df["Debit"] > 0), "Category",] = "POS-Dr"
-    df.loc[(df["Description"].str.contains(pos_pattern_2, regex=True)) & (df["Credit"] > 0), "Category",] = "POS-Cr"
-
-    def categorize_bank_charges(df):
-        Bank_charges = r"^(bctt|nchg|tChg|tip/scg|rate\.diff|owchquereturncharges|inwardchqreturncharge|chrg|incidentalcharges|iwchq|smschrg|chrg:sms|\*chrg:sms|nachreturncharges|fundtransfercharges|cashwithdrawalchgs|impschg|monthlysmscha|amcatmcharges|monthlyservicechrgs|smsalert|penalcharges|sgst|cgst|bulkcharges)"
-        df = df[~df["Description"].str.contains("POS-Cr|POS-Dr", regex=True, na=False)]
-        df.loc[(df["Description"].str.contains(Bank_charges, regex=True)) & (
-                    df["Debit"] > 0), "Category",] = "Bank Charges"
-        return df
-
-    df = categorize_bank_charges(df)
-
-    Bank_charges = r"(wchrgs)"
-    df.loc[(df["Description"].str.contains(Bank_charges, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category"] = "Bank Charges"
-
-    Bank_Interest_Recieved = r"^(int)"
-    df.loc[(df["Description"].str.contains(Bank_Interest_Recieved, regex=True)) & (
-                df["Credit"] > 0), "Category",] = "Bank Interest Received"
-
-    Bounce = r"^(r-ret-utr)"
-    df.loc[(df["Description"].str.contains(Bounce, regex=True)) & (df["Debit"] > 0), "Category",] = "Bounce"
-
-    Cash_Withdrawal = r"^(ccwd|vat|mat|nfs|atm|atm-cash-axis|atm-cash|atw|csw|atd|ati|vmt|inf|cwdr|self|cash-atm|atl/|cashpm|withdrawal|chequewdl)"
-    df.loc[(df["Description"].str.contains(Cash_Withdrawal, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "Cash Withdrawal"
-
-    General_insurance = r"^(pac)"
-    df.loc[(df["Description"].str.contains(General_insurance, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "General insurance"
-
-    Indirect_tax = r"^(idtx)"
-    df.loc[(df["Description"].str.contains(Indirect_tax, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "Indirect tax"
-
-    interest_paid = r"^(int.coll)"
-    df.loc[(df["Description"].str.contains(interest_paid, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "interest paid"
-
-    investment = r"^(eba|autosweep|growwpay|axismutualfund)"
-    df.loc[(df["Description"].str.contains(investment, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "Investment"
-    investment = r"(growwpay)"
-    df.loc[(df["Description"].str.contains(investment, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "Investment"
-
-    Local_cheque_collection = r"^(lccbrncms)"
-    df.loc[(df["Description"].str.contains(Local_cheque_collection, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "Local cheque collection"
-
-    emi = r"^(emi|lnpy)"
-    df.loc[
-        (df["Description"].str.contains(emi, case=False, regex=True)) & (df["Debit"] > 0), "Category",] = "Probable EMI"
-
-    Tax_Payment = r"^(gib)"
-    df.loc[(df["Description"].str.contains(Tax_Payment, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "Tax Payment"
-    Tax_Payment = r"(gsttaxpayment|gst@)"
-    df.loc[(df["Description"].str.contains(Tax_Payment, case=False, regex=True)) & (
-                df["Debit"] > 0), "Category",] = "GST Paid"
-
-    Refund_Reversal = r"^(ft-rev|revchrg|rev:imps|imps:rec|imps_ret)"
-    df.loc[(df["Description"].str.contains(Refund_Reversal, case=False, regex=True)) & (
-                df["Credit"] > 0), "Category",] = "Refund/Reversal"
-
-    Refund = r"^(imps:rec|ref-tr)"
-    df.loc[(df["Description"].str.contains(Refund, case=False, regex=True)) & (
-                df["Credit"] > 0), "Category",] = "Refund/Reversal"
-
-    Redemption = r"^(revsweep|sewwptrf)"
-    df.loc[(df["Description"].str.contains(Redemption, case=False, regex=True)) & (
-                df["Credit"] > 0), "Category",] = "Redemption,Dividend & Interest"
-
-    Recharge = r"^(rchg)"
-    df.loc[(df["Description"].str.contains(Recharge, case=False, regex=True)) & (
-                df["Credit"] > 0), "Category",] = "Recharge"
+    df["Category"] = PREFIX_CATEGORY_RULES.categorise(df["Description"], df["Debit"], df["Credit"], df["Category"])
 
     # Function to extract and clean name from 'ipay/inst/neft/' transactions
     def extract_ipay_neft_name(description):
@@ -1793,14 +1670,9 @@ def category_add_ca(df):
 
     Bounce(df)
 
-    # Iterate through the rows of df2
-    for _, keyword_row in df2.iterrows():
-        mask = df["Description"].str.contains(keyword_row["Description"], case=False, na=False)
-        if keyword_row["Debit / Credit"] == "Debit":
-            mask = mask & (df["Debit"] > 0)  # check if Debit is greater than 0
-        elif keyword_row["Debit / Credit"] == "Credit":
-            mask = mask & (df["Credit"] > 0)  # check if Credit is greater than 0
-        df.loc[mask, "Category"] = keyword_row["Category"]
+    # Keyword rows of the category workbooks, parsed and compiled once per process
+    keyword_rules = CATEGORY_RULES.keyword_rules(excel_file_path, excel2)
+    df["Category"] = keyword_rules.categorise(df["Description"], df["Debit"], df["Credit"], df["Category"])
     #####
     MPS = df[df["Description"].str.contains("mps/", na=False) & ~df["Description"].str.contains("imps/")]
     if not MPS.empty:
@@ -2470,6 +2342,20 @@ def append_to_excel(file_path, new_data):
 
     return file_path
 
+def filter_non_defaulters(df1, df2):
+    # Drops the empty rows of categories the workbooks mark as non_default
+    for row_number, row in df1.iterrows():
+        if row['Total'] == 0:
+            category = row.iloc[0]  # Extract Category from first column
+            preference = df2.loc[df2['Category'] == category, 'Preferences'].values
+
+            if len(preference) > 0 and 'non_default' in preference:
+                df1.drop(index=row_number, inplace=True)
+
+    df1.reset_index(drop=True, inplace=True)
+    return df1
+
+
 def make_summary_great_again(df1, opening_closing_balance, df2):
 
 
@@ -2634,18 +2520,6 @@ def make_summary_great_again(df1, opening_closing_balance, df2):
 
     missing_months_list = get_missing_months(opening_closing_balance, new_opening_closing_balance)
 
-    def filter_non_defaulters(df1, df2):
-        for row_number, row in df1.iterrows():
-            if row['Total'] == 0:
-                category = row.iloc[0]  # Extract Category from first column
-                preference = df2.loc[df2['Category'] == category, 'Preferences'].values
-
-                if len(preference) > 0 and 'non_default' in preference:
-                    df1.drop(index=row_number, inplace=True)
-
-        df1.reset_index(drop=True, inplace=True)
-        return df1
-
     income_summary = filter_non_defaulters(income_summary, df2)
     important_summary = filter_non_defaulters(important_summary, df2)
     other_summary = filter_non_defaulters(other_summary, df2)
@@ -2656,10 +2530,12 @@ def make_summary_great_again(df1, opening_closing_balance, df2):
     return particulars_table, income_summary, important_summary, other_summary, contra_credit_summary, contra_debit_summary, missing_months_list
 
 
-def summary_sheet(idf, open_bal, close_bal, new_tran_df, new_categories = None):
-
-    opening_closing_balance = {month: [open_bal[month], close_bal[month]] for month in open_bal}
-
+def category_table(new_categories = None):
+    """
+    The category workbooks, as the summary reads them: Final_Category.xlsx, then the
+    `new_categories` rows, then the customer sheet. `new_categories` are also appended to
+    the customer sheet so later jobs pick them up.
+    """
     excel_file_path = os.path.join(BASE_DIR, "Final_Category.xlsx")
 
     logger.info("excel_file_path - ",excel_file_path)
@@ -2671,8 +2547,8 @@ def summary_sheet(idf, open_bal, close_bal, new_tran_df, new_categories = None):
     
     # print("excel_file_path_bruh -",excel_file_path)
         # excel_file_path+user_created
-    df2 = pd.read_excel(excel_file_path)
-    user_created_df = pd.read_excel(user_created)
+    df2 = CATEGORY_RULES.table(excel_file_path)
+    user_created_df = CATEGORY_RULES.table(user_created)
     
     df_new = pd.DataFrame()
     
@@ -2680,9 +2556,18 @@ def summary_sheet(idf, open_bal, close_bal, new_tran_df, new_categories = None):
         print("new_categories -",new_categories)
         df_new = pd.DataFrame(new_categories)
         append_to_excel(user_created, new_categories)
+        # The next job reads the rows just added, even if the write kept the file's mtime
+        CATEGORY_RULES.reload(user_created)
 
     # Append new data
-    df2 = pd.concat([df2, df_new,user_created_df], ignore_index=True)
+    return pd.concat([df2, df_new,user_created_df], ignore_index=True)
+
+
+def summary_sheet(idf, open_bal, close_bal, new_tran_df, new_categories = None):
+
+    opening_closing_balance = {month: [open_bal[month], close_bal[month]] for month in open_bal}
+
+    df2 = category_table(new_categories)
 
     sheet_1, sheet_2, sheet_3, sheet_4, sheet_5, sheet_6, missing_months_list = make_summary_great_again(new_tran_df, opening_closing_balance, df2)
     df_list = [sheet_1, sheet_2, sheet_3, sheet_4, sheet_5, sheet_6]
@@ -4967,6 +4852,10 @@ def get_total_pdf_pages(pdf_paths):
     for pdf_path in pdf_paths:
         if pdf_path:  # Ensure the path is not empty
             try:
+                context = find_document_context(pdf_path)
+                if context is not None:
+                    total_pages += context.page_count
+                    continue
                 with fitz.open(pdf_path) as doc:
                     total_pages += len(doc)
             except Exception as e:
@@ -0,0 +1,134 @@
+import re
+from collections import Counter
+
+import pandas as pd
+
+# Tried in this order; for any single cell the first format that parses it wins
+DATE_FORMATS = [
+    "%d/%m /%Y",
+    "%d-%m-%Y",
+    "%d %b %Y",
+    "%Y-%m-%d",
+    # "%y-%m-%d",
+    "%d %B %Y",
+    "%d/%m/%Y",
+    "%d-%b-%Y",
+    "%d-%b-%y",
+    "%B %d %Y",
+    "%b %d %Y",
+    "%d-%B-%Y",
+    "%m/%d/%Y",
+    "%d %b %y",
+    "%d/%m/%y",
+    "%d-%m-%y",
+    "%d-%b- %Y",
+    "%d/%b/%Y",
+    "%d %b, %Y",
+    "%d %b, %Y %H:%M:%S",
+    "%d-%m-%Y %H:%M:%S",
+    "%d %b %Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%d %B %Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d-%b-%Y %H:%M:%S",
+    "%d-%b-%y %H:%M:%S",
+    "%B %d, %Y %H:%M:%S",
+    "%d-%B-%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%d %b %y %H:%M:%S",
+    "%d/%m/%y %H:%M:%S",
+    "%d-%m-%y %H:%M:%S",
+    "%d-%b- %Y %H:%M:%S",
+    "%d/%b/%Y %H:%M:%S",
+    "%y-%m-%d %H:%M:%S",
+    "%y-%m-%d",
+]
+
+SAMPLE_SIZE = 50
+MAX_REMEMBERED_LAYOUTS = 256
+
+# Date shape (digits -> 9, letters -> a) of a statement's value dates -> its dominant format
+_inferred_formats = {}
+
+
+def try_parsing_date(text):
+    for fmt in DATE_FORMATS:
+        try:
+            return pd.to_datetime(text, format=fmt)
+        except ValueError:
+            continue
+    # try:
+    #     return parser.parse(text)
+    # except Exception as e:
+    #     return pd.NaT
+
+
+def _parse_leftover(value):
+    # What `try_parsing_date` returns for empty cells, without a pandas call per cell
+    if value is None:
+        return None
+    if value == "" or (isinstance(value, float) and value != value):
+        return pd.NaT
+    return try_parsing_date(value)
+
+
+def _date_shape(text):
+    return re.sub(r"[A-Za-z]", "a", re.sub(r"\d", "9", text))
+
+
+def infer_date_format(sample):
+    """
+    Picks the format that parses most of `sample` (a list of date strings), preferring the
+    earlier format on a tie. Returns None when no format parses any of them.
+    """
+    values = pd.Series(sample, dtype=object)
+    best_format, best_count = None, 0
+    for fmt in DATE_FORMATS:
+        count = pd.to_datetime(values, format=fmt, errors="coerce").notna().sum()
+        if count > best_count:
+            best_format, best_count = fmt, count
+            if count == len(values):
+                break
+    return best_format
+
+
+def _dominant_format(strings):
+    sample = strings.iloc[:SAMPLE_SIZE].tolist()
+    # Every statement of a bank layout prints its dates the same way, so the shape of the
+    # most common date identifies the layout well enough to reuse the inferred format
+    shape = Counter(_date_shape(text) for text in sample).most_common(1)[0][0]
+    if shape not in _inferred_formats:
+        if len(_inferred_formats) >= MAX_REMEMBERED_LAYOUTS:
+            _inferred_formats.clear()
+        _inferred_formats[shape] = infer_date_format(sample)
+    return _inferred_formats[shape]
+
+
+def parse_date_column(column):
+    """
+    Same result as `column.apply(try_parsing_date)`, without trying every format on every cell.
+
+    The column's dominant format is inferred from a sample and parsed in one vectorised call.
+    Cells it cannot parse, and cells an earlier format in `DATE_FORMATS` would also have
+    parsed, go through `try_parsing_date` so each cell still gets its first matching format.
+    """
+    results = pd.Series([None] * len(column), index=column.index, dtype=object)
+    strings = column[column.map(lambda value: isinstance(value, str) and value != "")].astype(object)
+
+    parsed = pd.Series(pd.NaT, index=strings.index)
+    fmt = _dominant_format(strings) if len(strings) else None
+    if fmt is not None:
+        parsed = pd.to_datetime(strings, format=fmt, errors="coerce")
+        for earlier in DATE_FORMATS[: DATE_FORMATS.index(fmt)]:
+            matched = parsed.notna()
+            if not matched.any():
+                break
+            shadowed = pd.to_datetime(strings[matched], format=earlier, errors="coerce").notna()
+            parsed[shadowed[shadowed].index] = pd.NaT
+
+    matched = parsed[parsed.notna()]
+    results[matched.index] = list(matched)
+    leftovers = column.index.difference(matched.index, sort=False)
+    results[leftovers] = [_parse_leftover(value) for value in column[leftovers]]
+    # Rebuilt from a list so pandas infers the dtype exactly as `apply` would
+    return pd.Series(list(results), index=column.index, name=column.name)
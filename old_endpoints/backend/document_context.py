@@ -0,0 +1,124 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pdfplumber
+
+# Parsed documents kept around; a job reads its upload and the prepared copy of it
+MAX_OPEN_DOCUMENTS = int(os.getenv("LEGACY_MAX_OPEN_DOCUMENTS", "8"))
+
+
+class DocumentContext:
+    """
+    One statement PDF, opened once and shared by every step of a job that reads it.
+
+    The page count, per-page text and words are worked out on first use and cached, so
+    the NER, account-number, encoding and extraction steps do not each re-open and
+    re-parse the file. Pages are only parsed when something asks for them.
+
+    A closed context reopens the file if it is used again, so closing one that a step
+    still holds costs a re-parse rather than an error.
+    """
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        # pdfplumber documents are not safe to parse from several threads at once
+        self.lock = threading.RLock()
+        self._pdf = pdfplumber.open(pdf_path)
+        self._text = {}
+        self._words = {}
+
+    @property
+    def pdf(self):
+        with self.lock:
+            if self._pdf is None:
+                self._pdf = pdfplumber.open(self.pdf_path)
+            return self._pdf
+
+    @property
+    def closed(self):
+        return self._pdf is None
+
+    @property
+    def page_count(self):
+        with self.lock:
+            return len(self.pdf.pages)
+
+    def page_text(self, page_number):
+        with self.lock:
+            if page_number not in self._text:
+                self._text[page_number] = self.pdf.pages[page_number].extract_text()
+            return self._text[page_number]
+
+    def words(self, page_number):
+        with self.lock:
+            if page_number not in self._words:
+                self._words[page_number] = self.pdf.pages[page_number].extract_words()
+            return self._words[page_number]
+
+    @property
+    def first_page_text(self):
+        return self.page_text(0) if self.page_count else None
+
+    def close(self):
+        # Frees the open file and every cached page
+        with self.lock:
+            if self._pdf is not None:
+                self._pdf.close()
+                self._pdf = None
+            self._text.clear()
+            self._words.clear()
+
+
+_contexts = OrderedDict()
+_contexts_lock = threading.Lock()
+
+
+def _context_key(pdf_path):
+    # Keyed by size and modification time too, so a file rewritten in place is parsed afresh
+    stat = os.stat(pdf_path)
+    return os.path.realpath(pdf_path), stat.st_mtime_ns, stat.st_size
+
+
+def find_document_context(pdf_path):
+    """Returns the shared `DocumentContext` for `pdf_path` if a step has already opened it."""
+    try:
+        key = _context_key(pdf_path)
+    except (OSError, TypeError):
+        return None
+    with _contexts_lock:
+        return _contexts.get(key)
+
+
+def get_document_context(pdf_path):
+    """Returns the shared `DocumentContext` for `pdf_path`, opening it on first use."""
+    key = _context_key(pdf_path)
+
+    with _contexts_lock:
+        context = _contexts.get(key)
+        if context is not None:
+            _contexts.move_to_end(key)
+            return context
+
+    opened = DocumentContext(pdf_path)
+    evicted = []
+    with _contexts_lock:
+        # Another thread may have opened the same file meanwhile; keep the first one
+        context = _contexts.setdefault(key, opened)
+        _contexts.move_to_end(key)
+        while len(_contexts) > MAX_OPEN_DOCUMENTS:
+            evicted.append(_contexts.popitem(last=False)[1])
+    if context is not opened:
+        evicted.append(opened)
+    for stale in evicted:
+        stale.close()
+    return context
+
+
+def release_document_context(pdf_path):
+    # Called once a job is done with a file so its parsed pages do not outlive the job
+    with _contexts_lock:
+        keys = [key for key in _contexts if key[0] == os.path.realpath(pdf_path)]
+        contexts = [_contexts.pop(key) for key in keys]
+    for context in contexts:
+        context.close()
@@ -0,0 +1,304 @@
+import math
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+# Sheets after the Summary, in workbook order
+REPORT_SHEETS = ["Opportunity to Earn", "Transactions", "EOD", "Investment", "Creditors", "Debtors", "UPI-CR",
+                 "UPI-DR", "Cash Withdrawal", "Cash Deposit", "Redemption, Dividend & Interest", "Probable EMI",
+                 "Refund-Reversal", "Suspense Credit", "Suspense Debit", "Payment & Receipt Voucher"]
+
+# Column widths by a phrase of the sheet name; the first phrase a sheet name contains wins
+COLUMN_WIDTHS = {
+    "Summary": {"A": 50, **{letter: 15 for letter in "BCDEFGHIJKLMNO"}},
+    "DateWise Avg Balance": {"A": 35, **{letter: 15 for letter in "BCDEFGHIJKLM"}, "N": 20, "O": 20, "P": 20},
+    "BankWise Eligibility": {"A": 35, "B": 20, "C": 20, **{letter: 25 for letter in "DEFGHI"}},
+    "Transaction": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "EOD Balance": {letter: 15 for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"},
+    "Probable EMI": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Bounce": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Creditor": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Debtor": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Cash Deposit": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Cash Withdrawal": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "POS_CR": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "UPI_CR": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Investment": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Subscription_Entertainment": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Refund-Reversal": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Suspense Credit": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Suspense Debit": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Redemption, Dividend & Interest": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Bank_charges": {"A": 10, "B": 70, "C": 15, "D": 15, "E": 15, "F": 20, "G": 10},
+    "Payment Voucher": {"A": 15, "B": 15, "C": 10, "D": 20, "E": 15, "F": 15, "G": 85},
+    "Receipt Voucher": {"A": 15, "B": 15, "C": 20, "D": 10, "E": 15, "F": 85},
+    "Payment_Receipt Voucher": {"A": 15, "B": 15, "C": 10, "D": 20, "E": 20, "F": 20, "G": 20, "H": 85},
+}
+
+# Notes written one empty row below a sheet's table: ("merged", rows, text) fills A:H over
+# `rows` rows, ("lines", lines) puts each line in its own cell down column A. Line breaks are
+# "\n", which is how Excel has always read back the "\r\n" the notes were first written with.
+SHEET_NOTES = {
+    "Summary": ("merged", 5, "Disclaimer/Caveat: The entries throughout this file and tables are based on best guess basis and\n"
+                             "information filtered under expenses and income. An attempt has been made to reflect the narration as\n"
+                             "close as possible to the actuals. However, variations from above are possible based on customer profile\n"
+                             "and their transactions with parties. Kindly cross check with your clients for any discrepancies"),
+    "Investment": ("merged", 3, "*This table reflects probable transactions in securities made during the year. \n"
+                                "Kindly confirm the same from Annual Information Statement (AIS) reflected on the Income Tax Portal and the capital gain reports sent by the respective authorities."),
+    "Creditors": ("merged", 3, "*The entries in this table likely pertain to payments from the parties during the period mentioned. \n"
+                               "In case of payments through online portals, we have mentioned the portal names as reflected in the narration of the bank statement. \n"
+                               "We would like to highlight that in case of contra entries, the name of the client will be reflected as a creditor."),
+    "Debtors": ("merged", 3, "*The entries in this table likely pertains to receipts from the respective parties. \n"
+                             "In case of receipts through online portals, we have mentioned the portal names as reflected in the narration of the bank statement. \n"
+                             "We would like to highlight that in case of contra entries, the name of the client will be reflected as a debtor."),
+    "Cash Withdrawal": ("lines", ["*The above table reflects the cash withdrawals made during the year on the basis of widely used acronyms of the finance industry."]),
+    "Cash Deposit": ("lines", ["*The above table reflects the cash deposits made during the year on the basis of widely used acronyms of the finance industry."]),
+    "Probable EMI": ("lines", ["* Transactions in the above table are based on the widely used acronyms of the finance industry and likely reflect EMI payment. \n",
+                               "Kindly confirm the same from the loan statement or the interest certificate."]),
+    "Refund-Reversal": ("lines", ["*This table likely pertains to refunds/reversals/cashbacks received from card payments/online transactions."]),
+    "Suspense Credit": ("merged", 3, "*This table pertains to transactions unidentified as per the current ledger bifurcation of the software. \n"
+                                     "In case of any technical errors, inconvience is highly regretted and feedback is appreciated."),
+    "Suspense Debit": ("merged", 3, "*This table likely pertains to transactions unidentified as per the current ledger bifurcation of the software."),
+}
+
+# Tab colours by sheet position; the Summary has its own
+TAB_COLOURS = ["#CCC0DA", "#FFFF99", "#00B0F0", "#C4BD97", "#CCC0DA", "#DA9694", "#E6B8B7", "#FCD5B4", "#C4D79B",
+               "#FCD5B4", "#BFBFBF", "#92D050"]
+SUMMARY_TAB_COLOUR = "#16365C"
+
+# A Summary row with a cell mentioning one of these is the title row of a section
+SECTION_TITLES = ["Particulars", "Income / Receipts", "Important Expenses / Payments", "Other Expenses / Payments",
+                  "Contra Credit", "Contra Debit"]
+
+# Cell styles, as parts that replace each other the way openpyxl's font/fill/border did
+HEADER_STYLE = {"font": {"bold": True}, "border": {"border": 1}, "alignment": {"align": "center", "valign": "top"}}
+BOLD_FONT = {"bold": True}
+WHITE_BOLD_FONT = {"bold": True, "font_color": "#FFFFFF"}
+GREY_FILL = {"pattern": 1, "bg_color": "#B9B9B9"}
+ROYAL_BLUE_FILL = {"pattern": 1, "bg_color": "#000058"}
+LIGHT_BLUE_FILL = {"pattern": 1, "bg_color": "#B5CBE0"}
+WHITE_FILL = {"pattern": 1, "bg_color": "#FFFFFF"}
+RIGHT_BORDER = {"right": 1, "right_color": "#000000"}
+WRAP_TEXT = {"text_wrap": True}
+NUMBER_FORMAT = "#,##0.00"
+
+# Ledgers with more rows than this are streamed to the file row by row (xlsxwriter's
+# constant_memory mode) instead of being held in memory until the workbook is closed
+STREAMING_EXPORT_ROWS = int(os.getenv("LEGACY_STREAMING_EXPORT_ROWS", "50000"))
+
+# The formats pandas writes dates and times with
+DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+DATE_FORMAT = "YYYY-MM-DD"
+
+
+def cell_value(value):
+    """
+    Returns `value` as pandas' Excel export writes it, and the number format pandas gives it:
+    missing values are None, infinities "inf"/"-inf", numpy scalars plain Python ones.
+    """
+    if value is None or (not isinstance(value, (str, bytes)) and np.ndim(value) == 0 and pd.isna(value)):
+        return None, None
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value), None
+    if isinstance(value, (int, np.integer)):
+        return int(value), None
+    if isinstance(value, (float, np.floating)):
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf", None
+        return float(value), None
+    if isinstance(value, str):
+        return value, None
+    if isinstance(value, datetime):
+        return value, DATETIME_FORMAT
+    if isinstance(value, date):
+        return value, DATE_FORMAT
+    if isinstance(value, (timedelta, np.timedelta64)):
+        return pd.Timedelta(value).total_seconds() / 86400, "0"
+    return str(value), None
+
+
+def _column_index(letter):
+    return ord(letter) - ord("A")
+
+
+class ReportWorkbook:
+    """
+    The statement workbook, written cell by cell in one xlsxwriter pass.
+
+    Every cell gets its final value and style as it is written: the header and alternating
+    fills, number formats, notes, widths, filters and tab colours that used to be applied by
+    re-opening the file with openpyxl once per step. Sheets are written one after another and
+    each from its first row to its last, so the workbook can be opened with
+    `{"constant_memory": True}` and only ever hold the row being written.
+    """
+
+    def __init__(self, filename, options=None):
+        self.book = xlsxwriter.Workbook(filename, options or {})
+        self._formats = {}
+
+    def format(self, style, num_format=None):
+        key = (tuple((part, tuple(sorted(props.items()))) for part, props in sorted(style.items())), num_format)
+        if key not in self._formats:
+            properties = {}
+            for props in style.values():
+                properties.update(props)
+            if num_format:
+                properties["num_format"] = num_format
+            self._formats[key] = self.book.add_format(properties) if properties else None
+        return self._formats[key]
+
+    def _write(self, worksheet, row, column, value, style, num_format=None):
+        cell_format = self.format(style, num_format)
+        if value is None:
+            if cell_format is not None:
+                worksheet.write_blank(row, column, None, cell_format)
+        else:
+            worksheet.write(row, column, value, cell_format)
+
+    def _finish_sheet(self, worksheet, name, index, last_row, last_column, autofilter):
+        # Notes go one empty row below the table; the filter covers them as well
+        if name in SHEET_NOTES:
+            kind, *note = SHEET_NOTES[name]
+            start = last_row + 2
+            if kind == "merged":
+                rows, text = note
+                worksheet.merge_range(start, 0, start + rows - 1, 7, text, self.format({"alignment": WRAP_TEXT}))
+                last_column = max(last_column, 7)
+            else:
+                lines = note[0]
+                for offset, line in enumerate(lines):
+                    worksheet.write(start + offset, 0, line)
+                rows = len(lines)
+            last_row = start + rows - 1
+
+        if autofilter:
+            worksheet.autofilter(0, 0, last_row, last_column)
+
+        for phrase, widths in COLUMN_WIDTHS.items():
+            if phrase in name:
+                for letter, width in widths.items():
+                    # In pixels, so the file records exactly `width` as openpyxl did
+                    worksheet.set_column_pixels(_column_index(letter), _column_index(letter), width * 7)
+                break
+
+        worksheet.set_tab_color(SUMMARY_TAB_COLOUR if name == "Summary" else TAB_COLOURS[index % len(TAB_COLOURS)])
+
+    def write_summary(self, tables):
+        """
+        Writes the Summary sheet: `tables` stacked one empty row apart, the first of them
+        (account name and number) without its header, each section title row in blue and the
+        rows below it in alternating fills.
+        """
+        worksheet = self.book.add_worksheet("Summary")
+
+        cells = {}
+        start = 0
+        for table in tables:
+            for column, label in enumerate(table.columns):
+                cells[start, column] = (label, HEADER_STYLE)
+            for offset, values in enumerate(table.itertuples(index=False, name=None), start + 1):
+                for column, value in enumerate(values):
+                    cells[offset, column] = (value, {})
+            start += len(table) + 2
+        rows = max(row for row, _ in cells) + 1
+        columns = max(column for _, column in cells) + 1
+
+        # As before, the last cell mentioning a title (in row order) marks its section
+        title_rows = {}
+        for (row, column) in sorted(cells):
+            value = cells[row, column][0]
+            if value and isinstance(value, str):
+                title = next((title for title in SECTION_TITLES if title in value), None)
+                if title:
+                    title_rows[title] = row
+        section_rows = [title_rows.get(title) for title in SECTION_TITLES]
+
+        fills, fonts = {}, {}
+        for row in range(1, 4):
+            fills[row], fonts[row] = GREY_FILL, BOLD_FONT
+        for row in section_rows:
+            fills[row], fonts[row] = ROYAL_BLUE_FILL, WHITE_BOLD_FONT
+        for start_row in section_rows:
+            for row in range(start_row + 1, rows):
+                if row not in section_rows:
+                    fills[row] = WHITE_FILL if (row - start_row) % 2 == 1 else LIGHT_BLUE_FILL
+
+        for row in range(rows):
+            for column in range(columns):
+                value, base = cells.get((row, column), (None, {}))
+                value, num_format = cell_value(value)
+                style = dict(base)
+                if row == 0:
+                    # The account table's header row is left blank
+                    value = None
+                    style.pop("border", None)
+                elif isinstance(value, (int, float)):
+                    num_format = NUMBER_FORMAT
+                if row in fills:
+                    style["fill"] = fills[row]
+                if row in fonts:
+                    style["font"] = fonts[row]
+                if column == 0:
+                    style["border"] = RIGHT_BORDER
+                self._write(worksheet, row, column, value, style, num_format)
+
+        self._finish_sheet(worksheet, "Summary", 0, rows - 1, columns - 1, autofilter=False)
+
+    def write_table(self, name, index, frame):
+        """
+        Writes `frame` as sheet `name`: a blue header row, the second row plain and the rows
+        after it alternately light blue and white, numbers as #,##0.00 and a filter over it all.
+        """
+        worksheet = self.book.add_worksheet(name)
+        labels = list(frame.columns)
+        columns = max(len(labels), 1)
+
+        for column in range(columns):
+            value, num_format = cell_value(labels[column]) if labels else (None, None)
+            style = dict(HEADER_STYLE) if labels else {}
+            style.update(font=WHITE_BOLD_FONT, fill=ROYAL_BLUE_FILL)
+            self._write(worksheet, 0, column, value, style, num_format)
+
+        row = 0
+        for row, values in enumerate(frame.itertuples(index=False, name=None), 1):
+            style = {} if row == 1 else {"fill": LIGHT_BLUE_FILL if row % 2 == 0 else WHITE_FILL}
+            for column, value in enumerate(values):
+                value, num_format = cell_value(value)
+                if isinstance(value, (int, float)):
+                    num_format = NUMBER_FORMAT
+                self._write(worksheet, row, column, value, style, num_format)
+
+        self._finish_sheet(worksheet, name, index, row, columns - 1, autofilter=True)
+
+    def close(self):
+        self.book.close()
+
+
+def export_options(sheets):
+    """
+    Returns the xlsxwriter options for a workbook of `sheets`: rows are streamed to disk as
+    they are written once any sheet (in practice Transactions or EOD) is larger than
+    `STREAMING_EXPORT_ROWS`. The cells and formats are the same either way.
+    """
+    if max((len(frame) for frame in sheets.values()), default=0) > STREAMING_EXPORT_ROWS:
+        return {"constant_memory": True}
+    return {}
+
+
+def write_statement_workbook(filename, summary_tables, sheets, options=None):
+    """
+    Writes the statement workbook to `filename`: the Summary from `summary_tables`, then
+    each frame in `sheets` (sheet name -> frame) in `REPORT_SHEETS` order. Without `options`
+    large ledgers are streamed, see `export_options`.
+    """
+    if options is None:
+        options = export_options(sheets)
+    workbook = ReportWorkbook(filename, options)
+    workbook.write_summary(summary_tables)
+    for index, name in enumerate(REPORT_SHEETS, 1):
+        workbook.write_table(name, index, sheets[name])
+    workbook.close()
+    return filename
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import re
+import uuid
+
+from .document_context import get_document_context
+from .utils import get_layout_cache_dir
+
+# Words whose tops are this close (in points) are treated as one text line
+LINE_TOLERANCE = 3
+HEADER_DATE = re.compile(r"date", re.IGNORECASE)
+HEADER_BALANCE = re.compile(r"balance|total amount", re.IGNORECASE)
+
+
+def _text_lines(words):
+    lines = []
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and abs(word["top"] - lines[-1][0]["top"]) <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return lines
+
+
+def layout_fingerprint(pdf_path):
+    """
+    Fingerprints the statement layout from the header row of the transaction table on the
+    first page: the header words, their x positions and the page size. Returns None when no
+    header row (a line mentioning a date and a balance, like `clean_table` looks for) is found.
+    """
+    context = get_document_context(pdf_path)
+    page = context.pdf.pages[0]
+    for line in _text_lines(context.words(0)):
+        text = " ".join(word["text"] for word in line)
+        if HEADER_DATE.search(text) and HEADER_BALANCE.search(text):
+            layout = {
+                "page": [round(page.width), round(page.height)],
+                "header": [[word["text"].lower(), round(word["x0"]), round(word["x1"])] for word in line],
+            }
+            return hashlib.sha256(json.dumps(layout).encode()).hexdigest()
+    return None
+
+
+def normalise_layout(list_test):
+    # numpy scalars from the column finders become plain ints/floats so entries compare equal
+    return json.loads(json.dumps(list_test, default=lambda value: value.item()))
+
+
+def _entry_path(fingerprint):
+    return os.path.join(get_layout_cache_dir(), f"{fingerprint}.json")
+
+
+def load_layout(fingerprint):
+    """
+    Returns the cached `process_pdf_with_test_cases` result for `fingerprint`
+    ([test_case, coordinates_C, lists, explicit_lines]) or None on a miss.
+    """
+    if fingerprint is None:
+        return None
+    try:
+        with open(_entry_path(fingerprint)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_layout(fingerprint, list_test):
+    # Test Case E means no table layout was found, so there is nothing to reuse
+    if fingerprint is None or list_test[0] == "E":
+        return
+    os.makedirs(get_layout_cache_dir(), exist_ok=True)
+    path = _entry_path(fingerprint)
+    # Write then rename so concurrent jobs never read a half-written entry
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(normalise_layout(list_test), f)
+    os.replace(tmp_path, path)
+
+
+def evict_layout(fingerprint):
+    try:
+        os.remove(_entry_path(fingerprint))
+    except OSError:
+        pass
@@ -467,6 +467,13 @@ async def individual_summary_api(request: InvididualSummaryRequest):
         )
 
 if __name__ == "__main__":
+    import argparse
+    from backend.common_functions import configure
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customer-sheet-path", default=None)
+    configure(customer_sheet_path=parser.parse_args().customer_sheet_path)
+
     # Optionally use environment variables for host/port. Falls back to "127.0.0.1" and 7500 if none provided.
     host = os.getenv("API_HOST", "127.0.0.1")
     port = int(os.getenv("API_PORT", "7500"))
@@ -3,24 +3,22 @@ import os
 import io
 import pandas as pd
 import numpy as np
-import PyPDF2
-from PyPDF2 import PdfReader, PdfWriter
 import shutil
 import logging
 import pdfplumber
 from datetime import datetime
 import regex as re
-import datefinder
 from calendar import monthrange
 import calendar
 from openpyxl.styles import Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl import Workbook
 from openpyxl import Workbook, load_workbook
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 # from findaddy.exceptions import ExtractionError
+# PyPDF2 and reportlab are imported by the methods that split pages and draw separators,
+# so importing this module through the extraction pipeline does not load them
 from .utils import get_saved_pdf_dir
+from .table_assembly import extract_table_dataframe
 TEMP_SAVED_PDF_DIR = get_saved_pdf_dir()
 
 
@@ -35,6 +33,9 @@ class CustomStatement:
         self.CA_ID = CA_ID
 
     def add_top_line_to_pdf(self, input_pdf_path, output_pdf_path):
+        from PyPDF2 import PdfReader, PdfWriter
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
         input_pdf = PdfReader(input_pdf_path)
         output_pdf = PdfWriter()
 
@@ -63,6 +64,9 @@ class CustomStatement:
         return output_pdf_path
 
     def add_lines_to_pdf(self, input_pdf_path, output_pdf_path, timestamp):
+        from PyPDF2 import PdfReader, PdfWriter
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
         input_pdf = PdfReader(input_pdf_path)
         output_pdf = PdfWriter()
 
@@ -95,6 +99,9 @@ class CustomStatement:
         return output_pdf_path
 
     def insert_all_separators(self, page, page_width, page_height):
+        from PyPDF2 import PdfReader
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
 
         lines = page.extract_text().split('\n')
 
@@ -118,6 +125,9 @@ class CustomStatement:
         page.merge_page(sep_page)
 
     def insert_all_separators_idbi(self, page, page_width, page_height):
+        from PyPDF2 import PdfReader
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
 
         lines = page.extract_text().split('\n')
 
@@ -142,6 +152,7 @@ class CustomStatement:
 
     def separate_lines_in_pdf_idbi(self, input_pdf_path, timestamp):
         """Inserts separators between lines in the PDF."""
+        from PyPDF2 import PdfReader, PdfWriter
         CA_ID = self.CA_ID
         unlocked_pdf_filename = f"{timestamp}-{CA_ID}.pdf"
         output_pdf_path = os.path.join(TEMP_SAVED_PDF_DIR, unlocked_pdf_filename)
@@ -162,6 +173,9 @@ class CustomStatement:
         return output_pdf_path
 
     def insert_all_separators_uco(self, page, page_width, page_height):
+        from PyPDF2 import PdfReader
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
 
         lines = page.extract_text().split('\n')
 
@@ -186,6 +200,7 @@ class CustomStatement:
 
     def separate_lines_in_pdf_uco(self, input_pdf_path, timestamp):
         """Inserts separators between lines in the PDF."""
+        from PyPDF2 import PdfReader, PdfWriter
         CA_ID = self.CA_ID
         unlocked_pdf_filename = f"{timestamp}-{CA_ID}.pdf"
         output_pdf_path = os.path.join(TEMP_SAVED_PDF_DIR, unlocked_pdf_filename)
@@ -207,6 +222,7 @@ class CustomStatement:
 
     def separate_lines_in_pdf(self, input_pdf_path, timestamp):
         """Inserts separators between lines in the PDF."""
+        from PyPDF2 import PdfReader, PdfWriter
         CA_ID = self.CA_ID
         unlocked_pdf_filename = f"{timestamp}-{CA_ID}.pdf"
         output_pdf_path = os.path.join(TEMP_SAVED_PDF_DIR, unlocked_pdf_filename)
@@ -227,6 +243,9 @@ class CustomStatement:
         return output_pdf_path
 
     def insert_all_separators_scb(self, page, page_width, page_height):
+        from PyPDF2 import PdfReader
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
 
         lines = page.extract_text().split('\n')
 
@@ -251,6 +270,7 @@ class CustomStatement:
 
     def separate_lines_in_pdf_scb(self, input_pdf_path, timestamp):
         """Inserts separators between lines in the PDF."""
+        from PyPDF2 import PdfReader, PdfWriter
         CA_ID = self.CA_ID
         unlocked_pdf_filename = f"{timestamp}-{CA_ID}.pdf"
         output_pdf_path = os.path.join(TEMP_SAVED_PDF_DIR, unlocked_pdf_filename)
@@ -271,6 +291,9 @@ class CustomStatement:
         return output_pdf_path
 
     def insert_vertical_lines(self, page, x_positions, page_height):
+        from PyPDF2 import PdfReader
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
         packet = io.BytesIO()
         can = canvas.Canvas(packet, pagesize=letter)
         can.setFillColorRGB(0, 0, 0)  # Set fill color to black
@@ -286,6 +309,7 @@ class CustomStatement:
         page.merge_page(sep_page)
 
     def separate_lines_in_vertical_pdf(self, input_pdf_path, x_positions, timestamp):
+        from PyPDF2 import PdfReader, PdfWriter
         CA_ID = self.CA_ID
         unlocked_pdf_filename = f"{timestamp}-{CA_ID}.pdf"
         output_pdf_path = os.path.join(TEMP_SAVED_PDF_DIR, unlocked_pdf_filename)
@@ -338,6 +362,7 @@ class CustomStatement:
         return df
 
     def extract_dates_from_pdf(self, unlocked_file_path):
+        import PyPDF2
         with open(unlocked_file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             text = ''
@@ -361,6 +386,8 @@ class CustomStatement:
 
     #################--------******************----------#####################
     def unlock_the_pdfs_path(self, pdf_path, pdf_password, bank_name, timestamp):
+        import PyPDF2
+        from PyPDF2 import PdfReader
         CA_ID = self.CA_ID
         logger = logging.getLogger(self.CA_ID)
         os.makedirs(TEMP_SAVED_PDF_DIR, exist_ok=True)
@@ -410,14 +437,7 @@ class CustomStatement:
             def idbi_format_1(unlocked_pdf_path):
                 try:
 
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
 
                     w = df_total.drop_duplicates()
 
@@ -462,14 +482,7 @@ class CustomStatement:
             def idbi_format_2(unlocked_pdf_path):
                 try:
                     unlocked_pdf_path = self.separate_lines_in_pdf_idbi(unlocked_pdf_path, timestamp)
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     df = self.uncontinuous(w)
                     df = df.drop([0, 3, 7, 8, 9, 10, 11, 12, 13], axis=1)
@@ -531,14 +544,7 @@ class CustomStatement:
 
             def axis_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -571,14 +577,7 @@ class CustomStatement:
 
             def axis_format_2(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -627,14 +626,7 @@ class CustomStatement:
     def sbi(self, unlocked_pdf_path, timestamp):
         logger = logging.getLogger(self.CA_ID)
         try:
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
 
             new_df = self.extract_the_df(w)
@@ -669,14 +661,7 @@ class CustomStatement:
         logger = logging.getLogger(self.CA_ID)
         try:
             logger.info("Inside IDFC Bank")
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
 
             new_df = self.extract_the_df(w)
@@ -715,14 +700,7 @@ class CustomStatement:
 
             def pnb_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -756,16 +734,9 @@ class CustomStatement:
 
             def pnb_format_2(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside PNB Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -797,14 +768,7 @@ class CustomStatement:
 
             def pnb_format_3(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -839,16 +803,9 @@ class CustomStatement:
 
             def pnb_format_4(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside PNB Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -899,16 +856,9 @@ class CustomStatement:
 
             def yes_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Yes Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -1060,16 +1010,9 @@ class CustomStatement:
             def union_format_1(unlocked_pdf_path):
 
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Union Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -1110,15 +1053,9 @@ class CustomStatement:
             def union_format_2(unlocked_pdf_path):
 
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Union Bank")
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -1179,16 +1116,9 @@ class CustomStatement:
                     x_positions = [20, 86, 260, 350, 480, 580, 660]
                     unlocked_pdf_path = self.separate_lines_in_vertical_pdf(one_pdf_path, x_positions, timestamp)
 
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Kotak Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
 
                     w = df_total.drop_duplicates()
                     df = w.rename(columns={0: 'Value Date', 1: 'Description', 3: 'Amount', 4: 'Balance'})
@@ -1235,16 +1165,9 @@ class CustomStatement:
 
                     unlocked_pdf_path = self.separate_lines_in_vertical_pdf(one_pdf_path, x_positions, timestamp)
 
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Kotak Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
 
                     w = df_total.drop_duplicates()
                     df = w.rename(columns={1: 'Value Date', 3: 'Description', 8: 'Amount', 9: 'CR/DR', 12: 'Balance'})
@@ -1313,16 +1236,9 @@ class CustomStatement:
                 unlocked_pdf_path = self.separate_lines_in_vertical_pdf(unlocked_pdf_path, x_positions, timestamp)
 
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Bank of Baroda")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -1359,16 +1275,9 @@ class CustomStatement:
                 unlocked_pdf_path = new_pdf_path
 
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Bank of Baroda")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -1551,16 +1460,9 @@ class CustomStatement:
             def icici_format_4(unlocked_pdf_path):
 
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside ICICI Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = self.extract_the_df(df_total)
                     df = self.uncontinuous(w)
                     # start custom extraction
@@ -1712,14 +1614,7 @@ class CustomStatement:
                     unlocked_pdf_path = self.separate_lines_in_pdf(unlocked_pdf_path, timestamp)
                     print("Inside IndusInd Bank")
 
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = self.extract_the_df(df_total)
 
                     # # start custom extraction
@@ -1797,15 +1692,8 @@ class CustomStatement:
 
             def hdfc_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-
-                    df_total = pd.DataFrame()
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
-                        df_total = df_total.replace('', np.nan, regex=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
+                    df_total = df_total.replace('', np.nan, regex=True)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -1837,15 +1725,8 @@ class CustomStatement:
             def hdfc_format_2(unlocked_pdf_path):
                 try:
                     unlocked_pdf_path = self.separate_lines_in_pdf(unlocked_pdf_path, timestamp)
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-
-                    df_total = pd.DataFrame()
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
-                        df_total = df_total.replace('', np.nan, regex=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
+                    df_total = df_total.replace('', np.nan, regex=True)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -1902,14 +1783,7 @@ class CustomStatement:
         try:
             logger.info("Inside NKGSB Bank")
 
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -1943,16 +1817,9 @@ class CustomStatement:
 
             def indian_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Indian Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -1983,16 +1850,9 @@ class CustomStatement:
 
             def indian_format_2(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside Indian Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -2039,16 +1899,9 @@ class CustomStatement:
 
             def tjsb_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside TJSB Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -2077,16 +1930,9 @@ class CustomStatement:
 
             def tjsb_format_2(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
                     print("Inside TJSB Bank")
 
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
 
                     new_df = self.extract_the_df(w)
@@ -2139,11 +1985,6 @@ class CustomStatement:
             end_date_str = self.convert_to_dt_format(date_str.split(" to ")[1])
             logger.info(f"Extracted Dates from pdf; Start Date: {start_date_str}, End Date: {end_date_str}")
 
-            def extract_text_from_pdf(pdf_path, page_number=0):
-                with pdfplumber.open(pdf_path) as pdf:
-                    page = pdf.pages[page_number]
-                    return page.extract_text()
-
             date_pattern = re.compile(r"\d{2}/[A-Za-z]{3}/\d{4}")
             number_pattern = re.compile(r"[\d,]+\.\d{2}")
 
@@ -2176,14 +2017,13 @@ class CustomStatement:
                     parsed_data[-1]["Particulars"] += " " + current_particulars.strip()
                 return parsed_data
 
-            complete_data = pd.DataFrame(columns=["Date", "Particulars", "Chq No", "Debit", "Credit", "Balance"])
-
-            # Extracting data from all pages in the PDF and appending to the complete_data DataFrame
+            # Extracting data from all pages in the PDF; rows are collected and framed once
+            complete_rows = []
             with pdfplumber.open(unlocked_pdf_path) as pdf:
-                for i in range(len(pdf.pages)):
-                    page_text = extract_text_from_pdf(unlocked_pdf_path, page_number=i)
-                    page_data = further_refinement_parse_transaction_rows(page_text)
-                    complete_data = complete_data._append(pd.DataFrame(page_data), ignore_index=True)
+                for page in pdf.pages:
+                    complete_rows.extend(further_refinement_parse_transaction_rows(page.extract_text()))
+            complete_data = pd.DataFrame(complete_rows,
+                                         columns=["Date", "Particulars", "Chq No", "Debit", "Credit", "Balance"])
 
             new_df = self.extract_the_df(complete_data)
             df = new_df.copy()
@@ -2251,14 +2091,7 @@ class CustomStatement:
         logger = logging.getLogger(self.CA_ID)
         try:
             logger.info("Inside Deutsche Bank")
-            pdf = pdfplumber.open(unlocked_pdf_path)
-
-            df_total = pd.DataFrame()
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2290,14 +2123,7 @@ class CustomStatement:
         logger = logging.getLogger(self.CA_ID)
         try:
             logger.info("Inside IOB")
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2336,14 +2162,7 @@ class CustomStatement:
                 try:
                     logger.info("Inside Canara Bank")
 
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -2379,14 +2198,7 @@ class CustomStatement:
                 try:
                     logger.info("Inside Canara Bank")
 
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -2435,14 +2247,7 @@ class CustomStatement:
 
             def boi_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -2474,14 +2279,7 @@ class CustomStatement:
 
             def boi_format_2(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -2524,14 +2322,7 @@ class CustomStatement:
         logger = logging.getLogger(self.CA_ID)
         try:
             logger.info("Inside DCB Bank")
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2567,14 +2358,7 @@ class CustomStatement:
 
             def fed_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -2606,14 +2390,7 @@ class CustomStatement:
 
             def fed_format_2(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -2644,14 +2421,7 @@ class CustomStatement:
 
             def fed_format_3(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -2697,14 +2467,7 @@ class CustomStatement:
         logger = logging.getLogger(self.CA_ID)
         try:
             logger.info("Inside Cosmos Bank")
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2738,14 +2501,7 @@ class CustomStatement:
         logger = logging.getLogger(self.CA_ID)
         try:
             logger.info("Inside BOM Bank")
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2778,14 +2534,7 @@ class CustomStatement:
     def tdcb(self, unlocked_pdf_path, timestamp):
         logger = logging.getLogger(self.CA_ID)
         try:
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2821,14 +2570,7 @@ class CustomStatement:
             logger.info("Inside RBL Bank")
             x_positions = [110, 420, 505, 605, 720, 808]
             unlocked_pdf_path = self.separate_lines_in_vertical_pdf(unlocked_pdf_path, x_positions, timestamp)
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2865,14 +2607,7 @@ class CustomStatement:
 
             x_positions = [108, 420, 545, 659]
             unlocked_pdf_path = self.separate_lines_in_vertical_pdf(unlocked_pdf_path, x_positions, timestamp)
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2905,14 +2640,7 @@ class CustomStatement:
     def hsbc(self, unlocked_pdf_path, timestamp):
         logger = logging.getLogger(self.CA_ID)
         try:
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2953,14 +2681,7 @@ class CustomStatement:
         try:
             logger.info("Inside Bassein Catholic Co-op Bank")
 
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -2995,14 +2716,7 @@ class CustomStatement:
         logger = logging.getLogger(self.CA_ID)
         try:
             logger.info("Inside Municipal Co-op Bank")
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -3037,14 +2751,7 @@ class CustomStatement:
         try:
             logger.info("Inside Bharat Bank")
 
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -3081,14 +2788,7 @@ class CustomStatement:
 
             unlocked_pdf_path = self.separate_lines_in_pdf_scb(unlocked_pdf_path, timestamp)
 
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             df = w.copy()
             # # start custom extraction
@@ -3147,14 +2847,7 @@ class CustomStatement:
 
             def uco_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -3187,14 +2880,7 @@ class CustomStatement:
             def uco_format_2(unlocked_pdf_path):
                 try:
                     unlocked_pdf_path = self.add_lines_to_pdf(unlocked_pdf_path, unlocked_pdf_path)
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -3280,14 +2966,7 @@ class CustomStatement:
 
             def vasai_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -3318,14 +2997,7 @@ class CustomStatement:
 
             def vasai_format_2(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -3370,14 +3042,7 @@ class CustomStatement:
 
             def saraswat_format_1(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     df = w.copy()
                     # new_df = self.extract_the_df(w)
@@ -3410,14 +3075,7 @@ class CustomStatement:
 
             def saraswat_format_2(unlocked_pdf_path):
                 try:
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     new_df = self.extract_the_df(w)
                     df = self.uncontinuous(new_df)
@@ -3481,14 +3139,7 @@ class CustomStatement:
             def saraswat_format_3(unlocked_pdf_path):
                 try:
                     unlocked_pdf_path = self.add_lines_to_pdf(unlocked_pdf_path, unlocked_pdf_path)
-                    pdf = pdfplumber.open(unlocked_pdf_path)
-                    df_total = pd.DataFrame()
-
-                    for i in range(len(pdf.pages)):
-                        p0 = pdf.pages[i]
-                        table = p0.extract_table()
-                        df_total = df_total._append(table, ignore_index=True)
-                        df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+                    df_total = extract_table_dataframe(unlocked_pdf_path)
                     w = df_total.drop_duplicates()
                     # df = self.extract_the_df(w)
                     # df = self.uncontinuous(new_df)
@@ -3537,14 +3188,7 @@ class CustomStatement:
         try:
             logger.info("Inside Surat Bank")
 
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
@@ -3578,14 +3222,7 @@ class CustomStatement:
         try:
             logger.info("Inside Janakalyan Bank")
 
-            pdf = pdfplumber.open(unlocked_pdf_path)
-            df_total = pd.DataFrame()
-
-            for i in range(len(pdf.pages)):
-                p0 = pdf.pages[i]
-                table = p0.extract_table()
-                df_total = df_total._append(table, ignore_index=True)
-                df_total.replace({r'\n': ' '}, regex=True, inplace=True)
+            df_total = extract_table_dataframe(unlocked_pdf_path)
             w = df_total.drop_duplicates()
             new_df = self.extract_the_df(w)
             df = self.uncontinuous(new_df)
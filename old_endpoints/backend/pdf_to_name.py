@@ -1,7 +1,6 @@
-import pdfplumber
 import re
-import spacy
 from .utils import get_base_dir
+from .document_context import get_document_context
 import os
 import logging
 
@@ -25,22 +24,29 @@ def extract_entities(pdf_path: str, num_lines: int = 10):
         model_path  = os.path.join(BASE_DIR,"models","trained_model_lg_v2_final")
         # print(model_path)
         # model_path  = os.path.join("E:/Workplace/Bizpedia/ats_pyqt/cyphersol-ats-native-app" , "src","utils","trained_model_lg_v2_final")
+        # spaCy is only needed here; importing it lazily keeps it out of server start-up
+        import spacy
         nlp = spacy.load(model_path)
 
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-
+        context = get_document_context(pdf_path)
+        text = ""
+        lines = []
+        for page_number in range(context.page_count):
+            text += context.page_text(page_number) or ""
             lines = [clean_line(line) for line in text.split("\n") if clean_line(line)]
-            processed_text = "\n".join(lines[:num_lines])
-            print("processed_text", processed_text)
-
-            doc = nlp(processed_text)
-            entities = [
-                ent.text for ent in doc.ents if ent.text
-            ]  # Only collect entity texts
-            return entities if entities else None
+            # Only the first lines are used; stop once a later page can no longer change them
+            # (the next page's text is appended to the current last line)
+            if len(lines) > num_lines:
+                break
+
+        processed_text = "\n".join(lines[:num_lines])
+        print("processed_text", processed_text)
+
+        doc = nlp(processed_text)
+        entities = [
+            ent.text for ent in doc.ents if ent.text
+        ]  # Only collect entity texts
+        return entities if entities else None
 
     except Exception as e:
         return None
@@ -0,0 +1,91 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Probes evaluated at the same time; the rest queue behind them in priority order
+PROBE_WORKERS = int(os.getenv("LEGACY_PROBE_WORKERS", "3"))
+
+
+class SharedStep:
+    """
+    Runs `func(*args)` once, on first use, and hands the same result to every probe that
+    depends on it. Later callers block until the first one has finished computing it.
+
+    `cleanup(result)` is called once the step is closed: straight away if it has finished
+    or never ran (with None), otherwise by the run still in progress when it finishes, so
+    closing never waits for it. A closed step that has not started will not run.
+    """
+
+    def __init__(self, func, *args, cleanup=None):
+        self._func = func
+        self._args = args
+        self._cleanup = cleanup
+        self._lock = threading.Lock()
+        # Guards the flags below, which close() reads while a run holds _lock
+        self._state_lock = threading.Lock()
+        self._started = False
+        self._done = False
+        self._closed = False
+        self._result = None
+
+    def result(self):
+        with self._lock:
+            if not self._done:
+                with self._state_lock:
+                    if self._closed:
+                        raise RuntimeError("Shared step was closed before it ran")
+                    self._started = True
+                try:
+                    result = self._func(*self._args)
+                except BaseException:
+                    with self._state_lock:
+                        self._started = False
+                        discard = self._closed
+                    if discard:
+                        self._discard(None)
+                    raise
+                with self._state_lock:
+                    self._result = result
+                    self._done = True
+                    discard = self._closed
+                if discard:
+                    self._discard(result)
+        return self._result
+
+    def close(self):
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            running = self._started and not self._done
+            result = self._result
+        if not running:
+            self._discard(result)
+
+    def _discard(self, result):
+        if self._cleanup is not None:
+            self._cleanup(result)
+
+
+def first_passing_probe(probes, max_workers=PROBE_WORKERS):
+    """
+    Evaluates `probes` (zero-argument callables, highest priority first) in a thread pool
+    and returns the result of the highest-priority probe that passes, i.e. returns
+    anything other than None. Returns None when every probe fails.
+
+    A lower-priority probe that finishes first is only accepted once every probe ahead of
+    it has failed, so the winner is the one a sequential walk would pick. Probes that have
+    not started when the winner is known are cancelled; running ones finish in the
+    background and their results are discarded. An exception raised by a probe propagates
+    once the walk reaches that probe, as it would sequentially.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extraction-probe")
+    try:
+        futures = [executor.submit(probe) for probe in probes]
+        for future in futures:
+            result = future.result()
+            if result is not None:
+                return result
+        return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
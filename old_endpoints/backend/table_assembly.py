@@ -0,0 +1,131 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pdfplumber
+
+from .document_context import find_document_context
+
+# Worker count for page-sharded extraction; 0 means one worker per CPU
+EXTRACTION_WORKERS = int(os.getenv("LEGACY_EXTRACTION_WORKERS", "0")) or (os.cpu_count() or 1)
+# PDFs with fewer pages than this per worker are extracted serially
+MIN_PAGES_PER_WORKER = int(os.getenv("LEGACY_MIN_PAGES_PER_WORKER", "40"))
+
+
+def normalise_table_rows(table):
+    """
+    Replaces embedded newlines in every string cell of one page table with a space.
+    Non-string cells (None for empty pdfplumber cells) are passed through untouched.
+    """
+    return [
+        [cell.replace("\n", " ") if isinstance(cell, str) else cell for cell in row]
+        for row in table
+    ]
+
+
+class PageTableAssembler:
+    """
+    Collects the table rows of every page and builds a single DataFrame at the end.
+
+    The legacy extractors used to `_append` each page onto a growing DataFrame and
+    re-run the newline regex over the whole accumulated frame, which is quadratic in
+    the page count. Rows are normalised once per page here and the frame is built once.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.width = 0
+
+    def add_page(self, table):
+        # pdfplumber returns None when a page has no table; `_append(None)` was a no-op
+        if not table:
+            return
+        rows = normalise_table_rows(table)
+        self.rows.extend(rows)
+        self.width = max(self.width, max(len(row) for row in rows))
+
+    def to_dataframe(self):
+        if not self.rows:
+            return pd.DataFrame()
+        # Pages narrower than the widest one were NaN-filled by `_append`; keep that
+        rows = [
+            row + [np.nan] * (self.width - len(row)) if len(row) < self.width else row
+            for row in self.rows
+        ]
+        return pd.DataFrame(rows)
+
+
+def extract_page_dataframe(page, table_settings=None):
+    """
+    Same as `extract_table_dataframe` for a single already-parsed pdfplumber page, so callers
+    probing one page with several table settings do not re-parse it for every attempt.
+    """
+    assembler = PageTableAssembler()
+    assembler.add_page(page.extract_table(table_settings))
+    return assembler.to_dataframe()
+
+
+def _tables_from_pages(pages, table_settings):
+    tables = []
+    for page in pages:
+        tables.append(page.extract_table(table_settings))
+        # Drop the parsed page objects so memory stays flat on long statements
+        page.close()
+    return tables
+
+
+def _extract_page_tables(pdf_path, table_settings, pages=None):
+    # `pages` are 1-based page numbers as accepted by pdfplumber.open; None means all
+    with pdfplumber.open(pdf_path, pages=pages) as pdf:
+        return _tables_from_pages(pdf.pages, table_settings)
+
+
+def _page_shards(total_pages, workers):
+    shard_count = min(workers, total_pages // MIN_PAGES_PER_WORKER)
+    if shard_count <= 1:
+        return []
+    bounds = np.linspace(0, total_pages, shard_count + 1).astype(int).tolist()
+    return [list(range(start + 1, stop + 1)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def extract_table_dataframe(pdf_path, table_settings=None, workers=1):
+    """
+    Runs pdfplumber `extract_table` on every page of `pdf_path` and returns the rows of
+    all pages as one DataFrame with integer column labels.
+
+    With `workers` > 1, long PDFs are split into contiguous page ranges that are extracted
+    in a process pool with the same `table_settings` and merged back in page order.
+    PDFs too short to give every worker `MIN_PAGES_PER_WORKER` pages stay serial.
+    """
+    assembler = PageTableAssembler()
+    # Reuse the job's already-open document instead of parsing the file again
+    context = find_document_context(pdf_path)
+
+    shards = []
+    if workers > 1:
+        if context is not None:
+            shards = _page_shards(context.page_count, workers)
+        else:
+            with pdfplumber.open(pdf_path) as pdf:
+                shards = _page_shards(len(pdf.pages), workers)
+
+    if not shards and context is not None:
+        with context.lock:
+            tables = _tables_from_pages(context.pdf.pages, table_settings)
+    elif not shards:
+        tables = _extract_page_tables(pdf_path, table_settings)
+    else:
+        # spawn: the API runs the legacy pipeline from worker threads, where fork is unsafe
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=mp_context) as executor:
+            futures = [
+                executor.submit(_extract_page_tables, pdf_path, table_settings, pages)
+                for pages in shards
+            ]
+            tables = [table for future in futures for table in future.result()]
+
+    for table in tables:
+        assembler.add_page(table)
+    return assembler.to_dataframe()
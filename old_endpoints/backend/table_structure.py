@@ -0,0 +1,114 @@
+import os
+import threading
+
+import torch
+from torchvision import transforms
+from transformers import TableTransformerForObjectDetection
+
+from .utils import get_base_dir
+
+MODEL_DIR = os.path.join(get_base_dir(), "models", "local_model")
+# Opt-in int8 dynamic quantisation of the Linear layers when running on CPU
+QUANTIZE_ON_CPU = os.getenv("LEGACY_TABLE_MODEL_QUANTIZE", "0") == "1"
+# Images of the same size are run through the model this many at a time
+INFERENCE_BATCH_SIZE = int(os.getenv("LEGACY_TABLE_MODEL_BATCH_SIZE", "4"))
+
+
+def objects_from_outputs(outputs, index, img_size, id2label):
+    """
+    Converts the detections for image `index` of a (possibly batched) model output into
+    dicts with `label`, `score` and an xyxy `bbox` in the image's pixel coordinates.
+    """
+    m = outputs.logits[index].softmax(-1).max(-1)
+    pred_labels = list(m.indices.detach().cpu().numpy())
+    pred_scores = list(m.values.detach().cpu().numpy())
+    pred_bboxes = outputs['pred_boxes'][index].detach().cpu()
+
+    # Convert bounding boxes from cxcywh to xyxy
+    x_c, y_c, w, h = pred_bboxes.unbind(-1)
+    pred_bboxes = torch.stack([
+        x_c - 0.5 * w,
+        y_c - 0.5 * h,
+        x_c + 0.5 * w,
+        y_c + 0.5 * h
+    ], dim=-1)
+
+    # Rescale bounding boxes to the image size
+    scale_factors = torch.tensor([img_size[0], img_size[1], img_size[0], img_size[1]], dtype=torch.float32)
+    pred_bboxes = pred_bboxes * scale_factors
+
+    objects = []
+    for label, score, bbox in zip(pred_labels, pred_scores, pred_bboxes):
+        class_label = id2label[int(label)]
+        if class_label != 'no object':
+            objects.append({
+                'label': class_label,
+                'score': float(score),
+                'bbox': bbox.tolist()
+            })
+
+    return objects
+
+
+class TableStructureModel:
+    """
+    TableTransformer structure-recognition model kept resident for the life of the process.
+
+    Loading the weights takes seconds, so the model, device placement and input transform
+    are set up once and reused by every column-detection call.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, quantize=QUANTIZE_ON_CPU):
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+        model = TableTransformerForObjectDetection.from_pretrained(model_dir)
+        model.eval()
+        if quantize and self.device == "cpu":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model.to(self.device)
+
+        self.transform = transforms.Compose([
+            transforms.ToTensor(),
+            transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
+        ])
+
+        # Copy so the appended "no object" class never leaks into the model config
+        self.id2label = dict(self.model.config.id2label)
+        self.id2label[len(self.id2label)] = "no object"
+
+    def detect_columns(self, images, batch_size=INFERENCE_BATCH_SIZE):
+        """
+        Returns the detected "table column" objects for each PIL image, in input order.
+        Images are batched with others of the same size so no padding changes the result.
+        """
+        results = [None] * len(images)
+        by_size = {}
+        for position, image in enumerate(images):
+            by_size.setdefault(image.size, []).append(position)
+
+        for img_size, positions in by_size.items():
+            for start in range(0, len(positions), batch_size):
+                batch = positions[start:start + batch_size]
+                pixel_values = torch.stack([self.transform(images[i]) for i in batch]).to(self.device)
+
+                with torch.inference_mode():
+                    outputs = self.model(pixel_values)
+
+                for index, position in enumerate(batch):
+                    objects = objects_from_outputs(outputs, index, img_size, self.id2label)
+                    results[position] = [obj for obj in objects if obj['label'] == "table column"]
+
+        return results
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_table_structure_model():
+    # Extraction probes run in threads, so guard the one-time load
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = TableStructureModel()
+    return _model
@@ -17,6 +17,14 @@ def get_saved_excel_dir():
     return TEMP_SAVED_EXCEL_DIR
     
 
+def get_layout_cache_dir():
+
+    # Layout cache entries are reused across uploads, so deployments can point this at a persistent volume
+    LAYOUT_CACHE_DIR = os.getenv("LEGACY_LAYOUT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "layout_cache")
+
+    return LAYOUT_CACHE_DIR
+
+
 def get_base_dir():
     """
     Determine the base directory of the application.
@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { useParams, useRouter } from "next/navigation";
 import { ArrowLeft, Download, FileSpreadsheet, Loader2 } from "lucide-react";
 import Link from "next/link";
@@ -11,12 +11,18 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/com
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { ExcelTable } from "@/components/statements/excel-table";
 
+interface SheetPage {
+  columns: string[];
+  data: any[];
+  row_count: number;
+  column_count: number;
+}
+
 interface JobResult {
   job_id: string;
   status: string;
   result?: {
     file_name?: string;
-    sheets_data?: Record<string, any[]>;
     excel?: {
       path?: string;
       download_token?: string;
@@ -25,19 +31,59 @@ interface JobResult {
   };
 }
 
+// Rows fetched per request; more are loaded as the grid is scrolled
+const PAGE_SIZE = 100;
+
+// Pages already received, by URL, with their ETag. The backend answers 304
+// while the workbook is unchanged, so revisits and reloads reuse the body.
+const pageCache = new Map<string, { etag: string; body: any }>();
+
+async function fetchExcelData(url: string): Promise<any> {
+  const cached = pageCache.get(url);
+  const response = await fetch(url, {
+    cache: "no-store",
+    headers: cached ? { "If-None-Match": cached.etag } : undefined,
+  });
+  if (response.status === 304 && cached) {
+    return cached.body;
+  }
+  if (!response.ok) {
+    throw new Error("Failed to fetch sheet data");
+  }
+  const body = await response.json();
+  const etag = response.headers.get("etag");
+  if (etag) {
+    pageCache.set(url, { etag, body });
+  }
+  return body;
+}
+
 export default function StatementDetailPage() {
   const params = useParams();
   const router = useRouter();
   const jobId = params.job_id as string;
 
   const [job, setJob] = useState<JobResult | null>(null);
+  const [sheetsData, setSheetsData] = useState<Record<string, SheetPage>>({});
+  const [sheetNames, setSheetNames] = useState<string[]>([]);
+  const [loadingSheets, setLoadingSheets] = useState<Set<string>>(new Set());
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  // Sheets with a page request in flight, so scroll events do not repeat it
+  const pendingSheets = useRef<Set<string>>(new Set());
 
   useEffect(() => {
     fetchJobDetails();
   }, [jobId]);
 
+  const excelDataUrl = (token: string, query: Record<string, string | number>) => {
+    const search = new URLSearchParams({ token });
+    for (const [name, value] of Object.entries(query)) {
+      search.set(name, String(value));
+    }
+    return `/api/ai/statements/${jobId}/excel-data?${search.toString()}`;
+  };
+
   const fetchJobDetails = async () => {
     try {
       // First get job status
@@ -47,13 +93,15 @@ export default function StatementDetailPage() {
       }
       const jobData = await statusResponse.json();
 
-      // If completed and has Excel, fetch the Excel data
+      // If completed and has Excel, fetch the sheet names and the first page of every sheet
       if (jobData.status === "completed" && jobData.result?.excel?.download_token) {
         const token = jobData.result.excel.download_token;
-        const excelResponse = await fetch(`/api/ai/statements/${jobId}/excel-data?token=${token}`);
-        if (excelResponse.ok) {
-          const excelData = await excelResponse.json();
-          jobData.result.sheets_data = excelData.sheets;
+        try {
+          const excelData = await fetchExcelData(excelDataUrl(token, { offset: 0, limit: PAGE_SIZE }));
+          setSheetsData(excelData.sheets || {});
+          setSheetNames(excelData.sheet_names || Object.keys(excelData.sheets || {}));
+        } catch {
+          // The grid shows that no sheet data is available
         }
       }
 
@@ -65,6 +113,33 @@ export default function StatementDetailPage() {
     }
   };
 
+  const loadMoreRows = async (sheetName: string) => {
+    const token = job?.result?.excel?.download_token;
+    const sheet = sheetsData[sheetName];
+    if (!token || !sheet || sheet.data.length >= sheet.row_count || pendingSheets.current.has(sheetName)) {
+      return;
+    }
+    pendingSheets.current.add(sheetName);
+    setLoadingSheets(new Set(pendingSheets.current));
+    try {
+      const excelData = await fetchExcelData(
+        excelDataUrl(token, { sheet: sheetName, offset: sheet.data.length, limit: PAGE_SIZE })
+      );
+      const page: SheetPage | undefined = excelData.sheets?.[sheetName];
+      if (page) {
+        setSheetsData((previous) => ({
+          ...previous,
+          [sheetName]: { ...page, data: [...previous[sheetName].data, ...page.data] },
+        }));
+      }
+    } catch (err) {
+      console.error(`Failed to load more rows of ${sheetName}:`, err);
+    } finally {
+      pendingSheets.current.delete(sheetName);
+      setLoadingSheets(new Set(pendingSheets.current));
+    }
+  };
+
   const handleDownloadExcel = () => {
     if (job?.result?.excel?.download_token) {
       window.open(`/api/ai/statements/${jobId}/excel?token=${job.result.excel.download_token}`, "_blank");
@@ -103,9 +178,6 @@ export default function StatementDetailPage() {
     );
   }
 
-  const sheetsData = job.result?.sheets_data || {};
-  const sheetNames = Object.keys(sheetsData);
-
   return (
     <section className="space-y-8">
       <DashboardHeader
@@ -159,7 +231,13 @@ export default function StatementDetailPage() {
               </TabsList>
               {sheetNames.map((sheetName) => (
                 <TabsContent key={sheetName} value={sheetName} className="mt-0">
-                  <ExcelTable data={sheetsData[sheetName]} sheetName={sheetName} />
+                  <ExcelTable
+                    data={sheetsData[sheetName] ?? []}
+                    sheetName={sheetName}
+                    totalRows={sheetsData[sheetName]?.row_count}
+                    onLoadMore={() => loadMoreRows(sheetName)}
+                    loadingMore={loadingSheets.has(sheetName)}
+                  />
                 </TabsContent>
               ))}
             </Tabs>
@@ -2,6 +2,10 @@ import { NextRequest, NextResponse } from "next/server";
 
 const BACKEND_URL = process.env.BACKEND_URL || "http://localhost:8000";
 
+// Validators passed between the browser and the backend so unchanged sheets are not resent
+const CONDITIONAL_HEADERS = ["if-none-match", "if-modified-since"];
+const CACHE_HEADERS = ["etag", "last-modified", "cache-control"];
+
 export async function GET(
   request: NextRequest,
   { params }: { params: { job_id: string } }
@@ -18,16 +22,36 @@ export async function GET(
       );
     }
 
+    const headers: Record<string, string> = { "Content-Type": "application/json" };
+    for (const name of CONDITIONAL_HEADERS) {
+      const value = request.headers.get(name);
+      if (value) {
+        headers[name] = value;
+      }
+    }
+
+    // token, sheet, offset, limit and columns are passed through as they are
     const response = await fetch(
-      `${BACKEND_URL}/ai/statements/${jobId}/excel-data?token=${token}`,
+      `${BACKEND_URL}/ai/statements/${jobId}/excel-data?${searchParams.toString()}`,
       {
         method: "GET",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers,
+        cache: "no-store",
       }
     );
 
+    const cacheHeaders = new Headers();
+    for (const name of CACHE_HEADERS) {
+      const value = response.headers.get(name);
+      if (value) {
+        cacheHeaders.set(name, value);
+      }
+    }
+
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: cacheHeaders });
+    }
+
     if (!response.ok) {
       return NextResponse.json(
         { error: "Failed to fetch Excel data" },
@@ -35,8 +59,9 @@ export async function GET(
       );
     }
 
-    const data = await response.json();
-    return NextResponse.json(data);
+    // Relay the body as-is instead of parsing and re-serialising it
+    cacheHeaders.set("Content-Type", "application/json");
+    return new NextResponse(response.body, { status: 200, headers: cacheHeaders });
   } catch (error) {
     console.error("Error fetching Excel data:", error);
     return NextResponse.json(
@@ -44,4 +69,4 @@ export async function GET(
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
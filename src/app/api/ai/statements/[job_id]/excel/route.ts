@@ -1,8 +1,10 @@
 import { NextRequest, NextResponse } from "next/server";
 
+import { proxyArtifact } from "@/lib/artifact-proxy";
+
 const BACKEND_URL = process.env.BACKEND_URL || "http://localhost:8000";
 
-export async function GET(
+async function handle(
   request: NextRequest,
   { params }: { params: { job_id: string } }
 ) {
@@ -18,30 +20,12 @@ export async function GET(
       );
     }
 
-    const response = await fetch(
+    // Streamed through, with Range and conditional requests answered by the backend
+    return await proxyArtifact(
+      request,
       `${BACKEND_URL}/ai/statements/${jobId}/excel?token=${token}`,
-      {
-        method: "GET",
-      }
+      "Failed to download Excel file"
     );
-
-    if (!response.ok) {
-      return NextResponse.json(
-        { error: "Failed to download Excel file" },
-        { status: response.status }
-      );
-    }
-
-    // Stream the file response directly
-    const blob = await response.blob();
-    const headers = new Headers();
-    headers.set("Content-Type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet");
-    headers.set("Content-Disposition", response.headers.get("Content-Disposition") || "attachment; filename=statement.xlsx");
-
-    return new NextResponse(blob, {
-      status: 200,
-      headers,
-    });
   } catch (error) {
     console.error("Error downloading Excel:", error);
     return NextResponse.json(
@@ -49,4 +33,6 @@ export async function GET(
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
+
+export { handle as GET, handle as HEAD };
@@ -4,19 +4,34 @@ const BACKEND_URL = process.env.BACKEND_URL || "http://localhost:8000";
 
 export async function POST(request: NextRequest) {
   try {
-    const formData = await request.formData();
+    const headers: Record<string, string> = {
+      "content-type": request.headers.get("content-type") ?? "",
+    };
+    // Lets the backend refuse an oversized upload before it is sent
+    const contentLength = request.headers.get("content-length");
+    if (contentLength) {
+      headers["content-length"] = contentLength;
+    }
 
-    // Forward the form data directly to the backend
+    // Pass the multipart body through as it arrives instead of buffering the form
     const response = await fetch(`${BACKEND_URL}/ai/statements/normalize`, {
       method: "POST",
-      body: formData,
-    });
+      headers,
+      body: request.body,
+      duplex: "half",
+    } as RequestInit & { duplex: "half" });
 
     if (!response.ok) {
       const errorText = await response.text();
       console.error("Backend error:", errorText);
+      let message = "Failed to process statement";
+      try {
+        message = JSON.parse(errorText).detail || message;
+      } catch {
+        // Not a JSON error body; keep the generic message
+      }
       return NextResponse.json(
-        { error: "Failed to process statement" },
+        { error: message },
         { status: response.status }
       );
     }
@@ -30,4 +45,4 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
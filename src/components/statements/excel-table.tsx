@@ -45,8 +45,15 @@ interface SheetData {
 interface ExcelTableProps {
   data: SheetData | any[];
   sheetName: string;
+  // Rows in the whole sheet when `data` is only the pages loaded so far
+  totalRows?: number;
+  onLoadMore?: () => void;
+  loadingMore?: boolean;
 }
 
+// Distance from the bottom of the grid, in pixels, at which the next page is requested
+const LOAD_MORE_THRESHOLD = 400;
+
 const amountSanitizer = /[^0-9.-]/g;
 
 function parseAmount(value: unknown): number {
@@ -69,7 +76,7 @@ function normaliseKeyword(value: string): string {
     .trim();
 }
 
-export function ExcelTable({ data, sheetName }: ExcelTableProps) {
+export function ExcelTable({ data, sheetName, totalRows, onLoadMore, loadingMore = false }: ExcelTableProps) {
   const { toast } = useToast();
   const [isFullscreen, setIsFullscreen] = useState(false);
   const containerRef = useRef<HTMLDivElement>(null);
@@ -545,7 +552,16 @@ export function ExcelTable({ data, sheetName }: ExcelTableProps) {
     return () => window.removeEventListener('entitiesUpdated', handleEntitiesUpdate);
   }, []);
 
+  const loadedRowsRef = useRef(initialRows);
+
   useEffect(() => {
+    const loaded = loadedRowsRef.current;
+    loadedRowsRef.current = initialRows;
+    // A further page of the same sheet: append it and keep this session's edits
+    if (loaded !== initialRows && loaded.length > 0 && initialRows.length > loaded.length && initialRows[0] === loaded[0]) {
+      setRows((prev) => [...prev, ...initialRows.slice(loaded.length).map((row) => ({ ...row }))]);
+      return;
+    }
     setRows(initialRows.map((row) => ({ ...row })));
     setModifiedRowIndexes(new Set());
     setModifiedEntityIndexes(new Set());
@@ -597,9 +613,18 @@ export function ExcelTable({ data, sheetName }: ExcelTableProps) {
   }, [isEntityDialogOpen, resetEntityEditingState]);
 
   const stats = useMemo(
-    () => ({ rowCount: rows.length, columnCount: columns.length }),
-    [columns.length, rows.length],
+    () => ({ rowCount: Math.max(totalRows ?? 0, rows.length), columnCount: columns.length }),
+    [columns.length, rows.length, totalRows],
   );
+  const hasMoreRows = Boolean(onLoadMore) && rows.length < stats.rowCount;
+
+  const handleScroll = (event: React.UIEvent<HTMLDivElement>) => {
+    if (!hasMoreRows || loadingMore) return;
+    const { scrollTop, clientHeight, scrollHeight } = event.currentTarget;
+    if (scrollTop + clientHeight >= scrollHeight - LOAD_MORE_THRESHOLD) {
+      onLoadMore?.();
+    }
+  };
 
   // Initialize column widths
   useEffect(() => {
@@ -789,6 +814,7 @@ export function ExcelTable({ data, sheetName }: ExcelTableProps) {
             variant="outline"
             onClick={handleExportCSV}
             className="gap-2"
+            title={hasMoreRows ? `Exports the ${rows.length.toLocaleString('en-IN')} rows loaded so far; Download Excel has the whole sheet` : undefined}
           >
             <Download className="size-3.5" />
             Export CSV
@@ -815,7 +841,10 @@ export function ExcelTable({ data, sheetName }: ExcelTableProps) {
       <div className="relative w-full">
         <div className="overflow-auto rounded-lg border border-border/60 bg-background shadow-sm">
           {/* Scrollable container with max height */}
-          <div className={isFullscreen ? "max-h-[calc(100vh-180px)] overflow-auto" : "max-h-[calc(100vh-320px)] overflow-auto"}>
+          <div
+            className={isFullscreen ? "max-h-[calc(100vh-180px)] overflow-auto" : "max-h-[calc(100vh-320px)] overflow-auto"}
+            onScroll={handleScroll}
+          >
             <table className="w-full border-collapse text-sm" style={{ tableLayout: 'fixed' }}>
               {/* Sticky Header */}
               <thead className="sticky top-0 z-20 bg-muted/95 backdrop-blur-sm">
@@ -992,6 +1021,18 @@ export function ExcelTable({ data, sheetName }: ExcelTableProps) {
           </div>
         </div>
 
+        {hasMoreRows ? (
+          <div className="mt-2 flex items-center justify-between gap-2 text-xs text-muted-foreground">
+            <span>
+              Showing {rows.length.toLocaleString('en-IN')} of {stats.rowCount.toLocaleString('en-IN')} rows
+            </span>
+            <Button size="sm" variant="ghost" onClick={onLoadMore} disabled={loadingMore} className="gap-2">
+              {loadingMore ? <Loader2 className="size-3.5 animate-spin" /> : null}
+              Load more
+            </Button>
+          </div>
+        ) : null}
+
         {/* Scroll Hint for Mobile */}
         <div className="mt-2 flex items-center justify-center gap-2 text-xs text-muted-foreground md:hidden">
           <svg className="size-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
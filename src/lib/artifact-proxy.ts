@@ -0,0 +1,56 @@
+import { NextRequest, NextResponse } from "next/server";
+
+// Request headers that make a download conditional or partial; forwarded to the backend
+const FORWARDED_REQUEST_HEADERS = ["range", "if-range", "if-none-match", "if-modified-since"];
+
+// Response headers the browser needs to resume, revalidate and save the file
+const RELAYED_RESPONSE_HEADERS = [
+  "accept-ranges",
+  "cache-control",
+  "content-disposition",
+  "content-length",
+  "content-range",
+  "content-type",
+  "etag",
+  "last-modified",
+];
+
+/**
+ * Proxy a backend file download without buffering it: the body is streamed
+ * through, and Range/conditional requests keep their 206, 304 and 416 answers.
+ * Backend errors are answered with `errorMessage` and the backend's status.
+ */
+export async function proxyArtifact(
+  request: NextRequest,
+  url: string,
+  errorMessage: string
+): Promise<NextResponse> {
+  const headers = new Headers();
+  for (const name of FORWARDED_REQUEST_HEADERS) {
+    const value = request.headers.get(name);
+    if (value) {
+      headers.set(name, value);
+    }
+  }
+
+  const response = await fetch(url, {
+    method: request.method === "HEAD" ? "HEAD" : "GET",
+    headers,
+    cache: "no-store",
+  });
+
+  if (!response.ok && response.status !== 304 && response.status !== 416) {
+    return NextResponse.json({ error: errorMessage }, { status: response.status });
+  }
+
+  const relayed = new Headers();
+  for (const name of RELAYED_RESPONSE_HEADERS) {
+    const value = response.headers.get(name);
+    if (value) {
+      relayed.set(name, value);
+    }
+  }
+
+  const body = response.status === 304 || request.method === "HEAD" ? null : response.body;
+  return new NextResponse(body, { status: response.status, headers: relayed });
+}
@@ -0,0 +1,52 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend import analytics_graph
+from old_endpoints.backend.analytics_graph import StatementAnalytics
+
+
+def _ledger():
+    return pd.DataFrame({
+        "Value Date": ["01-04-2024", "02-04-2024"],
+        "Description": ["UPI/salary", "rent"],
+        "Debit": [0.0, 300.0],
+        "Credit": [1000.0, 0.0],
+        "Balance": [1000.0, 700.0],
+    })
+
+
+def test_shared_nodes_are_built_once(monkeypatch):
+    calls = []
+
+    def fake_eod(df):
+        calls.append("EOD")
+        return pd.DataFrame({"Day": [1]})
+
+    monkeypatch.setitem(analytics_graph._GRAPH, "EOD", (fake_eod, ["transactions"]))
+    monkeypatch.setitem(analytics_graph._GRAPH, "bank_avg_balance", (lambda eod: eod, ["EOD"]))
+    monkeypatch.setitem(analytics_graph._GRAPH, "Opportunity to Earn", (lambda avg, eod: avg, ["bank_avg_balance", "EOD"]))
+
+    analytics = StatementAnalytics(_ledger())
+    first = analytics["Opportunity to Earn"]
+
+    assert analytics["EOD"] is first
+    assert analytics.sheets(["Opportunity to Earn", "EOD"]) == {"EOD": first, "Opportunity to Earn": first}
+    assert calls == ["EOD"]
+
+
+def test_display_dates_leave_the_ledger_untouched(monkeypatch):
+    monkeypatch.setitem(analytics_graph._GRAPH, "summary", (lambda df: ([], []), ["transactions"]))
+    ledger = _ledger()
+    ledger["Value Date"] = pd.to_datetime(ledger["Value Date"], format="%d-%m-%Y")
+
+    analytics = StatementAnalytics(ledger)
+
+    assert list(analytics["UPI-CR"]["Value Date"]) == ["01-04-2024"]
+    assert analytics["UPI-DR"].empty
+    assert ledger["Value Date"].dtype.kind == "M"
@@ -0,0 +1,48 @@
+from pathlib import Path
+import sys
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.api.artifacts import artifact_response
+
+
+def _client(path):
+    app = FastAPI()
+
+    @app.api_route("/artifact", methods=["GET", "HEAD"])
+    async def download(request: Request):
+        return artifact_response(request, path, media_type="application/pdf", filename="report.pdf")
+
+    return TestClient(app)
+
+
+def test_ranges_resume_against_the_same_etag(tmp_path):
+    path = tmp_path / "report.pdf"
+    path.write_bytes(bytes(range(256)) * 4)
+    client = _client(path)
+
+    full = client.get("/artifact")
+    assert full.status_code == 200 and full.headers["accept-ranges"] == "bytes"
+
+    part = client.get("/artifact", headers={"Range": "bytes=1000-", "If-Range": full.headers["etag"]})
+    assert part.status_code == 206
+    assert part.headers["content-range"] == "bytes 1000-1023/1024" and part.content == full.content[1000:]
+    # A file that changed since is sent whole
+    assert client.get("/artifact", headers={"Range": "bytes=1000-", "If-Range": '"older"'}).status_code == 200
+
+
+def test_current_copies_are_not_resent(tmp_path):
+    path = tmp_path / "report.pdf"
+    path.write_bytes(b"%PDF-1.7")
+    client = _client(path)
+    full = client.get("/artifact")
+
+    assert client.get("/artifact", headers={"If-None-Match": full.headers["etag"]}).status_code == 304
+    assert client.get("/artifact", headers={"If-Modified-Since": full.headers["last-modified"]}).status_code == 304
+    assert client.get("/artifact", headers={"If-None-Match": '"older"'}).status_code == 200
+    assert client.head("/artifact").headers["content-length"] == "8"
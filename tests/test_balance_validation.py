@@ -0,0 +1,63 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend.code_for_extraction import (
+    cleaning,
+    validate_bank_statement,
+    validate_bank_statement_returns_error_message,
+)
+
+
+def _statement(balances):
+    return pd.DataFrame({
+        "Value Date": ["01-04-2024", "02-04-2024", "03-04-2024", "04-04-2024"],
+        "Description": ["opening", "salary", "rent", "atm"],
+        "Debit": [np.nan, np.nan, 300.0, 100.0],
+        "Credit": [np.nan, 1000.0, np.nan, np.nan],
+        "Balance": balances,
+    })
+
+
+def test_consistent_statement_passes():
+    df = _statement([500.0, 1500.0, 1200.0, 1100.0])
+    assert validate_bank_statement(df) is df
+    assert validate_bank_statement_returns_error_message(df) == ""
+
+
+def test_reports_the_first_mismatching_row():
+    with pytest.raises(Exception, match=r"row 2 \(Date: 03-04-2024\): Expected balance 1200.0, Actual balance 1250.0"):
+        validate_bank_statement(_statement([500.0, 1500.0, 1250.0, 1000.0]))
+
+
+def test_sign_errors_are_not_raised():
+    df = _statement([500.0, 1500.0, 1200.0, -1100.0])
+    validate_bank_statement(df)
+    assert validate_bank_statement_returns_error_message(df) == ""
+
+
+def test_error_message_names_the_last_mismatch():
+    message = validate_bank_statement_returns_error_message(_statement([500.0, 1600.0, 1200.0, 900.0]))
+    assert message.startswith("Balance mismatch at row 3 (Date: 04-04-2024): for Description 'atm';")
+
+
+def test_cleaning_merges_wrapped_descriptions_into_the_dated_row():
+    df = pd.DataFrame({
+        "Value Date": ["header", "01-04-2024", None, None, "02-04-2024"],
+        "Description": ["Narration", "UPI/123", "PAYTM", "ref 9", "ATM"],
+        "Debit": ["", "", "", "", "100.00"],
+        "Credit": ["", "50.00", "", "", ""],
+        "Balance": ["", "1,050.00", "", "", "950.00"],
+    })
+
+    result = cleaning(df)
+
+    assert list(result["Description"]) == ["UPI/123 PAYTM ref 9", "ATM"]
+    assert list(result["Balance"]) == [1050.0, 950.0]
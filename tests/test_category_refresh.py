@@ -0,0 +1,60 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend import category_refresh
+from old_endpoints.backend.category_refresh import refresh_categories
+from old_endpoints.backend.common_functions import eod, make_summary_great_again, opening_and_closing_bal
+
+CATEGORIES = pd.DataFrame({
+    "Category": ["Salary", "Rent", "Food", "Transfer In"],
+    "Particulars": ["Income", "Important Expenses / Payments", "Other Expenses / Payments", "Contra Credit"],
+    "Preferences": ["default", "default", "non_default", "default"],
+})
+
+
+def _ledger():
+    return pd.DataFrame({
+        "Value Date": pd.to_datetime(["01-04-2024", "03-04-2024", "10-05-2024", "12-05-2024", "01-07-2024"],
+                                     format="%d-%m-%Y"),
+        "Description": ["salary", "rent", "swiggy", "neft", "salary"],
+        "Debit": [None, 300.0, 45.5, None, None],
+        "Credit": [1000.0, None, None, 200.0, 1000.0],
+        "Balance": [1000.0, 700.0, 654.5, 854.5, 1854.5],
+        "Category": ["Salary", "Rent", "Food", "Transfer In", "Salary"],
+        "Bank": ["A"] * 5,
+    })
+
+
+def _eod(ledger):
+    return eod(ledger.assign(**{"Value Date": ledger["Value Date"].dt.strftime("%d-%m-%Y")}))
+
+
+def _full(ledger, eod_df):
+    opening_bal, closing_bal = opening_and_closing_bal(eod_df, ledger)
+    balances = {month: [opening_bal[month], closing_bal[month]] for month in opening_bal}
+    return make_summary_great_again(ledger, balances, CATEGORIES)[:6]
+
+
+def test_edits_rebuild_only_the_sections_they_touch(monkeypatch):
+    monkeypatch.setattr(category_refresh, "category_table", lambda new_categories=None: CATEGORIES)
+    ledger = _ledger()
+    eod_df = _eod(ledger)
+    first = refresh_categories(ledger.copy(), eod_df)
+
+    # The swiggy debit moves from Food to Rent
+    ledger.loc[2, "Category"] = "Rent"
+    edited = refresh_categories(ledger.copy(), eod_df)
+
+    for name, expected in zip(["Particulars"] + list(category_refresh.SUMMARY_SECTIONS), _full(ledger, eod_df)):
+        pd.testing.assert_frame_equal(edited[name].reset_index(drop=True), expected, check_names=False)
+    assert edited["Income Receipts"] is first["Income Receipts"]
+    assert edited["Opportunity to Earn"] is first["Opportunity to Earn"]
+    assert edited["Important Expenses"] is not first["Important Expenses"]
+    # Food is left empty and is a non_default category, so it drops out of its section
+    assert edited["Other Expenses"].empty
@@ -0,0 +1,69 @@
+from pathlib import Path
+import os
+import sys
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend import category_rules
+from old_endpoints.backend.category_rules import CategoryRuleRepository
+
+
+def _write(path, keywords):
+    pd.DataFrame({
+        "Description": keywords,
+        "Debit / Credit": ["Debit"] * len(keywords),
+        "Category": [keyword.title() for keyword in keywords],
+    }).to_excel(path, index=False)
+
+
+def _count_reads(monkeypatch):
+    reads = []
+    read_excel = pd.read_excel
+
+    def counting(path, *args, **kwargs):
+        reads.append(Path(path).name)
+        return read_excel(path, *args, **kwargs)
+
+    monkeypatch.setattr(category_rules.pd, "read_excel", counting)
+    return reads
+
+
+def test_workbooks_are_parsed_once_until_they_change(tmp_path, monkeypatch):
+    final, customer = tmp_path / "final.xlsx", tmp_path / "customer.xlsx"
+    _write(final, ["rent"])
+    _write(customer, ["gym"])
+    reads = _count_reads(monkeypatch)
+    repository = CategoryRuleRepository()
+
+    rules = repository.keyword_rules(final, customer)
+    assert repository.keyword_rules(final, customer) is rules
+    assert list(repository.table(final)["Description"]) == ["rent"]
+    assert sorted(reads) == ["customer.xlsx", "final.xlsx"]
+
+    _write(customer, ["gym", "fees"])
+    os.utime(customer, ns=(0, 0))
+    updated = repository.keyword_rules(final, customer)
+    assert updated is not rules
+    assert list(updated.categorise(["fees"], [1], [0], ["Suspense"])) == ["Fees"]
+    assert sorted(reads) == ["customer.xlsx", "customer.xlsx", "final.xlsx"]
+
+
+def test_touched_workbook_with_same_content_is_not_parsed_again(tmp_path, monkeypatch):
+    final = tmp_path / "final.xlsx"
+    _write(final, ["rent"])
+    reads = _count_reads(monkeypatch)
+    repository = CategoryRuleRepository()
+
+    rules = repository.keyword_rules(final)
+    os.utime(final, ns=(0, 0))
+
+    assert repository.keyword_rules(final) is rules
+    assert reads == ["final.xlsx"]
+
+    repository.reload(final)
+    assert repository.keyword_rules(final) is not rules
+    assert reads == ["final.xlsx", "final.xlsx"]
@@ -0,0 +1,60 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend.category_rules import CategoryRuleSet
+
+
+def _sequential(rules, descriptions, debit, credit, current):
+    # What category_add_ca used to do: one str.contains mask per rule, in order
+    df = pd.DataFrame({"Description": descriptions, "Debit": debit, "Credit": credit, "Category": current})
+    for pattern, direction, category, ignore_case in rules:
+        mask = df["Description"].str.contains(pattern, case=not ignore_case, na=False)
+        if direction == "Debit":
+            mask &= df["Debit"] > 0
+        elif direction == "Credit":
+            mask &= df["Credit"] > 0
+        df.loc[mask, "Category"] = category
+    return df["Category"].tolist()
+
+
+RULES = [
+    ("upi", "Debit", "UPI-Dr", True),
+    ("upi", "Credit", "UPI-Cr", True),
+    ("amazon", "Debit", "Online Shopping", True),
+    ("amazonpay", "Debit", "Wallet", True),
+    ("pay", None, "Payments", True),
+    (r"^(int)", "Credit", "Interest", False),
+    (r"int.coll", "Debit", "Interest Paid", True),
+    ("ZOMATO", "Debit", "Food", True),
+    ("kfc", "Debit", "Food", True),
+    (r"sal(ary)?$", "Credit", "Salary", True),
+]
+
+
+def test_matches_rules_applied_one_after_another():
+    descriptions = ["upi/amazonpay/123", "upi/amazon/1", "int.coll", "intcredit", "zomatoK", "salary",
+                    "xsal", "neft/abc", np.nan, "upi/x", "KZOMATO"]
+    debit = [10, 10, 5, np.nan, 3, np.nan, np.nan, 1, 1, np.nan, 2]
+    credit = [np.nan, np.nan, np.nan, 7, np.nan, 100, 50, np.nan, np.nan, 4, np.nan]
+    current = ["Suspense"] * len(descriptions)
+
+    engine = CategoryRuleSet(RULES)
+
+    assert list(engine.categorise(descriptions, debit, credit, current)) == _sequential(
+        RULES, descriptions, debit, credit, current)
+
+
+def test_unmatched_rows_keep_their_category():
+    engine = CategoryRuleSet([("rent", "Debit", "Rent", True)])
+
+    categories = engine.categorise(["rent", "rent", "fees"], [5, np.nan, 5], [np.nan, 5, np.nan],
+                                   ["A", "B", "C"])
+
+    assert list(categories) == ["Rent", "B", "C"]
@@ -0,0 +1,50 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend import date_inference
+from old_endpoints.backend.date_inference import infer_date_format, parse_date_column, try_parsing_date
+
+
+def _formatted(column):
+    return column.dt.strftime("%d-%m-%Y")
+
+
+def test_infers_the_dominant_format():
+    assert infer_date_format(["01-04-2024", "15-04-2024", "Opening Balance"]) == "%d-%m-%Y"
+    assert infer_date_format(["01 Apr 2024", "02 Apr 2024"]) == "%d %b %Y"
+    assert infer_date_format(["Opening Balance"]) is None
+
+
+def test_matches_the_per_cell_parser():
+    date_inference._inferred_formats.clear()
+    column = pd.Series(
+        ["04/25/2024", "04/26/2024", "03/04/2024", "13/04/2024", "", None, np.nan, "Opening Balance", "01 Apr 2024"],
+        dtype=object,
+    )
+
+    expected = column.apply(try_parsing_date)
+    result = parse_date_column(column)
+
+    # "03/04/2024" is still read day-first: that format comes before the inferred month-first one
+    assert result.dtype == expected.dtype
+    assert _formatted(result).equals(_formatted(expected))
+    assert _formatted(result)[2] == "03-04-2024"
+
+
+def test_inferred_format_is_reused_for_the_same_layout(monkeypatch):
+    date_inference._inferred_formats.clear()
+    parse_date_column(pd.Series(["01-04-2024", "02-04-2024"], dtype=object))
+
+    def fail(sample):
+        raise AssertionError("format inferred again")
+
+    monkeypatch.setattr(date_inference, "infer_date_format", fail)
+    result = parse_date_column(pd.Series(["05-06-2024", "07-06-2024"], dtype=object))
+    assert list(_formatted(result)) == ["05-06-2024", "07-06-2024"]
@@ -0,0 +1,83 @@
+from pathlib import Path
+import shutil
+import sys
+
+import pdfplumber
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend import document_context
+from old_endpoints.backend.document_context import (
+    find_document_context,
+    get_document_context,
+    release_document_context,
+)
+from old_endpoints.backend.table_assembly import extract_table_dataframe
+
+SAMPLES = ROOT / "public" / "samples"
+
+
+def test_context_is_shared_until_released(tmp_path):
+    pdf_path = str(tmp_path / "statement.pdf")
+    shutil.copy(SAMPLES / "axis.pdf", pdf_path)
+
+    context = get_document_context(pdf_path)
+    assert find_document_context(pdf_path) is context
+    assert get_document_context(pdf_path) is context
+
+    with pdfplumber.open(pdf_path) as pdf:
+        assert context.page_count == len(pdf.pages)
+        assert context.first_page_text == pdf.pages[0].extract_text()
+        assert context.words(1) == pdf.pages[1].extract_words()
+
+    release_document_context(pdf_path)
+    assert find_document_context(pdf_path) is None
+
+
+def test_rewritten_file_gets_a_fresh_context(tmp_path):
+    pdf_path = str(tmp_path / "statement.pdf")
+    shutil.copy(SAMPLES / "axis.pdf", pdf_path)
+    first = get_document_context(pdf_path)
+
+    shutil.copy(SAMPLES / "icici-2025.pdf", pdf_path)
+
+    assert find_document_context(pdf_path) is None
+    assert get_document_context(pdf_path) is not first
+    release_document_context(pdf_path)
+
+
+def test_evicted_context_is_closed_but_still_usable(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_context, "MAX_OPEN_DOCUMENTS", 1)
+    first_path = str(tmp_path / "first.pdf")
+    second_path = str(tmp_path / "second.pdf")
+    shutil.copy(SAMPLES / "axis.pdf", first_path)
+    shutil.copy(SAMPLES / "icici-2025.pdf", second_path)
+
+    first = get_document_context(first_path)
+    first.first_page_text
+    second = get_document_context(second_path)
+    try:
+        assert find_document_context(first_path) is None
+        assert first.closed
+        # A step still holding the evicted context reads it again from the file
+        with pdfplumber.open(first_path) as pdf:
+            assert first.first_page_text == pdf.pages[0].extract_text()
+        first.close()
+    finally:
+        release_document_context(second_path)
+    assert second.closed
+
+
+def test_extraction_through_a_context_matches_a_fresh_open(tmp_path):
+    pdf_path = str(tmp_path / "statement.pdf")
+    shutil.copy(SAMPLES / "axis.pdf", pdf_path)
+    expected = extract_table_dataframe(pdf_path)
+
+    context = get_document_context(pdf_path)
+    context.first_page_text
+    try:
+        assert extract_table_dataframe(pdf_path).equals(expected)
+    finally:
+        release_document_context(pdf_path)
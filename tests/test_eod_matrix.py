@@ -0,0 +1,47 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend.common_functions import calculate_fixed_day_average, eod, opening_and_closing_bal
+
+
+def _ledger():
+    return pd.DataFrame({
+        "Value Date": ["10-01-2024", "10-01-2024", "20-01-2024", "05-03-2024", "03-01-2024"],
+        "Balance": [100.0, 150.0, 200.0, 50.0, 900.0],
+        "Bank": ["A", "A", "A", "A", "B"],
+    })
+
+
+def test_balances_carry_forward_across_months_and_banks():
+    sheet = eod(_ledger())
+
+    assert list(sheet.columns) == ["Day", "Jan-2024", "Feb-2024", "Mar-2024"]
+    jan, feb, mar = sheet["Jan-2024"], sheet["Feb-2024"], sheet["Mar-2024"]
+    # Bank B only has January; its balance is added to A's from the 3rd on
+    assert jan[1] == 0.0 and jan[2] == 900.0
+    # The last balance listed on a day is that day's closing balance
+    assert jan[9] == 1050.0 and jan[19] == 1100.0 and jan[30] == 1100.0
+    # February has no transactions and carries January's close; day slots past the 29th are 0
+    assert feb[0] == 200.0 and feb[28] == 200.0 and feb[29] == 0.0
+    # Days after the last transaction of the statement are 0
+    assert mar[3] == 200.0 and mar[4] == 50.0 and mar[5] == 0.0
+    assert sheet["Day"].iloc[31] == "Total" and sheet["Day"].iloc[32] == "Average"
+
+
+def test_day_set_averages_and_closing_balances():
+    sheet = eod(_ledger().query("Bank == 'A'"))
+
+    averages = calculate_fixed_day_average(sheet).set_index("Day")
+    assert averages.loc["Daily_Avg", "Feb-2024"] == 200.0
+    assert averages.loc["Avg_Days_5_15_25", "Jan-2024"] == round((0.0 + 150.0 + 200.0) / 3, 2)
+    assert averages.loc["Avg_Days_2_10_20_30", "Mar-2024"] == 50.0
+
+    opening, closing = opening_and_closing_bal(sheet, _ledger().query("Bank == 'A'"))
+    assert closing == {"Jan-2024": 200.0, "Feb-2024": 200.0, "Mar-2024": 0.0}
+    assert opening == {"Jan-2024": 100.0, "Feb-2024": 200.0, "Mar-2024": 200.0}
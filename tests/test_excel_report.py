@@ -0,0 +1,82 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend import excel_report
+from old_endpoints.backend.excel_report import REPORT_SHEETS, SECTION_TITLES, export_options, write_statement_workbook
+
+
+def _ledger(rows):
+    return pd.DataFrame({
+        "Value Date": ["01-04-2024"] * rows,
+        "Description": ["upi/rent"] * rows,
+        "Debit": [100.5] + [np.nan] * (rows - 1),
+        "Credit": [np.nan] + [20] * (rows - 1),
+    })
+
+
+def _workbook(tmp_path):
+    name_n_num = pd.DataFrame({"index": ["Account Number", "Account Name", "Bank"], 0: ["1", "A", "HDFC"]})
+    sections = [pd.DataFrame({title: ["x"], "Apr-2024": [1.0], "Total": [1.0]})
+                for title in ["Particulars", "Income / Receipts", "Important Expenses / Payments",
+                              "Other Expenses / Payments", "Contra Credit", "Contra Debit"]]
+    sheets = {name: _ledger(4) for name in REPORT_SHEETS}
+    path = write_statement_workbook(tmp_path / "report.xlsx", [name_n_num] + sections, sheets)
+    return openpyxl.load_workbook(path)
+
+
+def test_table_sheets_are_styled_as_they_are_written(tmp_path):
+    sheet = _workbook(tmp_path)["Investment"]
+
+    assert sheet["A1"].value == "Value Date" and sheet["A1"].fill.fgColor.rgb.endswith("000058")
+    assert sheet["A2"].fill.fill_type is None
+    assert sheet["A3"].fill.fgColor.rgb.endswith("B5CBE0") and sheet["A4"].fill.fgColor.rgb.endswith("FFFFFF")
+    assert sheet["C2"].number_format == "#,##0.00" and sheet["D3"].value == 20
+    # The note starts one empty row below the table and the filter covers it
+    assert [str(cells) for cells in sheet.merged_cells.ranges] == ["A7:H9"]
+    assert sheet["A7"].value.startswith("*This table reflects probable transactions")
+    assert sheet.auto_filter.ref == "A1:H9"
+    assert sheet.column_dimensions["B"].width == 70
+
+
+def test_summary_sections_and_sheet_order(tmp_path):
+    workbook = _workbook(tmp_path)
+    summary = workbook["Summary"]
+
+    assert workbook.sheetnames == ["Summary"] + REPORT_SHEETS
+    assert summary["A1"].value is None and summary["A2"].fill.fgColor.rgb.endswith("B9B9B9")
+    assert summary["A6"].value == "Particulars" and summary["A6"].fill.fgColor.rgb.endswith("000058")
+    assert summary["B7"].number_format == "#,##0.00" and summary["A7"].border.right.style == "thin"
+    assert summary.sheet_properties.tabColor.rgb.endswith("16365C")
+    assert workbook["Opportunity to Earn"].sheet_properties.tabColor.rgb.endswith("FFFF99")
+
+
+def test_streamed_workbook_has_the_same_cells(tmp_path):
+    name_n_num = pd.DataFrame({"index": ["Account Number"], 0: ["1"]})
+    sections = [pd.DataFrame({title: ["x"], "Total": [1.0]}) for title in SECTION_TITLES]
+    sheets = {name: _ledger(6) for name in REPORT_SHEETS}
+    books = []
+    for name, options in [("memory.xlsx", {}), ("streamed.xlsx", {"constant_memory": True})]:
+        path = write_statement_workbook(tmp_path / name, [name_n_num] + sections, sheets, options)
+        books.append(openpyxl.load_workbook(path))
+
+    for name in ["Summary", "Transactions", "EOD"]:
+        in_memory, streamed = books[0][name], books[1][name]
+        assert [[cell.value for cell in row] for row in streamed.iter_rows()] == \
+            [[cell.value for cell in row] for row in in_memory.iter_rows()]
+    assert books[1]["Transactions"]["A1"].fill.fgColor.rgb.endswith("000058")
+    assert books[1]["Transactions"]["A1"].font.b and books[1]["Transactions"].auto_filter.ref == "A1:D7"
+
+
+def test_only_large_ledgers_are_streamed(monkeypatch):
+    monkeypatch.setattr(excel_report, "STREAMING_EXPORT_ROWS", 5)
+
+    assert export_options({"Transactions": _ledger(5)}) == {}
+    assert export_options({"Transactions": _ledger(6)}) == {"constant_memory": True}
@@ -0,0 +1,48 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend.layout_cache import (
+    evict_layout,
+    layout_fingerprint,
+    load_layout,
+    store_layout,
+)
+
+SAMPLES = ROOT / "public" / "samples"
+
+
+def test_layout_roundtrip_and_eviction(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEGACY_LAYOUT_CACHE_DIR", str(tmp_path))
+    list_test = ["C", 0, [[np.int64(0)], [2], [3], [4], [5]], [np.float64(31.5), 120.25]]
+
+    store_layout("abc", list_test)
+
+    assert load_layout("abc") == ["C", 0, [[0], [2], [3], [4], [5]], [31.5, 120.25]]
+    evict_layout("abc")
+    assert load_layout("abc") is None
+
+
+def test_custom_extraction_and_unknown_layouts_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEGACY_LAYOUT_CACHE_DIR", str(tmp_path))
+
+    store_layout("abc", ["E", 0, 0, [10.0]])
+    store_layout(None, ["A", 0, [[0]], 0])
+
+    assert load_layout("abc") is None
+    assert load_layout(None) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_same_statement_layout_gives_same_fingerprint():
+    axis = layout_fingerprint(SAMPLES / "axis.pdf")
+    icici = layout_fingerprint(SAMPLES / "icici-2025.pdf")
+
+    assert axis is not None and icici is not None
+    assert axis == layout_fingerprint(SAMPLES / "axis.pdf")
+    assert axis != icici
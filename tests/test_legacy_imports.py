@@ -0,0 +1,26 @@
+from pathlib import Path
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_CHECK = """
+import sys
+sys.argv = ["worker", "--bind", "0.0.0.0:8000"]
+from backend.tax_professional.banks.CA_Statement_Analyzer import start_extraction_add_pdf
+heavy = [name for name in ("torch", "torchvision", "transformers", "spacy", "reportlab", "PyPDF2") if name in sys.modules]
+print("heavy:" + ",".join(heavy))
+"""
+
+
+def test_legacy_analyzer_imports_without_heavy_dependencies_or_cli_parsing():
+    # Fresh interpreter so modules imported by other tests do not leak in
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_CHECK],
+        cwd=ROOT / "old_endpoints",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert "heavy:" in result.stdout.splitlines()
@@ -0,0 +1,99 @@
+from pathlib import Path
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend.probe_scheduler import SharedStep, first_passing_probe
+
+
+def test_highest_priority_pass_wins_even_when_slower():
+    def slow_pass():
+        time.sleep(0.2)
+        return "A"
+
+    assert first_passing_probe([slow_pass, lambda: "B"], max_workers=2) == "A"
+
+
+def test_failed_probes_fall_through_in_order():
+    assert first_passing_probe([lambda: None, lambda: "B", lambda: "C"], max_workers=3) == "B"
+    assert first_passing_probe([lambda: None, lambda: None], max_workers=2) is None
+
+
+def test_queued_probes_are_cancelled_once_a_winner_is_known():
+    started = []
+
+    def probe(name, result):
+        def run():
+            started.append(name)
+            time.sleep(0.05)
+            return result
+        return run
+
+    probes = [probe("A", "A"), probe("B", None), probe("C", None), probe("D", None)]
+    assert first_passing_probe(probes, max_workers=1) == "A"
+    time.sleep(0.2)
+
+    # At most the probe picked up while A's result was being read gets to run
+    assert "C" not in started and "D" not in started
+
+
+def test_probe_errors_surface_only_when_reached():
+    def boom():
+        raise RuntimeError("model missing")
+
+    assert first_passing_probe([lambda: "A", boom], max_workers=2) == "A"
+    with pytest.raises(RuntimeError):
+        first_passing_probe([lambda: None, boom], max_workers=2)
+
+
+def test_shared_step_runs_once():
+    calls = []
+    step = SharedStep(lambda x: calls.append(x) or x * 2, 21)
+
+    threads = [threading.Thread(target=step.result) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert step.result() == 42
+    assert calls == [21]
+
+
+def test_closed_shared_step_cleans_up_once_its_run_finishes():
+    cleaned = []
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "annotated.pdf"
+
+    finished = SharedStep(lambda: "done.pdf", cleanup=cleaned.append)
+    finished.result()
+    finished.close()
+    assert cleaned == ["done.pdf"]
+
+    running = SharedStep(slow, cleanup=cleaned.append)
+    thread = threading.Thread(target=running.result)
+    thread.start()
+    started.wait(5)
+    running.close()
+    # Closing does not wait for the run; the run cleans up after itself
+    assert cleaned == ["done.pdf"]
+    release.set()
+    thread.join()
+    assert cleaned == ["done.pdf", "annotated.pdf"]
+
+    never_run = SharedStep(slow, cleanup=cleaned.append)
+    never_run.close()
+    assert cleaned[-1] is None
+    with pytest.raises(RuntimeError):
+        never_run.result()
@@ -0,0 +1,80 @@
+from pathlib import Path
+import asyncio
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.domain.services.stages import COMPLETED, FAILED, SKIPPED, Stage, run_stages
+
+
+def test_independent_stages_run_concurrently():
+    both_started = asyncio.Event()
+    started = []
+
+    def waiting_stage(name):
+        async def run(_):
+            started.append(name)
+            if len(started) == 2:
+                both_started.set()
+            # Only returns if the other stage starts while this one is still running
+            await both_started.wait()
+            return name
+
+        return run
+
+    async def combine(upstream):
+        return upstream["ocr"] + "+" + upstream["ledger"]
+
+    outcomes = asyncio.run(asyncio.wait_for(run_stages([
+        Stage("ocr", waiting_stage("ocr")),
+        Stage("ledger", waiting_stage("ledger")),
+        Stage("report", combine, depends_on=("ocr", "ledger")),
+    ]), timeout=5))
+
+    assert outcomes["report"].status == COMPLETED
+    assert outcomes["report"].result == "ocr+ledger"
+
+
+def test_failed_stage_only_skips_its_dependents():
+    async def fail(_):
+        raise RuntimeError("OCR unavailable")
+
+    async def succeed(_):
+        return "ledger.xlsx"
+
+    async def entities(upstream):
+        return upstream["ledger"]
+
+    async def report(_):
+        raise AssertionError("must not run")
+
+    outcomes = asyncio.run(run_stages([
+        Stage("ocr", fail),
+        Stage("ledger", succeed),
+        Stage("entities", entities, depends_on=("ledger",)),
+        Stage("report", report, depends_on=("ocr", "ledger")),
+    ]))
+
+    assert outcomes["ocr"].status == FAILED
+    assert str(outcomes["ocr"].error) == "OCR unavailable"
+    assert outcomes["ledger"].result == "ledger.xlsx"
+    assert outcomes["entities"].result == "ledger.xlsx"
+    assert outcomes["report"].status == SKIPPED
+    assert outcomes["report"].blocked_by == ["ocr"]
+
+
+def test_invalid_dependencies_are_rejected():
+    async def noop(_):
+        return None
+
+    with pytest.raises(ValueError, match="unknown"):
+        asyncio.run(run_stages([Stage("report", noop, depends_on=("ocr",))]))
+    with pytest.raises(ValueError, match="cycle"):
+        asyncio.run(run_stages([
+            Stage("a", noop, depends_on=("b",)),
+            Stage("b", noop, depends_on=("a",)),
+        ]))
@@ -0,0 +1,65 @@
+from pathlib import Path
+import asyncio
+import sys
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.domain.repositories.statements import ClaimLostError, StatementJobRepository
+
+
+class _Result:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class _Session:
+    def __init__(self, matched=True):
+        self.matched = matched
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+        return _Result(uuid.uuid4() if self.matched else None)
+
+
+def test_patch_result_merges_only_the_changed_keys():
+    session = _Session()
+    changes = {"stages": [{"name": "Ledger normalisation"}], "entity_count": 3}
+
+    asyncio.run(StatementJobRepository(session).patch_result(uuid.uuid4(), changes))
+
+    (compiled,) = session.statements
+    sql = str(compiled)
+    assert "SET result=(coalesce(statement_jobs.result, '{}'::jsonb) || " in sql
+    assert "RETURNING statement_jobs.id" in sql
+    assert compiled.params["result_changes"] == changes
+
+
+def test_patch_result_of_missing_job_raises():
+    with pytest.raises(LookupError):
+        asyncio.run(StatementJobRepository(_Session(matched=False)).patch_result(uuid.uuid4(), {"a": 1}))
+
+
+def test_writes_held_by_a_worker_require_its_claim():
+    session = _Session()
+
+    asyncio.run(StatementJobRepository(session).patch_result(uuid.uuid4(), {"a": 1}, held_by="worker-1"))
+
+    (compiled,) = session.statements
+    assert "statement_jobs.claimed_by = " in str(compiled)
+    assert "worker-1" in compiled.params.values()
+    with pytest.raises(ClaimLostError):
+        asyncio.run(
+            StatementJobRepository(_Session(matched=False)).update_fields(
+                uuid.uuid4(), held_by="worker-1", status="completed"
+            )
+        )
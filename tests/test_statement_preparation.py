@@ -0,0 +1,42 @@
+from pathlib import Path
+import sys
+
+import fitz
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend.code_for_extraction import prepare_statement_document
+
+SAMPLE = ROOT / "public" / "samples" / "axis.pdf"
+
+
+@pytest.fixture
+def locked_statement(tmp_path):
+    path = tmp_path / "locked.pdf"
+    with fitz.open(SAMPLE) as doc:
+        doc.save(path, encryption=fitz.PDF_ENCRYPT_AES_256, user_pw="secret", owner_pw="secret")
+    return path
+
+
+def test_prepares_locked_statement_in_memory(locked_statement, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    original = locked_statement.read_bytes()
+
+    doc = prepare_statement_document(str(locked_statement), "secret")
+    with fitz.open(SAMPLE) as source:
+        assert len(doc) == len(source)
+        # Every page is widened by the 0.3 inch margin on both sides
+        assert doc[1].rect.width == pytest.approx(source[1].rect.width + 2 * 0.3 * 72)
+    doc.close()
+
+    # No scratch files next to the job and the upload itself is untouched
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["locked.pdf"]
+    assert locked_statement.read_bytes() == original
+
+
+def test_wrong_password_is_rejected(locked_statement):
+    with pytest.raises(ValueError, match="Incorrect password"):
+        prepare_statement_document(str(locked_statement), "wrong")
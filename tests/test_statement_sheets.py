@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.domain.services import statement_sheets
+from apps.domain.services.statement_sheets import (read_sheet, read_sheets, replace_sheet, sheet_names, sheet_page,
+                                                   sidecar_dir, write_sheet_sidecar)
+
+
+def _statement(tmp_path):
+    path = tmp_path / "statement.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"Account": ["Name", "Number"], 0: ["A", 12]}).to_excel(writer, sheet_name="Summary", index=False)
+        pd.DataFrame({
+            "Value Date": ["01-04-2024", "02-04-2024", "03-04-2024"],
+            "Description": ["upi/rent", np.nan, "neft/salary"],
+            "Debit": [100.5, 20, np.nan],
+            "Credit": [np.nan, np.nan, 5000],
+        }).to_excel(writer, sheet_name="Transactions", index=False)
+    return path
+
+
+def test_sheets_read_from_the_sidecar_match_the_workbook(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    path = _statement(tmp_path)
+    expected = pd.read_excel(path, sheet_name=None)
+
+    assert write_sheet_sidecar(path) == sidecar_dir(path)
+    monkeypatch.setattr(pd, "read_excel", lambda *args, **kwargs: pytest.fail("workbook parsed"))
+
+    transactions = read_sheet(path, "Transactions")
+    pd.testing.assert_frame_equal(transactions, expected["Transactions"])
+    assert transactions["Description"].isna().tolist() == [False, True, False]
+    # The Summary mixes text and numbers in a column, so only the workbook has it
+    monkeypatch.undo()
+    assert list(json.loads((sidecar_dir(path) / "manifest.json").read_text())["files"]) == ["Transactions"]
+    sheets = read_sheets(path)
+    assert list(sheets) == ["Summary", "Transactions"]
+    pd.testing.assert_frame_equal(sheets["Summary"], expected["Summary"])
+
+
+def test_a_changed_workbook_is_read_instead_of_its_sidecar(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = _statement(tmp_path)
+    write_sheet_sidecar(path)
+
+    with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+        pd.DataFrame({"Description": ["changed"]}).to_excel(writer, sheet_name="Transactions", index=False)
+
+    assert read_sheet(path, "Transactions")["Description"].tolist() == ["changed"]
+
+
+def test_replaced_sheets_keep_the_sidecar_current(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    path = _statement(tmp_path)
+    write_sheet_sidecar(path)
+
+    df = read_sheet(path, "Transactions").assign(Entity=["Landlord", "-", "Employer"])
+    replace_sheet(path, "Transactions", df)
+
+    monkeypatch.setattr(pd, "read_excel", lambda *args, **kwargs: pytest.fail("workbook parsed"))
+    assert read_sheet(path, "Transactions")["Entity"].tolist() == ["Landlord", "-", "Employer"]
+
+
+def test_without_pyarrow_the_workbook_is_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(statement_sheets, "pyarrow", None)
+    path = _statement(tmp_path)
+
+    assert write_sheet_sidecar(path) is None
+    assert read_sheet(path, "Transactions")["Debit"].tolist()[:2] == [100.5, 20]
+
+
+def test_sheet_pages_count_the_whole_sheet(tmp_path):
+    path = _statement(tmp_path)
+
+    page = sheet_page(read_sheet(path, "Transactions"), offset=1, limit=1, columns=["Description", "Debit"])
+
+    assert page["columns"] == ["Description", "Debit"]
+    assert page["data"] == [{"Description": "", "Debit": 20.0}]
+    assert (page["row_count"], page["column_count"]) == (3, 2)
+    assert sheet_names(path) == ["Summary", "Transactions"]
+    with pytest.raises(ValueError, match="Unknown columns: Amount"):
+        sheet_page(read_sheet(path, "Transactions"), columns=["Amount"])
@@ -0,0 +1,168 @@
+from pathlib import Path
+import asyncio
+import sys
+import types
+import uuid
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.infra.jobs import statement_worker
+from apps.infra.jobs.statement_worker import StatementJobWorker
+
+
+class _Queue:
+    def __init__(self, jobs):
+        self.queued = list(jobs)
+        self.running = {}
+        self.released = []
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+
+def _repository(queue):
+    class Repository:
+        def __init__(self, session):
+            pass
+
+        async def claim_next(self, *, worker_id):
+            if not queue.queued:
+                return None
+            job = queue.queued.pop(0)
+            queue.running[job.id] = worker_id
+            return job
+
+        async def heartbeat(self, job_id, *, worker_id):
+            return queue.running.get(job_id) == worker_id
+
+        async def release(self, *, worker_id):
+            released = [job_id for job_id, owner in queue.running.items() if owner == worker_id]
+            queue.released.extend(released)
+            return len(released)
+
+        async def recover_stale(self, *, stale_after, max_attempts):
+            return 0, 0
+
+    return Repository
+
+
+class _Pipeline:
+    def __init__(self, queue, block=None):
+        self.queue = queue
+        self.block = block
+        self.active = 0
+        self.most_active = 0
+        self.done = []
+        self.cancelled = []
+
+    async def run_claimed_job(self, job):
+        self.active += 1
+        self.most_active = max(self.most_active, self.active)
+        try:
+            await (self.block.wait() if self.block else asyncio.sleep(0.01))
+            self.done.append(job.id)
+            self.queue.running.pop(job.id)
+        except asyncio.CancelledError:
+            self.cancelled.append(job.id)
+            raise
+        finally:
+            self.active -= 1
+
+
+def _worker(monkeypatch, queue, pipeline, concurrency, heartbeat_interval=30.0):
+    monkeypatch.setattr(statement_worker, "StatementJobRepository", _repository(queue))
+    return StatementJobWorker(
+        pipeline=pipeline,
+        session_factory=_Session,
+        concurrency=concurrency,
+        poll_interval=0.01,
+        heartbeat_interval=heartbeat_interval,
+    )
+
+
+def _jobs(count):
+    return [types.SimpleNamespace(id=uuid.uuid4(), attempts=1) for _ in range(count)]
+
+
+def test_queued_jobs_run_at_most_concurrency_at_a_time(monkeypatch):
+    jobs = _jobs(5)
+    queue = _Queue(jobs)
+    pipeline = _Pipeline(queue)
+    worker = _worker(monkeypatch, queue, pipeline, concurrency=2)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(worker.run(stop))
+        while len(pipeline.done) < len(jobs):
+            await asyncio.sleep(0.01)
+        stop.set()
+        await task
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert sorted(pipeline.done) == sorted(job.id for job in jobs)
+    assert pipeline.most_active == 2
+    assert queue.released == []
+
+
+def test_stopping_lets_running_jobs_finish_before_giving_up_claims(monkeypatch):
+    jobs = _jobs(3)
+    queue = _Queue(jobs)
+    block = asyncio.Event()
+    pipeline = _Pipeline(queue, block=block)
+    worker = _worker(monkeypatch, queue, pipeline, concurrency=2)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(worker.run(stop))
+        while pipeline.active < 2:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await asyncio.sleep(0.05)
+        # Still waiting on the running jobs, which hold on to their claims
+        assert not task.done()
+        block.set()
+        await task
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert sorted(pipeline.done) == sorted(job.id for job in jobs[:2])
+    assert pipeline.cancelled == []
+    assert queue.released == []
+    assert queue.queued == jobs[2:]
+
+
+def test_job_is_abandoned_once_another_worker_holds_it(monkeypatch):
+    jobs = _jobs(1)
+    queue = _Queue(jobs)
+    block = asyncio.Event()
+    pipeline = _Pipeline(queue, block=block)
+    worker = _worker(monkeypatch, queue, pipeline, concurrency=1, heartbeat_interval=0.01)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(worker.run(stop))
+        while pipeline.active < 1:
+            await asyncio.sleep(0.01)
+        # e.g. requeued as stale and claimed elsewhere
+        queue.running[jobs[0].id] = "other-worker"
+        while not pipeline.cancelled:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await task
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert pipeline.cancelled == [jobs[0].id]
+    assert pipeline.done == []
+    assert queue.released == []
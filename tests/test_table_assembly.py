@@ -0,0 +1,60 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend.table_assembly import (
+    MIN_PAGES_PER_WORKER,
+    PageTableAssembler,
+    _page_shards,
+)
+
+
+def _append_pages(pages):
+    # Reference implementation: the per-page `_append` loop the extractors used to run
+    df_total = pd.DataFrame()
+    for table in pages:
+        df_total = df_total._append(table, ignore_index=True)
+        df_total.replace({r"\n": " "}, regex=True, inplace=True)
+    return df_total
+
+
+def test_assembler_matches_incremental_append():
+    pages = [
+        [["Date", "Narration\nDetails", "Debit", "Credit", "Balance"],
+         ["01-04-2024", "UPI/123\nSHOP", "100.00", None, "900.00"]],
+        None,
+        [["02-04-2024", "NEFT\nIN", None, "50.00", "950.00"]],
+        [["03-04-2024", "ATM", "10.00"]],
+        [["04-04-2024", "IMPS", None, "5.00", "945.00", "extra\ncol"]],
+    ]
+
+    assembler = PageTableAssembler()
+    for table in pages:
+        assembler.add_page(table)
+
+    pd.testing.assert_frame_equal(assembler.to_dataframe(), _append_pages(pages))
+
+
+def test_assembler_without_tables_returns_empty_frame():
+    assembler = PageTableAssembler()
+    assembler.add_page(None)
+
+    assert assembler.to_dataframe().empty
+
+
+def test_page_shards_cover_every_page_in_order():
+    total_pages = MIN_PAGES_PER_WORKER * 3 + 7
+    shards = _page_shards(total_pages, workers=8)
+
+    assert len(shards) == 3
+    assert [page for shard in shards for page in shard] == list(range(1, total_pages + 1))
+
+
+def test_short_pdfs_are_not_sharded():
+    assert _page_shards(MIN_PAGES_PER_WORKER * 2 - 1, workers=8) == []
+    assert _page_shards(MIN_PAGES_PER_WORKER * 10, workers=1) == []
@@ -0,0 +1,95 @@
+from pathlib import Path
+import sys
+
+import fitz
+import pytest
+import torch
+from PIL import Image
+from torchvision import transforms
+from transformers import ResNetConfig, TableTransformerConfig, TableTransformerForObjectDetection
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from old_endpoints.backend.table_structure import MODEL_DIR, TableStructureModel, objects_from_outputs
+
+SAMPLES = ROOT / "public" / "samples"
+
+
+def _render(pdf_name, page_num=0):
+    page = fitz.open(SAMPLES / pdf_name).load_page(page_num)
+    pix = page.get_pixmap()
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+
+def _reference_columns(model_dir, image):
+    # Reference: the per-call load and inference `detect_table_columns` used to run
+    structure_model = TableTransformerForObjectDetection.from_pretrained(model_dir)
+    structure_transform = transforms.Compose([
+        transforms.ToTensor(),
+        transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
+    ])
+    pixel_values = structure_transform(image).unsqueeze(0)
+    with torch.no_grad():
+        outputs = structure_model(pixel_values)
+    structure_id2label = structure_model.config.id2label
+    structure_id2label[len(structure_id2label)] = "no object"
+    objects = objects_from_outputs(outputs, 0, image.size, structure_id2label)
+    return [obj for obj in objects if obj['label'] == "table column"]
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    # Small randomly initialised model with the real label set, so no weights are needed
+    backbone = ResNetConfig(embedding_size=8, hidden_sizes=[8, 16, 16, 32], depths=[1, 1, 1, 1],
+                            out_features=["stage4"])
+    config = TableTransformerConfig(
+        use_timm_backbone=False, use_pretrained_backbone=False, backbone=None, backbone_config=backbone,
+        d_model=32, encoder_layers=1, decoder_layers=1, encoder_ffn_dim=32, decoder_ffn_dim=32,
+        encoder_attention_heads=2, decoder_attention_heads=2, num_queries=20,
+        id2label={i: "table column" for i in range(6)},
+    )
+    torch.manual_seed(0)
+    model_dir = tmp_path_factory.mktemp("table_model")
+    TableTransformerForObjectDetection(config).eval().save_pretrained(model_dir)
+    return model_dir
+
+
+def _assert_same_columns(actual, expected, abs_tol=1e-3):
+    assert [obj['label'] for obj in actual] == [obj['label'] for obj in expected]
+    for got, want in zip(actual, expected):
+        assert got['score'] == pytest.approx(want['score'], abs=abs_tol)
+        assert got['bbox'] == pytest.approx(want['bbox'], abs=abs_tol * 100)
+
+
+def test_resident_model_matches_per_call_loading(tiny_model_dir):
+    image = _render("axis.pdf")
+    model = TableStructureModel(tiny_model_dir, quantize=False)
+
+    columns = model.detect_columns([image])[0]
+
+    assert columns
+    _assert_same_columns(columns, _reference_columns(tiny_model_dir, image))
+
+
+def test_batched_inference_matches_single_images(tiny_model_dir):
+    images = [_render("axis.pdf", 0), _render("icici-2025.pdf", 0), _render("axis.pdf", 1)]
+    model = TableStructureModel(tiny_model_dir, quantize=False)
+
+    batched = model.detect_columns(images, batch_size=2)
+
+    for image, columns in zip(images, batched):
+        _assert_same_columns(columns, model.detect_columns([image])[0])
+
+
+@pytest.mark.skipif(not Path(MODEL_DIR).exists(), reason="TableTransformer weights are not installed")
+def test_quantised_model_finds_the_same_columns():
+    image = _render("axis.pdf")
+    full = TableStructureModel(quantize=False).detect_columns([image])[0]
+    quantised = TableStructureModel(quantize=True).detect_columns([image])[0]
+
+    # Column left edges become explicit vertical lines, so they must stay within a few pixels
+    assert len(quantised) == len(full)
+    assert sorted(obj['bbox'][0] for obj in quantised) == pytest.approx(
+        sorted(obj['bbox'][0] for obj in full), abs=3)
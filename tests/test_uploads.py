@@ -0,0 +1,87 @@
+from pathlib import Path
+import hashlib
+import sys
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.api.uploads import receive_upload
+
+
+def _client(directory: Path, max_bytes: int) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        received = await receive_upload(request, directory, max_bytes=max_bytes)
+        return {
+            "path": str(received.path),
+            "file_name": received.file_name,
+            "content_type": received.content_type,
+            "size": received.size,
+            "sha256": received.sha256,
+            "fields": received.fields,
+        }
+
+    return TestClient(app)
+
+
+def test_upload_is_written_to_disk_with_its_hash(tmp_path):
+    content = b"%PDF-1.7 " + bytes(range(256)) * 4000
+    response = _client(tmp_path, max_bytes=2 * 1024 * 1024).post(
+        "/upload",
+        files={"file": ("statement.pdf", content, "application/pdf")},
+        data={"bank_name": "HDFC", "financial_year": "2023-2024"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert Path(body["path"]).read_bytes() == content
+    assert body["sha256"] == hashlib.sha256(content).hexdigest()
+    assert body["size"] == len(content)
+    assert body["file_name"] == "statement.pdf"
+    assert body["content_type"] == "application/pdf"
+    assert body["fields"] == {"bank_name": "HDFC", "financial_year": "2023-2024"}
+
+
+def test_oversized_upload_is_cut_off_and_removed(tmp_path):
+    response = _client(tmp_path, max_bytes=1024 * 1024).post(
+        "/upload",
+        files={"file": ("statement.pdf", b"x" * (1024 * 1024 + 1), "application/pdf")},
+    )
+
+    assert response.status_code == 413
+    assert "1 MB upload limit" in response.json()["detail"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_declared_length_over_the_limit_is_refused_before_reading(tmp_path):
+    def body():
+        raise AssertionError("the body must not be read")
+        yield b""
+
+    response = _client(tmp_path, max_bytes=1024 * 1024).post(
+        "/upload",
+        content=body(),
+        headers={
+            "content-type": "multipart/form-data; boundary=x",
+            "content-length": str(10 * 1024 * 1024),
+        },
+    )
+
+    assert response.status_code == 413
+    assert not tmp_path.exists() or list(tmp_path.iterdir()) == []
+
+
+def test_form_without_a_file_is_rejected(tmp_path):
+    response = _client(tmp_path, max_bytes=1024 * 1024).post(
+        "/upload",
+        files={"bank_name": (None, "HDFC")},
+    )
+
+    assert response.status_code == 400
+    assert list(tmp_path.iterdir()) == []